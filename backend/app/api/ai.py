@@ -4,7 +4,9 @@ AI processing API endpoints
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.llm_cache import llm_cache
 from app.services.news_service import NewsRepository
 from app.services.ai_processor import AIProcessor
 
@@ -33,6 +35,28 @@ async def process_articles(
         db.close()
 
 
+@router.post("/translate-titles")
+async def translate_titles(
+    limit: int = Query(50, ge=1, le=500, description="翻译标题数量限制")
+):
+    """批量翻译尚未翻译的英文标题"""
+    db = next(get_db())
+    repo = NewsRepository(db)
+    
+    try:
+        processor = AIProcessor(repo)
+        results = await processor.translate_pending_titles(limit)
+        
+        return {
+            "message": "Title translation completed",
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Title translation failed: {str(e)}")
+    finally:
+        db.close()
+
+
 @router.post("/process/{article_id}")
 async def process_single_article(article_id: int):
     """处理单篇文章"""
@@ -66,7 +90,8 @@ async def get_ai_statistics():
         stats = await processor.get_processing_stats()
         
         return {
-            "ai_processing_statistics": stats
+            "ai_processing_statistics": stats,
+            "llm_cache": llm_cache.stats() if settings.llm_cache_enabled else None
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
@@ -1,6 +1,7 @@
 """
 News API endpoints
 """
+import json
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -167,6 +168,15 @@ async def get_sources():
                     "category": source.category,
                     "weight": source.weight,
                     "is_active": source.is_active,
+                    "health": {
+                        "circuit_state": source.circuit_state,
+                        "circuit_open_until": source.circuit_open_until,
+                        "consecutive_failures": source.consecutive_failures,
+                        "last_success_at": source.last_success_at,
+                        "last_error": source.last_error,
+                        "latency_p50_ms": source.latency_p50_ms,
+                        "latency_p95_ms": source.latency_p95_ms
+                    },
                     "created_at": source.created_at
                 }
                 for source in sources
@@ -190,6 +200,59 @@ async def get_statistics():
         db.close()
 
 
+def _crawl_run_summary(run) -> dict:
+    """抓取运行记录摘要"""
+    return {
+        "id": run.id,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "duration_ms": run.duration_ms,
+        "total_sources": run.total_sources,
+        "success_count": run.success_count,
+        "error_count": run.error_count,
+        "new_articles": run.new_articles,
+        "bytes_downloaded": run.bytes_downloaded,
+        "stages": json.loads(run.stages or '{}'),
+        "cache": json.loads(run.cache or '{}')
+    }
+
+
+@router.get("/crawl-runs")
+async def get_crawl_runs(limit: int = Query(20, ge=1, le=200)):
+    """获取最近的抓取运行统计（分阶段耗时、流量、缓存命中率）"""
+    db = next(get_db())
+    repo = NewsRepository(db)
+    
+    try:
+        runs = repo.get_crawl_runs(limit)
+        return {
+            "runs": [_crawl_run_summary(run) for run in runs],
+            "total": len(runs)
+        }
+    finally:
+        db.close()
+
+
+@router.get("/crawl-runs/{run_id}")
+async def get_crawl_run(run_id: int):
+    """获取单次抓取运行的完整统计，含各新闻源分阶段耗时"""
+    db = next(get_db())
+    repo = NewsRepository(db)
+    
+    try:
+        run = repo.get_crawl_run(run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Crawl run not found")
+        
+        return {
+            **_crawl_run_summary(run),
+            "counters": json.loads(run.counters or '{}'),
+            "sources": json.loads(run.sources or '{}')
+        }
+    finally:
+        db.close()
+
+
 @router.post("/crawl")
 async def manual_crawl():
     """手动触发新闻采集"""
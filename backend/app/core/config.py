@@ -36,10 +36,100 @@ class Settings(BaseSettings):
     # 新闻采集配置
     max_articles_per_source: int = 20
     content_retention_days: int = 30
+    crawl_concurrency: int = 8  # 同时抓取的新闻源数量上限
+    crawl_per_host_concurrency: int = 2  # 同一站点同时抓取的新闻源数量上限
+    site_profiles_file: str = ""  # 额外的站点配置JSON文件，覆盖内置配置
+    html_parser: str = "lxml"  # HTML解析器：lxml / html.parser / html5lib
+    content_min_confidence: float = 0.5  # 正文提取置信度低于该值时回退到站点选择器
+    rss_recent_guid_limit: int = 200  # 每个RSS源保留的最近条目GUID数
+    rss_watermark_grace_hours: int = 48  # GUID未出现过的条目可早于高水位的时长（晚收录、回填）
+    
+    # 自适应抓取频率配置
+    crawl_tick_minutes: int = 5  # 调度器检查到期新闻源的间隔
+    crawl_min_interval_minutes: int = 15  # 单个新闻源最短抓取间隔
+    crawl_max_interval_minutes: int = 1440  # 单个新闻源最长抓取间隔
+    crawl_initial_interval_minutes: int = 60  # 首次抓取后、尚无速率数据时的间隔
+    crawl_target_new_articles: float = 5.0  # 期望每次抓取获得的新文章数
+    crawl_rate_smoothing: float = 0.3  # 发布速率EWMA平滑系数
+    crawl_jitter_ratio: float = 0.1  # 抓取间隔随机抖动比例，避免同时到期
+    
+    # 新闻源健康与熔断配置
+    source_failure_threshold: int = 3  # 连续失败多少次后熔断
+    source_cooldown_minutes: int = 30  # 首次熔断冷却时间，之后每次失败翻倍
+    source_max_cooldown_minutes: int = 1440  # 熔断冷却时间上限
+    source_latency_window: int = 20  # 计算p50/p95耗时的最近抓取次数
+    source_slow_latency_ms: int = 10000  # p95耗时超过该值视为慢速新闻源，排在最后抓取
+    source_timeout_multiplier: float = 3.0  # 超时时间 = p95耗时 × 该倍数
+    source_min_timeout_seconds: int = 10  # 按耗时计算的超时下限
+    
+    # 抓取队列配置
+    frontier_lease_seconds: int = 600  # 租约时长，进程中断后过期即可被接手
+    frontier_max_attempts: int = 3  # 单个条目最大尝试次数
+    frontier_batch_size: int = 100  # 每批领取的文章条目数
+    frontier_retention_days: int = 7  # 已完成文章条目的保留天数
+    
+    # 抓取流水线配置
+    pipeline_queue_size: int = 100  # 阶段间队列长度上限，下游处理不过来时上游等待
+    pipeline_content_workers: int = 4  # 并发获取正文的worker数
+    pipeline_persist_batch_size: int = 50  # 每批入库的文章数
+    pipeline_persist_interval_seconds: float = 2.0  # 未攒满一批时最长等待时间
+    crawl_run_retention_days: int = 30  # 抓取运行统计的保留天数
+    
+    # 浏览器页面池配置
+    browser_pool_size: int = 4  # 并发渲染的页面数
+    browser_page_max_navigations: int = 50  # 页面导航多少次后回收重建
+    browser_navigation_timeout_ms: int = 30000  # 单次页面导航超时
+    browser_default_wait_until: str = "domcontentloaded"  # 未配置站点策略时的等待事件
+    browser_blocked_resource_types: List[str] = ["image", "media", "font"]
+    browser_blocked_hosts: List[str] = [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "googlesyndication.com", "facebook.net", "scorecardresearch.com",
+        "chartbeat.com", "chartbeat.net", "hotjar.com", "segment.io",
+        "taboola.com", "outbrain.com", "adnxs.com", "amazon-adsystem.com",
+    ]
+    
+    # HTTP客户端配置
+    http_timeout_seconds: int = 60
+    http_pool_size: int = 100  # 连接池总连接数
+    http_pool_per_host: int = 10  # 单个站点的连接数
+    http_dns_cache_ttl: int = 300  # DNS缓存时间（秒）
+    http_keepalive_timeout: int = 30  # 空闲连接保持时间（秒）
+    http_max_retries: int = 2  # 429/503时的重试次数
+    
+    # 响应缓存配置
+    response_cache_enabled: bool = False  # 抓取时将原始响应写入磁盘缓存
+    response_cache_dir: str = "cache/responses"  # 缓存目录
+    response_cache_max_mb: int = 1024  # 缓存大小上限，超过后按最近访问时间淘汰
+    crawler_replay: bool = False  # 回放模式：只从响应缓存读取，不访问网络
+    
+    # 站点礼貌抓取配置
+    politeness_requests_per_second: float = 2.0  # 每个站点的平均请求速率
+    politeness_burst: int = 4  # 每个站点允许的突发请求数
+    politeness_max_backoff_seconds: int = 300  # 429/503退避上限（秒）
+    robots_respect: bool = True  # 是否遵守robots.txt
+    robots_cache_ttl_seconds: int = 3600  # robots.txt缓存时间（秒）
+    robots_user_agent: str = "NewsMind"  # 匹配robots.txt规则时使用的名称
+    
+    # 近似重复检测配置
+    near_duplicate_max_distance: int = 3  # SimHash汉明距离阈值
+    near_duplicate_window_days: int = 3  # 只与最近几天的文章比较
     
     # AI处理配置
     max_processing_batch_size: int = 10
     processing_delay_seconds: int = 1
+    lmstudio_api_url: str = "http://127.0.0.1:1234/v1/chat/completions"  # 本地LM Studio接口（OpenAI兼容）
+    lmstudio_model: str = ""  # LM Studio模型标识；留空时使用/v1/models返回的已加载模型（用于LLM缓存键）
+    lmstudio_model_ttl_seconds: int = 60  # 从/v1/models读取的模型标识的缓存时间（秒）
+    llm_timeout_seconds: float = 120.0  # 单次LLM调用超时
+    llm_pool_size: int = 8  # LLM连接池连接数
+    llm_concurrency: int = 4  # 同时进行的LLM调用数，按后端处理能力设置
+    llm_max_tokens: int = 2000  # 单次LLM回复的最大token数，需容纳合并处理的完整JSON
+    llm_cache_enabled: bool = True  # 相同输入的LLM调用直接返回缓存的回复
+    llm_cache_path: str = "cache/llm_cache.sqlite"  # LLM缓存文件
+    llm_cache_max_mb: int = 256  # LLM缓存大小上限，超过后按最近访问时间淘汰
+    ai_combined_processing: bool = True  # 英文文章一次调用同时生成摘要、标题翻译和正文翻译
+    title_batch_size: int = 50  # 批量标题翻译每次请求的标题数
+    title_batch_retries: int = 2  # 缺失或错位的标题重新组批的最大轮数
     
     # 日志配置
     log_file: str = "newsmind.log"
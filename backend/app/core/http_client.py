@@ -0,0 +1,204 @@
+"""
+Async HTTP client with connection pooling
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.politeness import PolitenessScheduler, politeness
+from app.core.response_cache import CacheMissError, ResponseCache, response_cache
+
+logger = logging.getLogger(__name__)
+
+# 只有安装了brotli解码库时才声明支持br，否则aiohttp无法解压
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+
+@dataclass
+class FetchResult:
+    """一次HTTP抓取的结果"""
+    url: str
+    status: int
+    body: bytes = b''
+    headers: Dict[str, str] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)  # dns/connect/ttfb/download耗时（毫秒）
+    from_cache: bool = False  # 回放模式下来自响应缓存
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """记录请求各阶段耗时，写入请求时传入的 trace_request_ctx['timings']
+
+    dns: 域名解析（命中DNS缓存时没有）；connect: 建立连接（不含dns）；
+    ttfb: 从发出请求到收到响应头
+    """
+    trace = aiohttp.TraceConfig()
+
+    def timings(ctx) -> Optional[Dict[str, float]]:
+        return ctx.trace_request_ctx.get('timings') if ctx.trace_request_ctx else None
+
+    def elapsed_ms(started: float) -> float:
+        return (time.perf_counter() - started) * 1000
+
+    async def on_request_start(session, ctx, params):
+        ctx.request_start = time.perf_counter()
+
+    async def on_dns_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        if timings(ctx) is not None:
+            timings(ctx)['dns'] = elapsed_ms(ctx.dns_start)
+
+    async def on_connection_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    async def on_connection_end(session, ctx, params):
+        if timings(ctx) is not None:
+            timings(ctx)['connect'] = elapsed_ms(ctx.connect_start) - timings(ctx).get('dns', 0.0)
+
+    async def on_request_end(session, ctx, params):
+        if timings(ctx) is not None:
+            timings(ctx)['ttfb'] = elapsed_ms(ctx.request_start)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_dns_resolvehost_start.append(on_dns_start)
+    trace.on_dns_resolvehost_end.append(on_dns_end)
+    trace.on_connection_create_start.append(on_connection_start)
+    trace.on_connection_create_end.append(on_connection_end)
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+class HttpClient:
+    """连接池化的异步HTTP客户端（keep-alive、DNS缓存、gzip/brotli）
+
+    所有请求先经过站点礼貌调度（令牌桶、robots.txt、429/503退避）。
+    启用响应缓存时成功的响应会写入磁盘缓存；回放模式下只从缓存读取，不访问网络。
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        scheduler: Optional[PolitenessScheduler] = None,
+        cache: Optional[ResponseCache] = None,
+        replay: Optional[bool] = None
+    ):
+        self.timeout = timeout or settings.http_timeout_seconds
+        self.politeness = scheduler or politeness
+        self.replay = settings.crawler_replay if replay is None else replay
+        if cache is None and (self.replay or settings.response_cache_enabled):
+            cache = response_cache
+        self.cache = cache
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """获取会话，首次使用或事件循环变化时创建"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=settings.http_pool_size,
+                limit_per_host=settings.http_pool_per_host,
+                ttl_dns_cache=settings.http_dns_cache_ttl,
+                keepalive_timeout=settings.http_keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[_trace_config()],
+            )
+            self._loop = loop
+        return self._session
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raise_for_status: bool = True
+    ) -> FetchResult:
+        """GET请求并读取完整响应体，429/503时按Retry-After退避后重试"""
+        if self.replay:
+            return await self.cached(url)
+        # 显式传入超时（timeout=None会让aiohttp取消会话级超时）
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        for attempt in range(settings.http_max_retries + 1):
+            await self.wait_turn(url)
+            timings: Dict[str, float] = {}
+            async with self.session.get(
+                url, headers=headers, timeout=request_timeout, trace_request_ctx={'timings': timings}
+            ) as response:
+                backoff = self.politeness.report(url, response.status, response.headers)
+                if backoff is not None and attempt < settings.http_max_retries:
+                    continue
+                if raise_for_status:
+                    response.raise_for_status()
+                download_start = time.perf_counter()
+                body = await response.read()
+                timings['download'] = (time.perf_counter() - download_start) * 1000
+                result = FetchResult(
+                    url=str(response.url),
+                    status=response.status,
+                    body=body,
+                    headers=dict(response.headers),
+                    timings=timings,
+                )
+                if response.status == 200:
+                    await self.remember(url, body, response.status, result.headers)
+                return result
+
+    async def cached(self, url: str) -> FetchResult:
+        """从响应缓存读取，缓存中没有时抛出CacheMissError"""
+        entry = await self.cache.alookup(url) if self.cache is not None else None
+        if entry is None:
+            raise CacheMissError(f"{url} is not in the response cache")
+        return FetchResult(
+            url=entry.url, status=entry.status, body=entry.body, headers=entry.headers, from_cache=True
+        )
+
+    async def remember(
+        self, url: str, body: bytes, status: int = 200, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """启用缓存时写入响应（浏览器渲染的页面也经此写入），失败不影响抓取"""
+        if self.cache is None or self.replay:
+            return
+        try:
+            await self.cache.astore(url, body, status, headers)
+        except Exception as e:
+            logger.warning(f"Failed to cache response for {url}: {e}")
+
+    async def wait_turn(self, url: str) -> None:
+        """等待轮到该站点；浏览器渲染前也需调用，robots.txt禁止时抛出RobotsDisallowedError"""
+        await self.politeness.wait(url, self._fetch_robots)
+
+    async def _fetch_robots(self, robots_url: str) -> Tuple[int, str]:
+        """直接获取robots.txt（不经过礼貌调度）"""
+        try:
+            async with self.session.get(robots_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                return response.status, await response.text(errors='replace')
+        except Exception as e:
+            logger.debug(f"Failed to fetch {robots_url}: {e}")
+            return 0, ''
+
+    async def close(self) -> None:
+        """关闭会话及连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
@@ -0,0 +1,163 @@
+"""
+Persistent cache of LLM responses keyed by prompt content
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_responses_last_access ON llm_responses (last_access);
+"""
+
+# 命中时的访问时间先记在内存中，攒够这么多条（或写入时）再批量提交
+TOUCH_FLUSH_SIZE = 50
+
+
+def _normalize(text: str) -> str:
+    """合并空白，避免只有空格、换行不同的输入重复调用"""
+    return " ".join((text or "").split())
+
+
+def cache_key(prompt_version: str, model: str, messages: Iterable[Any]) -> str:
+    """(提示词模板版本, 模型, 规范化后的消息) 的SHA-256"""
+    normalized = [[type(m).__name__, _normalize(m.content)] for m in messages]
+    raw = json.dumps([prompt_version, model, normalized], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """LLM回复的SQLite缓存
+
+    - 相同提示词模板版本、模型和输入文本的调用直接返回缓存的回复
+    - 总大小超过上限时按最近访问时间淘汰，总大小在内存中维护
+    - 命中只更新内存中的访问时间，批量写回，读路径不提交事务
+    - 记录本进程内的命中/未命中次数
+    - aget/aput在线程池中执行，不阻塞事件循环
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = Path(path or settings.llm_cache_path)
+        self.max_bytes = max_bytes or settings.llm_cache_max_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._touches: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """首次使用时创建目录和缓存库，并读取当前总大小"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()[0]
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """取缓存的回复，同时记录访问时间和命中统计"""
+        with self._lock:
+            row = self.conn.execute("SELECT content FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touches[key] = time.time()
+            if len(self._touches) >= TOUCH_FLUSH_SIZE:
+                self._flush_touches()
+                self.conn.commit()
+            return row[0]
+
+    def put(self, key: str, model: str, content: str) -> None:
+        """写入一次回复"""
+        now = time.time()
+        size = len(content.encode('utf-8'))
+        with self._lock:
+            conn = self.conn
+            previous = conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, content, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, size, now, now)
+            )
+            self._touches.pop(key, None)
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._flush_touches()
+            self._evict()
+            conn.commit()
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, model: str, content: str) -> None:
+        await asyncio.to_thread(self.put, key, model, content)
+
+    def stats(self) -> Dict[str, Any]:
+        """条目数、总大小和命中率"""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            total = self._total_bytes
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'total_bytes': total,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    def _flush_touches(self) -> None:
+        """把内存中的访问时间写回（调用方持有锁并负责提交）"""
+        if self._touches:
+            self.conn.executemany(
+                "UPDATE llm_responses SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touches.items()]
+            )
+            self._touches.clear()
+
+    def _evict(self) -> None:
+        """超过大小上限时按最近访问时间淘汰（调用方持有锁并负责提交）"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        conn = self.conn
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM llm_responses ORDER BY last_access").fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached LLM responses, cache size now {self._total_bytes / 1024 / 1024:.1f} MB")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._flush_touches()
+                self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+
+# 全局LLM缓存（首次使用时才创建文件）
+llm_cache = LLMCache()
@@ -0,0 +1,242 @@
+"""
+Per-host politeness: token buckets, robots.txt cache and 429/503 backoff
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 需要退避重试的状态码
+BACKOFF_STATUSES = {429, 503}
+# robots.txt获取失败（网络错误或5xx）时，按允许抓取处理并提前重试
+ROBOTS_ERROR_TTL_SECONDS = 300
+
+
+class RobotsDisallowedError(Exception):
+    """robots.txt禁止抓取该URL"""
+
+
+class TokenBucket:
+    """令牌桶：平均每秒rate个请求，最多突发capacity个
+
+    reserve() 不休眠，只返回需要等待的秒数；令牌可以预支为负数，
+    因此并发调用者会依次排队，而不是同时醒来。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """预订一个令牌，返回需要等待的秒数"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def set_rate(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+
+
+@dataclass
+class HostState:
+    """单个站点的礼貌抓取状态"""
+    bucket: TokenBucket
+    robots: Optional[RobotFileParser] = None
+    robots_expires_at: float = 0.0
+    blocked_until: float = 0.0
+    failures: int = 0
+    crawl_delay: Optional[float] = None
+    robots_lock: Optional[asyncio.Lock] = None
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """解析Retry-After头（秒数或HTTP日期），返回等待秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+def _header(headers: Optional[Mapping[str, str]], name: str) -> Optional[str]:
+    if not headers:
+        return None
+    return headers.get(name) or headers.get(name.lower())
+
+
+class PolitenessScheduler:
+    """所有抓取请求前的站点礼貌调度
+
+    - 每个站点一个令牌桶，不同站点之间互不阻塞
+    - 缓存并定期刷新robots.txt，遵守Disallow和Crawl-delay
+    - 429/503时按Retry-After（或指数退避）暂停该站点
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        robots_ttl: Optional[int] = None,
+        respect_robots: Optional[bool] = None,
+        user_agent: Optional[str] = None,
+        max_backoff: Optional[float] = None,
+    ):
+        self.rate = rate or settings.politeness_requests_per_second
+        self.burst = burst or settings.politeness_burst
+        self.robots_ttl = robots_ttl or settings.robots_cache_ttl_seconds
+        self.respect_robots = settings.robots_respect if respect_robots is None else respect_robots
+        self.user_agent = user_agent or settings.robots_user_agent
+        self.max_backoff = max_backoff or settings.politeness_max_backoff_seconds
+        self._hosts: Dict[str, HostState] = {}
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme or 'http'}://{(parsed.netloc or '').lower()}"
+
+    def _state(self, url: str) -> HostState:
+        key = self.host_key(url)
+        state = self._hosts.get(key)
+        if state is None:
+            state = HostState(bucket=TokenBucket(self.rate, self.burst))
+            self._hosts[key] = state
+        return state
+
+    def robots_url_if_stale(self, url: str) -> Optional[str]:
+        """robots.txt未缓存或已过期时返回其URL"""
+        if not self.respect_robots:
+            return None
+        if self._state(url).robots_expires_at > time.time():
+            return None
+        return f"{self.host_key(url)}/robots.txt"
+
+    def update_robots(self, url: str, status: int, text: str = '') -> None:
+        """缓存robots.txt；4xx视为无限制，网络错误和5xx视为无限制并提前重试"""
+        state = self._state(url)
+        parser = RobotFileParser()
+        if 200 <= status < 300:
+            parser.parse(text.splitlines())
+            ttl = self.robots_ttl
+        else:
+            parser.parse([])
+            ttl = self.robots_ttl if 400 <= status < 500 else ROBOTS_ERROR_TTL_SECONDS
+        state.robots = parser
+        state.robots_expires_at = time.time() + ttl
+
+        crawl_delay = parser.crawl_delay(self.user_agent)
+        request_rate = parser.request_rate(self.user_agent)
+        if request_rate and request_rate.requests:
+            crawl_delay = max(crawl_delay or 0, request_rate.seconds / request_rate.requests)
+        state.crawl_delay = float(crawl_delay) if crawl_delay else None
+        if state.crawl_delay:
+            # Crawl-delay比默认速率更严格时，降低该站点速率并取消突发
+            state.bucket.set_rate(min(self.rate, 1 / state.crawl_delay), 1)
+        else:
+            state.bucket.set_rate(self.rate, self.burst)
+
+    def reserve(self, url: str) -> float:
+        """检查robots规则并预订一个请求配额，返回需要等待的秒数"""
+        state = self._state(url)
+        if self.respect_robots and state.robots is not None and not state.robots.can_fetch(self.user_agent, url):
+            raise RobotsDisallowedError(f"robots.txt disallows {url}")
+        delay = state.bucket.reserve()
+        blocked = state.blocked_until - time.time()
+        return max(delay, blocked, 0.0)
+
+    def report(self, url: str, status: int, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """记录响应结果；429/503时暂停该站点并返回退避秒数"""
+        state = self._state(url)
+        if status not in BACKOFF_STATUSES:
+            if status < 400:
+                state.failures = 0
+            return None
+
+        state.failures += 1
+        backoff = parse_retry_after(_header(headers, 'Retry-After'))
+        if backoff is None:
+            backoff = min(self.max_backoff, 2 ** state.failures)
+        backoff = min(backoff, self.max_backoff)
+        state.blocked_until = max(state.blocked_until, time.time() + backoff)
+        logger.warning(f"{self.host_key(url)} returned {status}, backing off {backoff:.0f}s")
+        return backoff
+
+    async def wait(self, url: str, fetch_robots: Callable[[str], Awaitable[Tuple[int, str]]]) -> None:
+        """异步等待轮到该站点（按需先获取robots.txt）"""
+        if self.robots_url_if_stale(url):
+            state = self._state(url)
+            if state.robots_lock is None:
+                state.robots_lock = asyncio.Lock()
+            # 同一站点的并发请求只获取一次robots.txt
+            async with state.robots_lock:
+                robots_url = self.robots_url_if_stale(url)
+                if robots_url:
+                    status, text = await fetch_robots(robots_url)
+                    self.update_robots(url, status, text)
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_sync(self, url: str, fetch_robots: Callable[[str], Tuple[int, str]]) -> None:
+        """同步版本，供脚本中的requests爬虫使用"""
+        robots_url = self.robots_url_if_stale(url)
+        if robots_url:
+            status, text = fetch_robots(robots_url)
+            self.update_robots(url, status, text)
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class PoliteSession(requests.Session):
+    """遵守站点礼貌策略的requests会话，429/503时自动退避重试"""
+
+    def __init__(self, scheduler: Optional[PolitenessScheduler] = None, max_retries: Optional[int] = None):
+        super().__init__()
+        self.scheduler = scheduler or politeness
+        self.max_retries = settings.http_max_retries if max_retries is None else max_retries
+
+    def request(self, method, url, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.scheduler.wait_sync(url, self._fetch_robots)
+            response = super().request(method, url, *args, **kwargs)
+            backoff = self.scheduler.report(url, response.status_code, response.headers)
+            if backoff is None or attempt == self.max_retries:
+                return response
+        return response
+
+    def _fetch_robots(self, robots_url: str) -> Tuple[int, str]:
+        try:
+            response = super().request('GET', robots_url, timeout=10)
+            return response.status_code, response.text
+        except requests.RequestException as e:
+            logger.debug(f"Failed to fetch {robots_url}: {e}")
+            return 0, ''
+
+
+# 全局礼貌调度器，所有抓取共用
+politeness = PolitenessScheduler()
@@ -0,0 +1,255 @@
+"""
+Content-addressed, compressed on-disk cache of fetched responses
+"""
+import asyncio
+import calendar
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.url_canonical import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    canonical_url TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_canonical_url ON responses (canonical_url, fetched_at);
+CREATE INDEX IF NOT EXISTS ix_responses_digest ON responses (digest);
+"""
+
+# 读取时的访问时间先记在内存中，攒够这么多条（或写入时）再批量提交
+TOUCH_FLUSH_SIZE = 50
+
+
+class CacheMissError(Exception):
+    """回放模式下响应缓存中没有该URL"""
+
+
+@dataclass
+class CachedResponse:
+    """缓存中的一次响应"""
+    url: str
+    status: int
+    body: bytes = field(repr=False)
+    headers: Dict[str, str]
+    fetched_at: datetime
+    digest: str
+
+
+def _to_timestamp(value: datetime) -> float:
+    """不带时区的时间按UTC处理，与数据库中的时间一致"""
+    if value.tzinfo is not None:
+        return value.timestamp()
+    return calendar.timegm(value.timetuple()) + value.microsecond / 1e6
+
+
+class ResponseCache:
+    """原始响应的磁盘缓存
+
+    - 响应体按SHA-256内容寻址、gzip压缩，存放在 objects/ab/<digest>.gz，相同内容只存一份
+    - SQLite索引记录 规范化URL + 抓取时间 -> 响应体，同一URL保留多次抓取的历史
+    - 总大小超过上限时按最近访问时间淘汰响应体及其索引，总大小在内存中维护
+    - 读取只更新内存中的访问时间，批量写回，读路径不提交事务
+    - astore/alookup在线程池中执行压缩、文件读写和SQLite操作，不阻塞事件循环
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or settings.response_cache_dir)
+        self.max_bytes = max_bytes or settings.response_cache_max_mb * 1024 * 1024
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._touches: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """首次使用时创建目录和索引库，并读取当前总大小"""
+        if self._conn is None:
+            (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.root / 'index.sqlite'), check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        return self._conn
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / 'objects' / digest[:2] / f"{digest}.gz"
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        fetched_at: Optional[datetime] = None
+    ) -> str:
+        """写入一次响应，返回响应体摘要"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        fetched = _to_timestamp(fetched_at) if fetched_at else time.time()
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_bytes(gzip.compress(body))
+                os.replace(tmp_path, path)
+            size = path.stat().st_size
+            conn = self.conn
+            if conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone() is None:
+                self._total_bytes += size
+            self._touches.pop(digest, None)
+            conn.execute(
+                "INSERT INTO blobs (digest, size, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access",
+                (digest, size, time.time())
+            )
+            conn.execute(
+                "INSERT INTO responses (canonical_url, url, fetched_at, status, headers, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (canonicalize_url(url), url, fetched, status, json.dumps(dict(headers or {})), digest)
+            )
+            self._flush_touches()
+            self._evict()
+            conn.commit()
+        return digest
+
+    async def astore(
+        self,
+        url: str,
+        body: bytes,
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None
+    ) -> str:
+        return await asyncio.to_thread(self.store, url, body, status, headers)
+
+    async def alookup(self, url: str, before: Optional[datetime] = None) -> Optional[CachedResponse]:
+        return await asyncio.to_thread(self.lookup, url, before)
+
+    def lookup(self, url: str, before: Optional[datetime] = None) -> Optional[CachedResponse]:
+        """取该URL最近一次（或指定时间之前最近一次）缓存的响应"""
+        query = ("SELECT url, status, headers, fetched_at, digest FROM responses "
+                 "WHERE canonical_url = ?")
+        params: List = [canonicalize_url(url)]
+        if before is not None:
+            query += " AND fetched_at <= ?"
+            params.append(_to_timestamp(before))
+        query += " ORDER BY fetched_at DESC, id DESC LIMIT 1"
+        with self._lock:
+            row = self.conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            return self._load(row)
+
+    def contains(self, url: str) -> bool:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT 1 FROM responses WHERE canonical_url = ? LIMIT 1", (canonicalize_url(url),)
+            ).fetchone() is not None
+
+    def history(self, url: str) -> List[Tuple[datetime, str]]:
+        """该URL的所有缓存记录：(抓取时间, 摘要)，按时间先后"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT fetched_at, digest FROM responses WHERE canonical_url = ? ORDER BY fetched_at, id",
+                (canonicalize_url(url),)
+            ).fetchall()
+        return [(datetime.utcfromtimestamp(fetched_at), digest) for fetched_at, digest in rows]
+
+    def iter_latest(self) -> Iterator[CachedResponse]:
+        """遍历每个URL最近一次缓存的响应，供离线重新提取使用"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, status, headers, fetched_at, digest FROM responses r "
+                "WHERE id = (SELECT id FROM responses WHERE canonical_url = r.canonical_url "
+                "ORDER BY fetched_at DESC, id DESC LIMIT 1) ORDER BY canonical_url"
+            ).fetchall()
+        for row in rows:
+            with self._lock:
+                response = self._load(row)
+            if response is not None:
+                yield response
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            self.conn  # 打开索引库时读取总大小
+            return self._total_bytes
+
+    def _load(self, row) -> Optional[CachedResponse]:
+        """读取并解压响应体，记录访问时间（调用方持有锁）"""
+        url, status, headers, fetched_at, digest = row
+        try:
+            body = gzip.decompress(self._blob_path(digest).read_bytes())
+        except (OSError, EOFError) as e:
+            logger.warning(f"Cached body {digest} for {url} is unreadable: {e}")
+            return None
+        self._touches[digest] = time.time()
+        if len(self._touches) >= TOUCH_FLUSH_SIZE:
+            self._flush_touches()
+            self.conn.commit()
+        return CachedResponse(
+            url=url,
+            status=status,
+            body=body,
+            headers=json.loads(headers or '{}'),
+            fetched_at=datetime.utcfromtimestamp(fetched_at),
+            digest=digest,
+        )
+
+    def _flush_touches(self) -> None:
+        """把内存中的访问时间写回（调用方持有锁并负责提交）"""
+        if self._touches:
+            self.conn.executemany(
+                "UPDATE blobs SET last_access = ? WHERE digest = ?",
+                [(accessed, digest) for digest, accessed in self._touches.items()]
+            )
+            self._touches.clear()
+
+    def _evict(self) -> None:
+        """超过大小上限时按最近访问时间淘汰（调用方持有锁并负责提交）"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        conn = self.conn
+        evicted = 0
+        for digest, size in conn.execute("SELECT digest, size FROM blobs ORDER BY last_access").fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._blob_path(digest).unlink(missing_ok=True)
+            conn.execute("DELETE FROM responses WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._total_bytes -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached responses, cache size now {self._total_bytes / 1024 / 1024:.1f} MB")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._flush_touches()
+                self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+
+# 全局响应缓存（首次使用时才创建目录）
+response_cache = ResponseCache()
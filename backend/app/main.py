@@ -8,6 +8,7 @@ from app.core.config import settings
 from app.core.logging import setup_logging
 from app.api.news import router as news_router
 from app.api.ai import router as ai_router
+from app.services.ai_processor import lmstudio_llm
 
 # Setup logging
 setup_logging()
@@ -35,6 +36,12 @@ app.include_router(news_router, prefix=settings.api_prefix)
 app.include_router(ai_router, prefix=settings.api_prefix)
 
 
+@app.on_event("shutdown")
+async def close_llm_client():
+    """关闭LLM连接池"""
+    await lmstudio_llm.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -1,10 +1,12 @@
 """
 Database models
 """
-from .news import NewsArticle, NewsSource
+from .news import CrawlFrontierItem, CrawlRun, NewsArticle, NewsSource
 from .user import UserPreference, SystemConfig
 
 __all__ = [
+    "CrawlFrontierItem",
+    "CrawlRun",
     "NewsArticle",
     "NewsSource", 
     "UserPreference",
@@ -4,7 +4,7 @@ News-related database models
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, Boolean
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -21,6 +21,32 @@ class NewsSource(Base):
     category = Column(String(100), nullable=True)  # 政治、科技、财经、军事等
     weight = Column(Float, default=1.0)  # 权重，用于排序
     is_active = Column(Boolean, default=True)
+    
+    # 条件请求状态，用于跳过未变化的feed/页面
+    http_etag = Column(String(255), nullable=True)  # 上次响应的ETag
+    http_last_modified = Column(String(100), nullable=True)  # 上次响应的Last-Modified
+    content_hash = Column(String(64), nullable=True)  # 上次响应体的SHA-256
+    
+    # RSS高水位，只处理更新的条目
+    feed_last_published = Column(DateTime, nullable=True)  # 已处理条目的最新发布时间（UTC）
+    feed_recent_guids = Column(Text, nullable=True)  # 最近出现过的条目GUID（JSON数组）
+    
+    # 自适应抓取频率
+    publish_rate = Column(Float, nullable=True)  # 新文章发布速率（篇/小时，EWMA）
+    last_crawled_at = Column(DateTime, nullable=True)
+    next_crawl_at = Column(DateTime, nullable=True, index=True)
+    
+    # 健康状态与熔断
+    consecutive_failures = Column(Integer, default=0)  # 连续失败次数
+    last_success_at = Column(DateTime, nullable=True)
+    last_failure_at = Column(DateTime, nullable=True)
+    last_error = Column(String(500), nullable=True)
+    latency_p50_ms = Column(Float, nullable=True)  # 最近N次抓取耗时中位数
+    latency_p95_ms = Column(Float, nullable=True)
+    latency_samples = Column(Text, nullable=True)  # 最近N次抓取耗时（JSON数组，毫秒）
+    circuit_state = Column(String(20), default='closed')  # closed / open / half_open
+    circuit_open_until = Column(DateTime, nullable=True)  # 熔断冷却期结束时间
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -57,6 +83,9 @@ class NewsArticle(Base):
     
     # 其他字段
     source_url = Column(String(500), nullable=False, unique=True)
+    canonical_url = Column(String(500), nullable=True, index=True)  # 规范化URL，用于去重
+    simhash = Column(String(16), nullable=True)  # 标题+正文的SimHash指纹（十六进制）
+    story_cluster_id = Column(Integer, nullable=True, index=True)  # 近似重复故事簇，值为代表文章ID
     source_id = Column(Integer, ForeignKey("news_sources.id"), nullable=False)
     source_name = Column(String(255), nullable=False)  # 冗余字段，便于查询
     publish_time = Column(DateTime, nullable=True)
@@ -74,4 +103,48 @@ class NewsArticle(Base):
         return f"<NewsArticle(id={self.id}, title='{self.original_title[:50]}...')>"
 
 
+class CrawlFrontierItem(Base):
+    """抓取队列表 - 待抓取的新闻源和文章，支持中断后续抓及多进程共享"""
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (UniqueConstraint('kind', 'url', name='uq_crawl_frontier_kind_url'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # 'source'（列表页/feed）或 'article'（文章正文）
+    url = Column(String(500), nullable=False)
+    source_id = Column(Integer, ForeignKey("news_sources.id"), nullable=True, index=True)
+    payload = Column(Text, nullable=True)  # 文章数据JSON，续抓时无需重新解析列表页
+    state = Column(String(20), nullable=False, default='pending', index=True)  # pending/in_flight/done/failed
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_owner = Column(String(100), nullable=True)  # 持有租约的抓取进程
+    lease_expires_at = Column(DateTime, nullable=True)  # 租约过期后其他进程可接手
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CrawlFrontierItem(id={self.id}, kind='{self.kind}', state='{self.state}', url='{self.url}')>"
+
+
+class CrawlRun(Base):
+    """抓取运行记录表 - 每次抓取的分阶段耗时、下载流量和缓存命中率"""
+    __tablename__ = "crawl_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    total_sources = Column(Integer, default=0)
+    success_count = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+    new_articles = Column(Integer, default=0)
+    bytes_downloaded = Column(Integer, default=0)
+    stages = Column(Text, nullable=True)  # 各阶段耗时统计和直方图（JSON）
+    cache = Column(Text, nullable=True)  # 各类缓存命中率（JSON）
+    counters = Column(Text, nullable=True)  # 原始计数（JSON）
+    sources = Column(Text, nullable=True)  # 各新闻源分阶段耗时和字节数（JSON）
+
+    def __repr__(self):
+        return f"<CrawlRun(id={self.id}, started_at='{self.started_at}', new_articles={self.new_articles})>"
+
+
 # ProcessedContent 模型已移除 
\ No newline at end of file
@@ -2,80 +2,256 @@
 AI processing service for news content
 """
 import asyncio
+import json
 import logging
+import re
 import time
-from typing import Dict, List, Optional, Any, Protocol
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Any, Protocol
 from datetime import datetime
 
+import aiohttp
 from langchain_deepseek import ChatDeepSeek
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-import requests
 
 from app.core.config import settings
+from app.core.llm_cache import LLMCache, cache_key, llm_cache
 from app.services.news_service import NewsRepository
 from app.models.news import NewsArticle
 
 logger = logging.getLogger(__name__)
 
+# 近似重复文章从代表文章复制的AI处理字段
+CLUSTER_REUSED_FIELDS = (
+    'summary_zh',
+    'detailed_summary_zh',
+    'translated_title',
+    'translated_content',
+    'quality_score',
+    'is_processed',
+    'is_title_translated',
+    'is_content_translated',
+    'translation_quality_score',
+)
+
+# 提示词模板版本，修改提示词后递增，使LLM缓存中的旧回复失效
+PROMPT_VERSION = "1"
+
+# 合并处理一次返回的字段及其最短有效长度，与单独调用时的校验一致
+COMBINED_FIELDS = {
+    'summary_zh': 20,
+    'translated_title': 5,
+    'translated_content': 20,
+}
+
 
 class LLMBackend(Protocol):
     async def ainvoke(self, messages: list) -> Any:
         ...
 
+@dataclass
+class LLMResponse:
+    """LLM回复，与langchain消息一样通过 .content 取文本"""
+    content: str
+
+
 class LMStudioLLM:
-    """本地LM Studio LLM实现"""
-    def __init__(self, api_url: str = "http://127.0.0.1:1234/v1/chat/completions"):
-        self.api_url = api_url
+    """本地LM Studio LLM实现（OpenAI兼容接口）
 
-    async def ainvoke(self, messages: list) -> Any:
+    使用连接池化的aiohttp会话（keep-alive），调用期间不阻塞事件循环；
+    调用方取消任务时请求随之中断。
+    未配置模型时从/v1/models读取当前加载的模型，切换模型后LLM缓存不会返回旧模型的回复。
+    """
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        model: Optional[str] = None
+    ):
+        self.api_url = api_url or settings.lmstudio_api_url
+        self.models_url = re.sub(r'/chat/completions/?$', '/models', self.api_url)
+        self.model = model or settings.lmstudio_model or None
+        self._loaded_model: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+        self.timeout = timeout or settings.llm_timeout_seconds
+        self.pool_size = pool_size or settings.llm_pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """获取会话，首次使用或事件循环变化时创建"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=settings.http_keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._loop = loop
+        return self._session
+
+    async def ainvoke(self, messages: list) -> LLMResponse:
         # 转换为OpenAI格式
         payload = {
-            "model": "lmstudio",
+            "model": self.model or "lmstudio",
             "messages": [
                 {"role": "system", "content": m.content} if isinstance(m, SystemMessage) else {"role": "user", "content": m.content}
                 for m in messages
             ],
             "temperature": 0.1,
-            "max_tokens": 800
+            "max_tokens": settings.llm_max_tokens
         }
+        # asyncio.CancelledError不是Exception子类，取消时直接向上传递
         try:
-            resp = requests.post(self.api_url, json=payload, timeout=30)
-            resp.raise_for_status()
-            result = resp.json()
-            content = result["choices"][0]["message"]["content"]
-            class Resp: pass
-            r = Resp(); r.content = content
-            return r
+            async with self.session.post(self.api_url, json=payload) as resp:
+                resp.raise_for_status()
+                result = await resp.json(content_type=None)
+            return LLMResponse(content=result["choices"][0]["message"]["content"])
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"LM Studio调用超时（{self.timeout}秒）")
         except Exception as e:
             raise RuntimeError(f"LM Studio调用失败: {e}")
 
+    async def model_id(self) -> Optional[str]:
+        """当前模型标识：优先使用配置的模型，否则读取/v1/models（缓存lmstudio_model_ttl_seconds秒），读取失败返回None"""
+        if self.model:
+            return self.model
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at > settings.lmstudio_model_ttl_seconds:
+            try:
+                async with self.session.get(self.models_url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                    resp.raise_for_status()
+                    result = await resp.json(content_type=None)
+                self._loaded_model = ",".join(sorted(m["id"] for m in result.get("data", []))) or None
+            except Exception as e:
+                logger.warning(f"Failed to read LM Studio models from {self.models_url}: {e}")
+                self._loaded_model = None
+            self._loaded_at = now
+        return self._loaded_model
+
+    async def close(self) -> None:
+        """关闭会话及连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
 class DeepSeekLLM:
     """DeepSeek LLM实现（兼容langchain_deepseek）"""
     def __init__(self, api_key: str, model: str = "deepseek-chat"):
-        self.llm = ChatDeepSeek(api_key=api_key, model=model, temperature=0.1, max_tokens=800)
+        self.model = model
+        self.llm = ChatDeepSeek(api_key=api_key, model=model, temperature=0.1, max_tokens=settings.llm_max_tokens)
     async def ainvoke(self, messages: list) -> Any:
         return await self.llm.ainvoke(messages)
 
 
+# 每个LLM后端一个并发信号量，所有AIProcessor（API请求、定时任务）共享，
+# 同时进行的调用数不超过后端的处理能力
+_backend_semaphores: 'weakref.WeakKeyDictionary[Any, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+
+
+def backend_semaphore(llm: Any, concurrency: Optional[int] = None) -> asyncio.Semaphore:
+    """获取LLM后端共享的并发信号量，首次获取时按concurrency（默认llm_concurrency）创建"""
+    semaphore = _backend_semaphores.get(llm)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(concurrency or settings.llm_concurrency)
+        _backend_semaphores[llm] = semaphore
+    return semaphore
+
+
+NUMBERED_LINE = re.compile(r"^\s*(\d+)\s*[.、．:：)）]\s*(.*?)\s*$")
+
+
+def parse_numbered_list(text: str, count: int) -> Dict[int, str]:
+    """解析编号列表回复，返回 编号(从1开始) -> 内容
+
+    超出范围的编号忽略；同一编号出现多次视为错位，该编号的结果全部丢弃。
+    """
+    items: Dict[int, str] = {}
+    duplicated = set()
+    for line in (text or "").splitlines():
+        match = NUMBERED_LINE.match(line)
+        if not match:
+            continue
+        number, value = int(match.group(1)), match.group(2).strip().strip('"“”')
+        if not 1 <= number <= count:
+            continue
+        if number in items:
+            duplicated.add(number)
+        items[number] = value
+    return {number: value for number, value in items.items() if number not in duplicated}
+
+
+def parse_combined_response(text: str) -> Dict[str, str]:
+    """解析合并处理的JSON回复，只返回通过校验的字段
+
+    允许回复包在```json代码块中或前后带说明文字；字段缺失、不是字符串或过短时丢弃该字段。
+    """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    fields = {}
+    for field, min_length in COMBINED_FIELDS.items():
+        value = data.get(field)
+        if isinstance(value, str) and len(value.strip()) > min_length:
+            fields[field] = value.strip()
+    return fields
+
+
+def _is_score(text: str) -> bool:
+    """质量评估回复是否为数字评分"""
+    try:
+        float(text.strip())
+        return True
+    except ValueError:
+        return False
+
+
 class AIProcessor:
     """AI内容处理器"""
     
-    def __init__(self, repo: NewsRepository, llm: LLMBackend = None):
+    def __init__(
+        self,
+        repo: NewsRepository,
+        llm: LLMBackend = None,
+        concurrency: Optional[int] = None,
+        combined: Optional[bool] = None,
+        cache: Optional[LLMCache] = None
+    ):
         self.repo = repo
+        if cache is None and settings.llm_cache_enabled:
+            cache = llm_cache
+        self.cache = cache
+        self.cache_hits = 0
+        self.combined = settings.ai_combined_processing if combined is None else combined
+        self.api_calls = 0
         # 优先本地LM Studio，不可用时自动切换DeepSeek
         if llm is not None:
             self.llm = llm
         else:
             try:
-                self.llm = LMStudioLLM()
+                self.llm = lmstudio_llm
                 # 移除有问题的异步测试，改为简单的同步检查
                 logger.info("使用本地LM Studio")
             except Exception as e:
                 logger.warning(f"本地LM Studio不可用，切换到DeepSeek: {e}")
-                from app.core.config import settings
                 self.llm = DeepSeekLLM(api_key=settings.deepseek_api_key)
                 logger.info("使用DeepSeek LLM")
+        # 同时进行的LLM调用数由后端共享的信号量限制
+        self.semaphore = backend_semaphore(self.llm, concurrency)
         # 减少文本长度，提高处理速度
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1500,  # 减少chunk大小
@@ -83,62 +259,141 @@ class AIProcessor:
             length_function=len,
         )
     
-    async def process_articles(self, limit: int = 10) -> Dict[str, int]:
-        """批量处理未处理的文章"""
-        # 获取未处理的文章
+    async def process_articles(self, limit: int = 10) -> Dict[str, Any]:
+        """批量处理未处理的文章
+
+        多篇文章并发处理，同时进行的LLM调用数由信号量限制。
+        故事簇的代表文章先处理，近似重复文章随后直接复用其结果。
+        """
+        start_time = time.perf_counter()
         unprocessed_articles = self.repo.get_unprocessed_articles(limit)
         
         results = {
             'total_articles': len(unprocessed_articles),
             'success_count': 0,
             'error_count': 0,
-            'api_calls': 0
+            'api_calls': 0,
+            'reused_count': 0
         }
+        self.api_calls = 0
+        self.cache_hits = 0
         
-        for article in unprocessed_articles:
-            try:
-                logger.info(f"Processing article: {article.title[:50]}...")
-                
-                # 处理单篇文章
-                success = await self.process_single_article(article)
-                
-                if success:
+        representatives = [a for a in unprocessed_articles if not self._is_cluster_duplicate(a)]
+        duplicates = [a for a in unprocessed_articles if self._is_cluster_duplicate(a)]
+        for batch in (representatives, duplicates):
+            outcomes = await asyncio.gather(*[self._process_listed_article(a) for a in batch])
+            for outcome in outcomes:
+                results[f"{outcome}_count"] += 1
+                if outcome == 'reused':
                     results['success_count'] += 1
-                    results['api_calls'] += 3  # 摘要、翻译、质量评估各一次
-                else:
-                    results['error_count'] += 1
-                
-                # 减少延迟，提高处理速度
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                logger.error(f"Error processing article {article.id}: {e}")
-                results['error_count'] += 1
         
+        elapsed = time.perf_counter() - start_time
+        results['api_calls'] = self.api_calls
+        results['cache_hits'] = self.cache_hits
+        results['elapsed_seconds'] = round(elapsed, 2)
+        results['articles_per_minute'] = round(results['success_count'] / elapsed * 60, 1) if elapsed > 0 else 0.0
+        logger.info(
+            f"Processed {results['success_count']}/{results['total_articles']} articles in {elapsed:.1f}s "
+            f"({results['articles_per_minute']} articles/min, {self.api_calls} LLM calls, {self.cache_hits} cache hits)"
+        )
         return results
     
+    async def _process_listed_article(self, article: NewsArticle) -> str:
+        """处理批量中的一篇文章，返回 'success' / 'reused' / 'error'"""
+        try:
+            logger.info(f"Processing article: {article.original_title[:50]}...")
+            if self._reuse_cluster_result(article):
+                return 'reused'
+            return 'success' if await self.process_single_article(article) else 'error'
+        except Exception as e:
+            logger.error(f"Error processing article {article.id}: {e}")
+            return 'error'
+    
+    async def _model_id(self) -> Optional[str]:
+        """LLM缓存键中的模型标识；后端无法确定当前模型时返回None，此时不使用缓存"""
+        resolve = getattr(self.llm, 'model_id', None)
+        if resolve is not None:
+            return await resolve()
+        return getattr(self.llm, 'model', type(self.llm).__name__)
+    
+    async def _invoke(self, messages: list, refresh: bool = False,
+                      accept: Optional[Callable[[str], bool]] = None) -> Any:
+        """调用LLM，先查LLM缓存；实际调用受并发信号量限制
+
+        accept为调用方对回复的校验：只有通过校验的回复才写入缓存，
+        缓存中未通过校验的回复视为未命中，重新调用并覆盖。
+        refresh为True时跳过缓存读取，重新调用（用于重试缓存中不完整的回复）
+        """
+        key = None
+        model = await self._model_id() if self.cache is not None else None
+        if model is not None:
+            key = cache_key(PROMPT_VERSION, model, messages)
+            content = None if refresh else await self.cache.aget(key)
+            if content is not None and (accept is None or accept(content)):
+                self.cache_hits += 1
+                return LLMResponse(content=content)
+        async with self.semaphore:
+            self.api_calls += 1
+            response = await self.llm.ainvoke(messages)
+        if key is not None and isinstance(response.content, str) and (accept is None or accept(response.content)):
+            await self.cache.aput(key, model, response.content)
+        return response
+    
+    @staticmethod
+    def _is_cluster_duplicate(article: NewsArticle) -> bool:
+        """文章是否属于其他代表文章的故事簇"""
+        return article.story_cluster_id is not None and article.story_cluster_id != article.id
+    
+    def _reuse_cluster_result(self, article: NewsArticle) -> bool:
+        """近似重复文章复用代表文章的AI处理结果，成功时返回True"""
+        if not self._is_cluster_duplicate(article):
+            return False
+        representative = self.repo.get_article_by_id(article.story_cluster_id)
+        if (
+            not representative
+            or not representative.is_processed
+            or representative.original_language != article.original_language
+        ):
+            return False
+        
+        self.repo.update_article(article.id, {
+            field: getattr(representative, field)
+            for field in CLUSTER_REUSED_FIELDS
+        })
+        logger.info(f"Reused AI results of article {representative.id} for near-duplicate {article.id}")
+        return True
+    
     async def process_single_article(self, article: NewsArticle) -> bool:
         """处理单篇文章"""
         try:
-            start_time = time.time()
-            # 1. 生成中文摘要
-            summary_zh = await self._generate_summary_zh(article.original_content)
+            # 1. 英文文章优先一次调用同时生成摘要和翻译，解析失败的字段再单独调用
+            is_english = article.original_language == 'en'
+            combined = {}
+            if is_english and article.original_title and self.combined:
+                combined = await self._process_combined(article)
+            # 2. 其余需要的字段（摘要、标题翻译、正文翻译）互不依赖，并发单独调用
+            generators = {'summary_zh': lambda: self._generate_summary_zh(article.original_content)}
+            if not article.is_processed and article.is_title_translated and article.translated_title:
+                # 标题已由批量标题翻译完成
+                combined['translated_title'] = article.translated_title
+            elif is_english and article.original_title:
+                generators['translated_title'] = lambda: self._translate_title_to_chinese(article.original_title)
+            if is_english:
+                generators['translated_content'] = lambda: self._translate_to_chinese(article.original_content)
+            missing = [field for field in generators if field not in combined]
+            values = await asyncio.gather(*[generators[field]() for field in missing])
+            fields = {**combined, **dict(zip(missing, values))}
+            summary_zh = fields['summary_zh']
+            translated_title = fields.get('translated_title')
+            translation_zh = fields.get('translated_content')
             if not summary_zh:
                 logger.error(f"Failed to generate Chinese summary for article {article.id}")
                 return False
-            # 2. 生成详细摘要（可选，或与summary_zh一致）
+            # 3. 生成详细摘要（可选，或与summary_zh一致）
             detailed_summary_zh = summary_zh
-            # 3. 翻译标题为中文（如原文为英文）
-            translated_title = None
-            if article.original_language == 'en' and article.original_title:
-                translated_title = await self._translate_title_to_chinese(article.original_title)
-            # 4. 翻译正文为中文（如原文为英文）
-            translation_zh = None
-            if article.original_language == 'en':
-                translation_zh = await self._translate_to_chinese(article.original_content)
-            # 5. 质量分数
+            # 4. 质量分数
             quality_score = 7.0
-            # 6. 保存到news_articles表
+            # 5. 保存到news_articles表
             update_data = {
                 'summary_zh': summary_zh,
                 'detailed_summary_zh': detailed_summary_zh,
@@ -171,6 +426,47 @@ class AIProcessor:
             logger.error(f"Error processing article {article_id}: {e}")
             return False
     
+    async def _process_combined(self, article: NewsArticle) -> Dict[str, str]:
+        """一次调用生成中文摘要、标题翻译和正文翻译，返回通过校验的字段"""
+        try:
+            content = article.original_content
+            if len(content) > 1500:
+                content = self.text_splitter.split_text(content)[0]
+            
+            system_prompt = """你是新闻编辑。根据给出的英文新闻标题和内容，返回一个JSON对象，包含以下字段：
+- summary_zh：简洁的中文摘要，控制在150字以内，突出核心信息
+- translated_title：标题的中文翻译，保持简洁明了
+- translated_content：内容的中文翻译，保持原意，使用流畅的中文表达
+只返回JSON，不要添加任何其他内容。"""
+
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=f"英文标题：{article.original_title}\n\n英文内容：\n\n{content}")
+            ]
+            
+            response = await self._invoke(
+                messages, accept=lambda text: len(self._parse_combined(text)) == len(COMBINED_FIELDS)
+            )
+            fields = self._parse_combined(response.content)
+            
+            missing = [field for field in COMBINED_FIELDS if field not in fields]
+            if missing:
+                logger.warning(f"Combined processing of article {article.id} missing {missing}, falling back")
+            return fields
+            
+        except Exception as e:
+            logger.error(f"Error in combined processing of article {article.id}: {e}")
+            return {}
+    
+    def _parse_combined(self, text: str) -> Dict[str, str]:
+        """解析合并回复，清理摘要后再次校验长度"""
+        fields = parse_combined_response(text)
+        if 'summary_zh' in fields:
+            fields['summary_zh'] = self._clean_summary(fields['summary_zh'])
+            if len(fields['summary_zh']) <= COMBINED_FIELDS['summary_zh']:
+                del fields['summary_zh']
+        return fields
+    
     async def _generate_summary_zh(self, content: str) -> Optional[str]:
         """生成中文摘要"""
         try:
@@ -186,7 +482,7 @@ class AIProcessor:
                 HumanMessage(content=f"新闻内容：\n\n{content}")
             ]
             
-            response = await self.llm.ainvoke(messages)
+            response = await self._invoke(messages, accept=self._is_valid_summary)
             summary = response.content.strip()
             
             # 清理摘要
@@ -213,7 +509,7 @@ class AIProcessor:
                 HumanMessage(content=f"News content:\n\n{content}")
             ]
             
-            response = await self.llm.ainvoke(messages)
+            response = await self._invoke(messages, accept=self._is_valid_summary)
             summary = response.content.strip()
             
             # 清理摘要
@@ -225,6 +521,87 @@ class AIProcessor:
             logger.error(f"Error generating English summary: {e}")
             return None
     
+    def _is_valid_summary(self, text: str) -> bool:
+        return len(self._clean_summary(text.strip())) > 20
+    
+    async def translate_titles(self, titles: List[str]) -> List[Optional[str]]:
+        """批量翻译英文标题，返回与输入对齐的中文标题（失败为None）
+
+        每次请求以编号列表发送至多title_batch_size个标题，多批并发；
+        回复中缺失或错位的标题在下一轮重新组批，最多重试title_batch_retries轮。
+        """
+        translations: List[Optional[str]] = [None] * len(titles)
+        pending = [i for i, title in enumerate(titles) if title]
+        batch_size = settings.title_batch_size
+        for attempt in range(settings.title_batch_retries + 1):
+            if not pending:
+                break
+            if attempt:
+                logger.info(f"Retrying translation of {len(pending)} titles (attempt {attempt + 1})")
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            outputs = await asyncio.gather(*[
+                self._translate_title_batch([titles[i] for i in batch], refresh=attempt > 0)
+                for batch in batches
+            ])
+            for batch, output in zip(batches, outputs):
+                for position, i in enumerate(batch, 1):
+                    translations[i] = output.get(position)
+            pending = [i for i in pending if translations[i] is None]
+        if pending:
+            logger.warning(f"Failed to translate {len(pending)} of {len(titles)} titles")
+        return translations
+    
+    async def _translate_title_batch(self, titles: List[str], refresh: bool = False) -> Dict[int, str]:
+        """一次请求翻译一批标题，返回 编号(从1开始) -> 通过校验的译文"""
+        try:
+            system_prompt = """将以下编号的英文新闻标题逐条翻译成中文，保持简洁明了。
+按相同编号逐行返回，每行格式为"编号. 中文标题"，不要遗漏、合并或添加任何其他内容。"""
+            numbered = "\n".join(f"{n}. {' '.join(title.split())}" for n, title in enumerate(titles, 1))
+
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=f"英文标题：\n{numbered}")
+            ]
+            
+            def parse(text: str) -> Dict[int, str]:
+                return {
+                    number: value for number, value in parse_numbered_list(text, len(titles)).items()
+                    if len(value) > COMBINED_FIELDS['translated_title']
+                }
+
+            # 只缓存每个编号都有合格译文的回复，不完整的批次由下一轮重新组批
+            response = await self._invoke(
+                messages, refresh=refresh, accept=lambda text: len(parse(text)) == len(titles)
+            )
+            return parse(response.content)
+            
+        except Exception as e:
+            logger.error(f"Error translating batch of {len(titles)} titles: {e}")
+            return {}
+    
+    async def translate_pending_titles(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """批量翻译尚未翻译标题的英文文章，先于完整AI处理让新标题尽快显示中文"""
+        start_time = time.perf_counter()
+        self.api_calls = 0
+        self.cache_hits = 0
+        articles = self.repo.get_untranslated_title_articles(limit or settings.title_batch_size)
+        translations = await self.translate_titles([a.original_title for a in articles])
+        
+        translated = 0
+        for article, translation in zip(articles, translations):
+            if translation:
+                self.repo.update_article(article.id, {'translated_title': translation, 'is_title_translated': True})
+                translated += 1
+        
+        return {
+            'total_titles': len(articles),
+            'translated_count': translated,
+            'failed_count': len(articles) - translated,
+            'api_calls': self.api_calls,
+            'cache_hits': self.cache_hits,
+            'elapsed_seconds': round(time.perf_counter() - start_time, 2),
+        }
+    
     async def _translate_title_to_chinese(self, title: str) -> Optional[str]:
         """翻译标题为中文"""
         try:
@@ -239,7 +616,7 @@ class AIProcessor:
             ]
             
             logger.info("调用LLM进行标题翻译...")
-            response = await self.llm.ainvoke(messages)
+            response = await self._invoke(messages, accept=lambda text: len(text.strip()) > 5)
             logger.info("标题翻译完成")
             
             translation = response.content.strip()
@@ -278,7 +655,7 @@ class AIProcessor:
             ]
             
             logger.info("调用LLM进行翻译...")
-            response = await self.llm.ainvoke(messages)
+            response = await self._invoke(messages, accept=lambda text: len(text.strip()) > 20)
             logger.info("LLM调用完成")
             
             translation = response.content.strip()
@@ -318,7 +695,7 @@ class AIProcessor:
                 HumanMessage(content=f"新闻内容：\n\n{content}")
             ]
             
-            response = await self.llm.ainvoke(messages)
+            response = await self._invoke(messages, accept=_is_score)
             score_text = response.content.strip()
             
             # 提取数字
@@ -372,4 +749,7 @@ class AIProcessor:
             return stats
         except Exception as e:
             logger.error(f"Error getting processing stats: {e}")
-            return {} 
\ No newline at end of file
+            return {} 
+
+# 全局本地LLM客户端，各处理器共享同一个连接池
+lmstudio_llm = LMStudioLLM()
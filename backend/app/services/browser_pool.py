@@ -0,0 +1,188 @@
+"""
+Playwright page pool for concurrent page rendering
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+@dataclass(frozen=True)
+class WaitStrategy:
+    """页面加载等待策略：等到指定加载事件，再等待选择器出现"""
+    wait_until: str = 'domcontentloaded'
+    selector: Optional[str] = None
+    selector_timeout_ms: int = 5000
+
+
+class ResourceBlockPolicy:
+    """请求拦截策略：屏蔽图片、媒体、字体及第三方统计脚本"""
+
+    def __init__(
+        self,
+        resource_types: Optional[Iterable[str]] = None,
+        hosts: Optional[Iterable[str]] = None
+    ):
+        self.resource_types = frozenset(
+            settings.browser_blocked_resource_types if resource_types is None else resource_types
+        )
+        self.hosts = frozenset(
+            host.lower() for host in (settings.browser_blocked_hosts if hosts is None else hosts)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.hosts)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """判断请求是否应被拦截"""
+        if resource_type in self.resource_types:
+            return True
+        host = (urlparse(url).hostname or '').lower()
+        # 逐级匹配父域名，如 www.google-analytics.com -> google-analytics.com
+        while host:
+            if host in self.hosts:
+                return True
+            host = host.partition('.')[2]
+        return False
+
+    async def handle_route(self, route: Any) -> None:
+        """Playwright路由回调"""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+
+async def navigate(
+    page: Any,
+    url: str,
+    strategy: Optional[WaitStrategy] = None,
+    timeout_ms: Optional[float] = None
+) -> Any:
+    """按等待策略导航页面，选择器等待超时不视为失败，返回主文档响应
+
+    timeout_ms: 本次导航超时，未指定时使用页面默认导航超时
+    """
+    strategy = strategy or WaitStrategy(wait_until=settings.browser_default_wait_until)
+    options = {'timeout': timeout_ms} if timeout_ms else {}
+    response = await page.goto(url, wait_until=strategy.wait_until, **options)
+    if strategy.selector:
+        try:
+            await page.wait_for_selector(strategy.selector, timeout=strategy.selector_timeout_ms)
+        except Exception as e:
+            logger.debug(f"Selector '{strategy.selector}' not found on {url}: {e}")
+    return response
+
+
+class PooledPage:
+    """池中的页面：独立的浏览器上下文 + 一个标签页"""
+
+    def __init__(self, context: Any, page: Any):
+        self.context = context
+        self.page = page
+        self.navigations = 0
+
+
+class PagePool:
+    """Playwright页面池
+
+    维护N个独立上下文的页面，通过 lease() 借出/归还。
+    每个页面导航M次后会被回收重建，避免内存持续增长。
+    """
+
+    def __init__(
+        self,
+        browser: Any,
+        size: Optional[int] = None,
+        max_navigations: Optional[int] = None,
+        navigation_timeout_ms: Optional[int] = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+        block_policy: Optional[ResourceBlockPolicy] = None
+    ):
+        self.browser = browser
+        self.size = max(1, size or settings.browser_pool_size)
+        self.max_navigations = max(1, max_navigations or settings.browser_page_max_navigations)
+        self.navigation_timeout_ms = navigation_timeout_ms or settings.browser_navigation_timeout_ms
+        self.user_agent = user_agent
+        self.block_policy = block_policy or ResourceBlockPolicy()
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._pages: List[PooledPage] = []
+        self._closed = False
+
+    async def start(self) -> None:
+        """创建全部页面"""
+        for _ in range(self.size):
+            pooled = await self._create_page()
+            self._pages.append(pooled)
+            self._idle.put_nowait(pooled)
+        logger.info(f"Page pool started with {self.size} pages")
+
+    async def _create_page(self) -> PooledPage:
+        """新建上下文和页面"""
+        context = await self.browser.new_context(user_agent=self.user_agent)
+        context.set_default_navigation_timeout(self.navigation_timeout_ms)
+        if self.block_policy.enabled:
+            await context.route("**/*", self.block_policy.handle_route)
+        page = await context.new_page()
+        return PooledPage(context, page)
+
+    async def _recycle(self, pooled: PooledPage) -> PooledPage:
+        """关闭旧上下文并换一个新页面"""
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled context: {e}")
+        fresh = await self._create_page()
+        self._pages[self._pages.index(pooled)] = fresh
+        return fresh
+
+    async def acquire(self) -> PooledPage:
+        """借出一个空闲页面，没有空闲时等待"""
+        if self._closed:
+            raise RuntimeError("Page pool is closed")
+        return await self._idle.get()
+
+    async def release(self, pooled: PooledPage, broken: bool = False) -> None:
+        """归还页面，达到导航次数上限或出错时回收"""
+        if self._closed:
+            return
+        pooled.navigations += 1
+        if broken or pooled.navigations >= self.max_navigations or pooled.page.is_closed():
+            try:
+                pooled = await self._recycle(pooled)
+            except Exception as e:
+                logger.error(f"Failed to recycle pooled page: {e}")
+        self._idle.put_nowait(pooled)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Any]:
+        """借用页面的上下文管理器：async with pool.lease() as page"""
+        pooled = await self.acquire()
+        broken = False
+        try:
+            yield pooled.page
+        except Exception:
+            broken = True
+            raise
+        finally:
+            await self.release(pooled, broken=broken)
+
+    async def close(self) -> None:
+        """关闭全部页面"""
+        self._closed = True
+        for pooled in self._pages:
+            try:
+                await pooled.context.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled context: {e}")
+        self._pages.clear()
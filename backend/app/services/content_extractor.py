@@ -0,0 +1,214 @@
+"""
+Main-content extraction by text and link density
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Union
+
+from bs4 import BeautifulSoup, Tag
+
+from app.services.html_parser import parse_html
+
+logger = logging.getLogger(__name__)
+
+# 整个删除的标签
+JUNK_TAGS = {
+    'script', 'style', 'noscript', 'template', 'iframe', 'svg', 'canvas', 'button',
+    'nav', 'header', 'footer', 'aside', 'menu',
+}
+# 作为段落计分的标签；div等容器只有在不含块级子元素时才视为段落
+PARAGRAPH_TAGS = {'p', 'pre'}
+TEXT_CONTAINER_TAGS = {'div', 'section', 'blockquote', 'td'}
+BLOCK_TAGS = ['p', 'pre', 'div', 'section', 'article', 'table', 'ul', 'ol', 'blockquote', 'h1', 'h2', 'h3']
+
+# class/id命中时视为无关区块（除非同时像正文）
+UNLIKELY_PATTERN = re.compile(
+    r'comment|sidebar|footer|share|social|related|promo|advert|sponsor|cookie|'
+    r'newsletter|subscribe|popup|modal|breadcrumb|menu|masthead|banner|combx|disqus',
+    re.IGNORECASE,
+)
+MAYBE_CONTENT_PATTERN = re.compile(r'article|body|content|main|story|entry|post|text', re.IGNORECASE)
+POSITIVE_PATTERN = re.compile(r'article|body|content|entry|main|page|post|story|text|blog', re.IGNORECASE)
+NEGATIVE_PATTERN = re.compile(
+    r'comment|meta|footer|footnote|sidebar|widget|share|social|related|promo|ad-|ads|hidden|nav|byline',
+    re.IGNORECASE,
+)
+
+TAG_WEIGHTS = {'article': 10, 'div': 5, 'section': 3, 'main': 5, 'pre': 3, 'td': 3, 'blockquote': 3,
+               'ol': -3, 'ul': -3, 'form': -3, 'li': -3, 'h1': -5, 'h2': -5, 'h3': -5, 'th': -5}
+
+
+@dataclass
+class ExtractionResult:
+    """正文提取结果"""
+    paragraphs: List[str]
+    confidence: float  # 0~1，正文占页面文本比例、长度和链接密度的综合评分
+    root: Optional[Tag] = field(default=None, repr=False)
+
+    @property
+    def text(self) -> str:
+        return '\n\n'.join(self.paragraphs)
+
+    def __len__(self) -> int:
+        return sum(len(paragraph) for paragraph in self.paragraphs)
+
+
+@dataclass
+class _Paragraph:
+    element: Tag
+    text: str
+    score: float
+
+
+def _normalize_text(element: Tag) -> str:
+    return ' '.join(element.get_text(' ', strip=True).split())
+
+
+def _class_and_id(element: Tag) -> str:
+    classes = element.get('class') or []
+    if isinstance(classes, str):
+        classes = [classes]
+    return ' '.join(classes) + ' ' + (element.get('id') or '')
+
+
+def _link_density(element: Tag, text_length: int) -> float:
+    """链接文本占元素文本的比例"""
+    if not text_length:
+        return 0.0
+    link_length = sum(len(_normalize_text(link)) for link in element.find_all('a'))
+    return min(1.0, link_length / text_length)
+
+
+class ContentExtractor:
+    """Readability风格的正文提取器
+
+    一次遍历文档：删除无关区块并收集段落；段落按文本长度和逗号数计分，
+    分数累加到父节点（全额）和祖父节点（一半），再按链接密度折算，
+    得分最高的节点及其高分兄弟节点中的段落即为正文。
+    """
+
+    def __init__(
+        self,
+        min_paragraph_length: int = 25,
+        max_link_density: float = 0.5,
+        min_content_length: int = 100,
+        full_length: int = 800,
+    ):
+        self.min_paragraph_length = min_paragraph_length
+        self.max_link_density = max_link_density
+        self.min_content_length = min_content_length
+        self.full_length = full_length  # 达到该长度时长度项记满分
+
+    def extract(self, document: Union[str, bytes, BeautifulSoup]) -> Optional[ExtractionResult]:
+        """提取正文，找不到足够长的正文时返回None（传入的soup会被修改）"""
+        soup = document if isinstance(document, BeautifulSoup) else parse_html(document)
+        paragraphs = self._collect_paragraphs(soup)
+        if not paragraphs:
+            return None
+
+        scores: Dict[int, float] = {}
+        nodes: Dict[int, Tag] = {}
+        for paragraph in paragraphs:
+            for level, ancestor in enumerate(self._scoring_ancestors(paragraph.element)):
+                key = id(ancestor)
+                if key not in scores:
+                    nodes[key] = ancestor
+                    scores[key] = self._initial_score(ancestor)
+                scores[key] += paragraph.score / (1 if level == 0 else 2)
+
+        for key, node in nodes.items():
+            scores[key] *= 1 - _link_density(node, len(_normalize_text(node)))
+
+        best_key = max(scores, key=scores.get)
+        best = nodes[best_key]
+        roots = self._content_roots(best, scores[best_key], scores, nodes)
+
+        content = [paragraph for paragraph in paragraphs if self._is_inside(paragraph.element, roots)]
+        content_length = sum(len(paragraph.text) for paragraph in content)
+        if content_length < self.min_content_length:
+            return None
+
+        total_length = sum(len(paragraph.text) for paragraph in paragraphs)
+        confidence = self._confidence(best, content_length, total_length)
+        logger.debug(f"Extracted {len(content)} paragraphs ({content_length} chars), confidence {confidence}")
+        return ExtractionResult([paragraph.text for paragraph in content], confidence, best)
+
+    def _collect_paragraphs(self, soup: BeautifulSoup) -> List[_Paragraph]:
+        """一次遍历：删除无关区块，同时收集候选段落"""
+        paragraphs = []
+        for element in soup.find_all(True):
+            if element.decomposed:
+                continue
+            if element.name in JUNK_TAGS or self._is_unlikely(element):
+                element.decompose()
+                continue
+            if element.name in PARAGRAPH_TAGS or (
+                element.name in TEXT_CONTAINER_TAGS and element.find(BLOCK_TAGS) is None
+            ):
+                text = _normalize_text(element)
+                if len(text) < self.min_paragraph_length:
+                    continue
+                if _link_density(element, len(text)) > self.max_link_density:
+                    continue
+                # 基础分1，每个逗号加1，每100字符加1（最多3）
+                score = 1 + text.count(',') + text.count('，') + min(len(text) // 100, 3)
+                paragraphs.append(_Paragraph(element, text, score))
+        return paragraphs
+
+    @staticmethod
+    def _is_unlikely(element: Tag) -> bool:
+        if element.name in ('html', 'body', 'article', 'main'):
+            return False
+        attributes = _class_and_id(element)
+        return bool(UNLIKELY_PATTERN.search(attributes)) and not MAYBE_CONTENT_PATTERN.search(attributes)
+
+    @staticmethod
+    def _scoring_ancestors(element: Tag) -> List[Tag]:
+        """段落的父节点和祖父节点"""
+        ancestors = []
+        parent = element.parent
+        while parent is not None and parent.name not in ('[document]', 'html') and len(ancestors) < 2:
+            ancestors.append(parent)
+            parent = parent.parent
+        return ancestors
+
+    @staticmethod
+    def _initial_score(element: Tag) -> float:
+        score = TAG_WEIGHTS.get(element.name, 0)
+        attributes = _class_and_id(element)
+        if POSITIVE_PATTERN.search(attributes):
+            score += 25
+        if NEGATIVE_PATTERN.search(attributes):
+            score -= 25
+        return score
+
+    @staticmethod
+    def _content_roots(best: Tag, best_score: float, scores: Dict[int, float], nodes: Dict[int, Tag]) -> Set[int]:
+        """最佳节点以及同一父节点下得分足够高的兄弟节点"""
+        threshold = max(10, best_score * 0.2)
+        roots = {id(best)}
+        for key, node in nodes.items():
+            if node.parent is best.parent and scores[key] >= threshold:
+                roots.add(key)
+        return roots
+
+    @staticmethod
+    def _is_inside(element: Tag, roots: Set[int]) -> bool:
+        node = element
+        while node is not None:
+            if id(node) in roots:
+                return True
+            node = node.parent
+        return False
+
+    def _confidence(self, best: Tag, content_length: int, total_length: int) -> float:
+        """正文占全部段落文本的比例、正文长度、最佳节点链接密度的加权"""
+        share = content_length / total_length if total_length else 0.0
+        length = min(1.0, content_length / self.full_length)
+        density = 1 - _link_density(best, len(_normalize_text(best)))
+        return round(0.4 * share + 0.4 * length + 0.2 * density, 2)
+
+
+# 全局正文提取器
+content_extractor = ContentExtractor()
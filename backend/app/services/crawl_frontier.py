@@ -0,0 +1,278 @@
+"""
+Durable crawl frontier with leases
+"""
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.news import CrawlFrontierItem, NewsSource
+
+logger = logging.getLogger(__name__)
+
+KIND_SOURCE = 'source'
+KIND_ARTICLE = 'article'
+
+STATE_PENDING = 'pending'
+STATE_IN_FLIGHT = 'in_flight'
+STATE_DONE = 'done'
+STATE_FAILED = 'failed'
+
+
+def default_worker_id() -> str:
+    """抓取进程标识：主机名 + 进程号 + 随机后缀"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def dump_article(article: Dict[str, Any]) -> str:
+    """文章数据序列化为JSON（日期转为ISO格式）"""
+    return json.dumps(article, ensure_ascii=False, default=lambda value: value.isoformat())
+
+
+def load_article(payload: str) -> Dict[str, Any]:
+    """反序列化文章数据"""
+    article = json.loads(payload)
+    if isinstance(article.get('publish_time'), str):
+        article['publish_time'] = datetime.fromisoformat(article['publish_time'])
+    return article
+
+
+class CrawlFrontier:
+    """持久化抓取队列
+
+    待抓取的新闻源和文章写入 crawl_frontier 表，状态为 pending/in_flight/done/failed。
+    抓取进程通过带过期时间的租约领取条目（条件UPDATE，多进程安全）；
+    进程中断后租约过期，条目会被重新领取，从中断处继续抓取。
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.db = db
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds or settings.frontier_lease_seconds
+        self.max_attempts = max_attempts or settings.frontier_max_attempts
+
+    def seed_sources(self, sources: Iterable[NewsSource]) -> int:
+        """将新闻源加入队列；已完成或失败的重新置为待抓取，未完成的保持原状态以便续抓"""
+        return self._upsert([
+            {'kind': KIND_SOURCE, 'url': source.url, 'source_id': source.id, 'payload': None}
+            for source in sources
+        ])
+
+    def enqueue_articles(self, source: NewsSource, articles: List[Dict[str, Any]]) -> int:
+        """将列表页解析出的文章加入队列，等待获取正文并入库"""
+        return self._upsert([
+            {
+                'kind': KIND_ARTICLE,
+                'url': article['source_url'],
+                'source_id': source.id,
+                'payload': dump_article(article),
+            }
+            for article in articles if article.get('source_url')
+        ])
+
+    def _upsert(self, entries: List[Dict[str, Any]], retries: int = 3) -> int:
+        """插入新条目，重置已结束的条目；返回变为待处理的条目数
+
+        其他进程同时加入相同条目导致唯一约束冲突时，回滚后重新读取已有条目再写入。
+        """
+        if not entries:
+            return 0
+        for attempt in range(retries):
+            try:
+                return self._apply_upsert(entries)
+            except IntegrityError:
+                self.db.rollback()
+                if attempt == retries - 1:
+                    raise
+                logger.info(f"Concurrent seeding of {entries[0]['kind']} items, retrying")
+
+    def _apply_upsert(self, entries: List[Dict[str, Any]]) -> int:
+        kind = entries[0]['kind']
+        urls = list({entry['url'] for entry in entries})
+        existing = {
+            item.url: item
+            for item in self.db.query(CrawlFrontierItem).filter(
+                and_(CrawlFrontierItem.kind == kind, CrawlFrontierItem.url.in_(urls))
+            )
+        }
+
+        queued = 0
+        for entry in entries:
+            item = existing.get(entry['url'])
+            if item is None:
+                item = CrawlFrontierItem(state=STATE_PENDING, attempts=0, **entry)
+                self.db.add(item)
+                existing[entry['url']] = item
+                queued += 1
+            elif item.state in (STATE_DONE, STATE_FAILED):
+                item.state = STATE_PENDING
+                item.attempts = 0
+                item.payload = entry['payload']
+                item.source_id = entry['source_id']
+                item.last_error = None
+                queued += 1
+        self.db.commit()
+        return queued
+
+    def _claimable(self, kind: str, now: datetime):
+        """可领取条件：待处理，或租约已过期的进行中条目，且未用尽尝试次数"""
+        return and_(
+            CrawlFrontierItem.kind == kind,
+            CrawlFrontierItem.attempts < self.max_attempts,
+            or_(
+                CrawlFrontierItem.state == STATE_PENDING,
+                and_(CrawlFrontierItem.state == STATE_IN_FLIGHT, CrawlFrontierItem.lease_expires_at < now),
+            ),
+        )
+
+    def _expire(self, kind: str, now: datetime) -> None:
+        """租约过期且已用尽尝试次数的条目标记为失败，避免永远停留在进行中"""
+        self.db.execute(
+            update(CrawlFrontierItem)
+            .where(and_(
+                CrawlFrontierItem.kind == kind,
+                CrawlFrontierItem.state == STATE_IN_FLIGHT,
+                CrawlFrontierItem.lease_expires_at < now,
+                CrawlFrontierItem.attempts >= self.max_attempts,
+            ))
+            .values(state=STATE_FAILED, lease_owner=None, lease_expires_at=None,
+                    last_error='lease expired', updated_at=now)
+        )
+
+    def _try_claim(self, item_id: int, kind: str, now: datetime) -> bool:
+        """条件UPDATE抢占单个条目，其他进程已领取时返回False（调用方提交）"""
+        result = self.db.execute(
+            update(CrawlFrontierItem)
+            .where(and_(CrawlFrontierItem.id == item_id, self._claimable(kind, now)))
+            .values(
+                state=STATE_IN_FLIGHT,
+                lease_owner=self.worker_id,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                attempts=CrawlFrontierItem.attempts + 1,
+                updated_at=now,
+            )
+        )
+        return result.rowcount == 1
+
+    def peek(
+        self,
+        kind: str,
+        limit: Optional[int] = None,
+        exclude_ids: Optional[Iterable[int]] = None,
+        source_id: Optional[int] = None
+    ) -> List[CrawlFrontierItem]:
+        """查询可领取的条目但不领取，真正处理前再用claim()抢占
+
+        条目在下游队列中等待时不占用租约，避免排队时间超过租约时长后被重复领取。
+        """
+        now = datetime.utcnow()
+        self._expire(kind, now)
+        self.db.commit()
+        query = self.db.query(CrawlFrontierItem).filter(self._claimable(kind, now))
+        if source_id is not None:
+            query = query.filter(CrawlFrontierItem.source_id == source_id)
+        if exclude_ids:
+            query = query.filter(CrawlFrontierItem.id.notin_(list(exclude_ids)))
+        query = query.order_by(CrawlFrontierItem.id)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def claim(self, item: CrawlFrontierItem) -> bool:
+        """领取单个条目（条件UPDATE），已被其他进程领取或不再可领取时返回False"""
+        claimed = self._try_claim(item.id, item.kind, datetime.utcnow())
+        self.db.commit()
+        if not claimed:
+            return False
+        if item.attempts > 1:
+            logger.info(f"Resuming interrupted {item.kind} fetch of {item.url} from the crawl frontier")
+        return True
+
+    def lease(
+        self,
+        kind: str,
+        limit: Optional[int] = None,
+        exclude_ids: Optional[Iterable[int]] = None,
+        source_id: Optional[int] = None
+    ) -> List[CrawlFrontierItem]:
+        """领取待处理条目（含租约过期的进行中条目），每条用条件UPDATE抢占
+
+        exclude_ids: 本次运行已处理过的条目，失败后不在同一次运行中立即重试
+        source_id: 只领取该新闻源的条目
+        """
+        candidate_ids = [item.id for item in self.peek(kind, limit, exclude_ids, source_id)]
+        now = datetime.utcnow()
+        claimed_ids = [item_id for item_id in candidate_ids if self._try_claim(item_id, kind, now)]
+        self.db.commit()
+
+        if not claimed_ids:
+            return []
+        items = self.db.query(CrawlFrontierItem).filter(CrawlFrontierItem.id.in_(claimed_ids)).all()
+        resumed = sum(1 for item in items if item.attempts > 1)
+        if resumed:
+            logger.info(f"Resuming {resumed} interrupted {kind} fetches from the crawl frontier")
+        return sorted(items, key=lambda item: item.id)
+
+    def complete(self, items: Iterable[CrawlFrontierItem]) -> None:
+        """标记为已完成"""
+        self._finish(items, STATE_DONE)
+
+    def fail(self, items: Iterable[CrawlFrontierItem], error: str) -> None:
+        """标记失败：未达到最大尝试次数的重新置为待处理"""
+        self._finish(items, None, error)
+
+    def _finish(self, items: Iterable[CrawlFrontierItem], state: Optional[str], error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        for item in items:
+            if state is None:
+                values = {
+                    'state': STATE_PENDING if item.attempts < self.max_attempts else STATE_FAILED,
+                    'last_error': error[:1000] if error else None,
+                }
+            else:
+                values = {'state': state}
+            # 只更新自己持有租约的条目；租约过期被其他进程接手的不覆盖
+            self.db.execute(
+                update(CrawlFrontierItem)
+                .where(and_(CrawlFrontierItem.id == item.id, CrawlFrontierItem.lease_owner == self.worker_id))
+                .values(lease_owner=None, lease_expires_at=None, updated_at=now, **values)
+            )
+        self.db.commit()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """按类型和状态统计条目数"""
+        rows = self.db.query(
+            CrawlFrontierItem.kind, CrawlFrontierItem.state, func.count(CrawlFrontierItem.id)
+        ).group_by(CrawlFrontierItem.kind, CrawlFrontierItem.state).all()
+        stats: Dict[str, Dict[str, int]] = {}
+        for kind, state, count in rows:
+            stats.setdefault(kind, {})[state] = count
+        return stats
+
+    def purge(self, days: Optional[int] = None) -> int:
+        """删除早于保留期的已完成/已失败文章条目"""
+        days = days or settings.frontier_retention_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        deleted = self.db.query(CrawlFrontierItem).filter(
+            and_(
+                CrawlFrontierItem.kind == KIND_ARTICLE,
+                CrawlFrontierItem.state.in_([STATE_DONE, STATE_FAILED]),
+                CrawlFrontierItem.updated_at < cutoff,
+            )
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
@@ -0,0 +1,136 @@
+"""
+Per-run crawl instrumentation: stage timings, bytes and cache hit rates
+"""
+import bisect
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from app.services.source_health import percentile
+
+logger = logging.getLogger(__name__)
+
+# 直方图桶上界（毫秒），最后一个桶收集更慢的样本
+HISTOGRAM_BUCKETS_MS = [10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+# 缓存命中率：名称 -> (命中计数器, 未命中计数器)
+CACHE_RATES = {
+    'conditional_get': (('not_modified', 'unchanged'), ('changed',)),
+    'feed_watermark': (('watermark_skipped',), ('watermark_new',)),
+    'seen_urls': (('seen_skipped',), ('seen_new',)),
+    'response_cache': (('response_cache_hit',), ('response_cache_miss',)),
+}
+
+
+class StageTimer:
+    """单个阶段的耗时样本"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+
+    def add(self, ms: float) -> None:
+        self.samples.append(ms)
+
+    def summary(self) -> Dict[str, Any]:
+        """次数、总耗时、p50/p95/最大值和直方图"""
+        buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for sample in self.samples:
+            buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, sample)] += 1
+        labels = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+        return {
+            'count': len(self.samples),
+            'total_ms': round(sum(self.samples), 1),
+            'p50_ms': percentile(self.samples, 50),
+            'p95_ms': percentile(self.samples, 95),
+            'max_ms': max(self.samples) if self.samples else None,
+            'histogram': {label: count for label, count in zip(labels, buckets) if count},
+        }
+
+
+class CrawlMetrics:
+    """一次抓取运行的统计
+
+    记录各阶段耗时（全局直方图 + 每个新闻源的累计）、下载字节数和各类缓存命中次数，
+    结束后由 report() 汇总写入 crawl_runs 表。
+    """
+
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self.stages: Dict[str, StageTimer] = defaultdict(StageTimer)
+        self.sources: Dict[int, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.bytes_downloaded = 0
+
+    def _source(self, source_id: int) -> Dict[str, Any]:
+        if source_id not in self.sources:
+            self.sources[source_id] = {'stages': defaultdict(lambda: {'count': 0, 'total_ms': 0.0}), 'bytes': 0}
+        return self.sources[source_id]
+
+    def record(self, stage: str, ms: float, source_id: Optional[int] = None) -> None:
+        """记录一次阶段耗时（毫秒）"""
+        self.stages[stage].add(ms)
+        if source_id is not None:
+            entry = self._source(source_id)['stages'][stage]
+            entry['count'] += 1
+            entry['total_ms'] += ms
+
+    @contextmanager
+    def timed(self, stage: str, source_id: Optional[int] = None) -> Iterator[None]:
+        """计时上下文，可包住await；异常时同样记录耗时"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000, source_id)
+
+    def record_fetch(self, timings: Mapping[str, float], size: int, source_id: Optional[int] = None) -> None:
+        """记录一次HTTP请求的各阶段耗时和下载字节数"""
+        for stage, ms in timings.items():
+            self.record(stage, ms, source_id)
+        self.bytes_downloaded += size
+        if source_id is not None:
+            self._source(source_id)['bytes'] += size
+
+    def count(self, name: str, n: int = 1) -> None:
+        if n:
+            self.counters[name] += n
+
+    def cache_rates(self) -> Dict[str, Dict[str, Any]]:
+        """各类缓存的命中次数和命中率"""
+        rates = {}
+        for name, (hit_keys, miss_keys) in CACHE_RATES.items():
+            hits = sum(self.counters.get(key, 0) for key in hit_keys)
+            misses = sum(self.counters.get(key, 0) for key in miss_keys)
+            if hits or misses:
+                rates[name] = {'hits': hits, 'misses': misses, 'hit_rate': round(hits / (hits + misses), 3)}
+        return rates
+
+    def report(self, results: Mapping[str, int]) -> Dict[str, Any]:
+        """汇总为crawl_runs记录"""
+        return {
+            'started_at': self.started_at,
+            'finished_at': datetime.utcnow(),
+            'duration_ms': round((time.perf_counter() - self._started) * 1000, 1),
+            'total_sources': results.get('total_sources', 0),
+            'success_count': results.get('success_count', 0),
+            'error_count': results.get('error_count', 0),
+            'new_articles': results.get('new_articles', 0),
+            'bytes_downloaded': self.bytes_downloaded,
+            'stages': {stage: timer.summary() for stage, timer in self.stages.items()},
+            'cache': self.cache_rates(),
+            'counters': dict(self.counters),
+            'sources': {
+                source_id: {
+                    'bytes': entry['bytes'],
+                    'stages': {
+                        stage: {'count': value['count'], 'total_ms': round(value['total_ms'], 1)}
+                        for stage, value in entry['stages'].items()
+                    },
+                }
+                for source_id, entry in self.sources.items()
+            },
+        }
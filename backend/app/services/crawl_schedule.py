@@ -0,0 +1,101 @@
+"""
+Adaptive per-source crawl scheduling
+"""
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.models.news import NewsSource
+from app.services.news_service import NewsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlSchedulePolicy:
+    """根据新闻源的发布速率安排下次抓取时间
+
+    每次抓取后用新文章数/距上次抓取的小时数更新发布速率（EWMA），
+    下次抓取间隔 = 期望新文章数 / 发布速率，限制在最短、最长间隔之间并加随机抖动。
+    发布频繁的通讯社会被频繁抓取，很少更新的博客则很少抓取。
+    """
+
+    def __init__(
+        self,
+        min_interval: Optional[timedelta] = None,
+        max_interval: Optional[timedelta] = None,
+        initial_interval: Optional[timedelta] = None,
+        target_new_articles: Optional[float] = None,
+        smoothing: Optional[float] = None,
+        jitter_ratio: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.min_interval = min_interval or timedelta(minutes=settings.crawl_min_interval_minutes)
+        self.max_interval = max_interval or timedelta(minutes=settings.crawl_max_interval_minutes)
+        self.initial_interval = initial_interval or timedelta(minutes=settings.crawl_initial_interval_minutes)
+        self.target_new_articles = target_new_articles or settings.crawl_target_new_articles
+        self.smoothing = settings.crawl_rate_smoothing if smoothing is None else smoothing
+        self.jitter_ratio = settings.crawl_jitter_ratio if jitter_ratio is None else jitter_ratio
+        self.rng = rng or random.Random()
+
+    def update_rate(self, source: NewsSource, new_articles: int, now: datetime) -> Optional[float]:
+        """用本次抓取结果更新发布速率（篇/小时），没有上次抓取时间时无法计算"""
+        if source.last_crawled_at is None:
+            return source.publish_rate
+        elapsed_hours = max((now - source.last_crawled_at).total_seconds() / 3600, 1 / 60)
+        observed = new_articles / elapsed_hours
+        if source.publish_rate is None:
+            return observed
+        return self.smoothing * observed + (1 - self.smoothing) * source.publish_rate
+
+    def interval_for(self, publish_rate: Optional[float]) -> timedelta:
+        """由发布速率计算抓取间隔（未加抖动）"""
+        if publish_rate is None:
+            return self.initial_interval
+        if publish_rate <= 0:
+            return self.max_interval
+        interval = timedelta(hours=self.target_new_articles / publish_rate)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def jitter(self, interval: timedelta) -> timedelta:
+        """加随机抖动，抖动后仍不小于最短间隔"""
+        factor = 1 + self.rng.uniform(-self.jitter_ratio, self.jitter_ratio)
+        return max(self.min_interval, interval * factor)
+
+    def next_schedule(
+        self,
+        source: NewsSource,
+        new_articles: Optional[int],
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """计算抓取后需要更新的字段；new_articles为None表示抓取失败，只按原速率重新排期"""
+        now = now or datetime.utcnow()
+        if new_articles is None:
+            publish_rate = source.publish_rate
+        else:
+            publish_rate = self.update_rate(source, new_articles, now)
+        interval = self.jitter(self.interval_for(publish_rate))
+        next_crawl_at = now + interval
+        # 熔断中的新闻源在冷却期结束后再探测
+        if source.circuit_open_until and source.circuit_open_until > next_crawl_at:
+            next_crawl_at = source.circuit_open_until
+        return {
+            'publish_rate': publish_rate,
+            'last_crawled_at': now if new_articles is not None else source.last_crawled_at,
+            'next_crawl_at': next_crawl_at,
+        }
+
+    def record_crawl(self, repo: NewsRepository, source: NewsSource, new_articles: Optional[int]) -> None:
+        """记录一次抓取并安排下次抓取时间"""
+        schedule = self.next_schedule(source, new_articles)
+        repo.update_source(source.id, schedule)
+        rate = schedule['publish_rate']
+        logger.debug(
+            f"Source {source.name}: rate {rate if rate is None else round(rate, 2)}/h, "
+            f"next crawl at {schedule['next_crawl_at']:%Y-%m-%d %H:%M}"
+        )
+
+
+# 全局抓取排期策略
+crawl_schedule = CrawlSchedulePolicy()
@@ -2,16 +2,20 @@
 Web crawler service for news collection
 """
 import asyncio
+import hashlib
+import json
 import logging
 import os
+import time
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Union
 from urllib.parse import urljoin, urlparse
 
 # 检查是否禁用playwright
 if os.environ.get('DISABLE_PLAYWRIGHT') != '1':
     try:
-        from playwright.async_api import async_playwright, Browser, Page
+        from playwright.async_api import async_playwright, Browser
         PLAYWRIGHT_AVAILABLE = True
     except ImportError:
         PLAYWRIGHT_AVAILABLE = False
@@ -19,23 +23,67 @@ else:
     PLAYWRIGHT_AVAILABLE = False
 
 from bs4 import BeautifulSoup
-import requests
 from feedparser import parse as feedparse
 
 from app.core.config import settings
+from app.core.http_client import FetchResult, HttpClient
+from app.core.politeness import RobotsDisallowedError
+from app.core.response_cache import CacheMissError
+from app.services.browser_pool import PagePool, WaitStrategy, navigate
+from app.services.content_extractor import ContentExtractor, content_extractor
+from app.services.crawl_frontier import KIND_ARTICLE, KIND_SOURCE, CrawlFrontier, load_article
+from app.services.crawl_metrics import CrawlMetrics
+from app.services.crawl_schedule import CrawlSchedulePolicy, crawl_schedule
+from app.services.feed_watermark import FeedWatermark
+from app.services.html_parser import parse_html
+from app.services.near_duplicate import StoryClusterer, story_clusterer
 from app.services.news_service import NewsRepository
-from app.models.news import NewsSource, NewsArticle
+from app.services.site_registry import SiteProfile, SiteRegistry, site_registry
+from app.services.source_health import SourceHealthPolicy, source_health
+from app.services.url_canonical import canonicalize_url
+from app.services.url_filter import SeenUrlFilter, seen_urls
+from app.models.news import CrawlFrontierItem, NewsSource, NewsArticle
 
 logger = logging.getLogger(__name__)
 
-
 class WebCrawler:
     """网页抓取器"""
     
-    def __init__(self, repo: NewsRepository):
+    def __init__(
+        self,
+        repo: NewsRepository,
+        http: Optional[HttpClient] = None,
+        seen_filter: Optional[SeenUrlFilter] = None,
+        clusterer: Optional[StoryClusterer] = None,
+        registry: Optional[SiteRegistry] = None,
+        extractor: Optional[ContentExtractor] = None,
+        schedule: Optional[CrawlSchedulePolicy] = None,
+        frontier: Optional[CrawlFrontier] = None,
+        health: Optional[SourceHealthPolicy] = None
+    ):
         self.repo = repo
+        # 站点配置：链接选择器、标题规则、正文选择器和等待策略
+        self.site_registry = registry or site_registry
+        # 按文本密度提取正文
+        self.content_extractor = extractor or content_extractor
+        # 按发布速率安排各新闻源的下次抓取时间
+        self.crawl_schedule = schedule or crawl_schedule
+        # 持久化抓取队列，中断后可续抓，多进程可共享
+        self.frontier = frontier or CrawlFrontier(repo.db)
+        # 新闻源健康状态与熔断：跳过持续失败的新闻源，慢速新闻源靠后抓取
+        self.source_health = health or source_health
+        # 入库时为文章分配近似重复故事簇
+        self.story_clusterer = clusterer or story_clusterer
+        # 已入库URL过滤器，在获取完整内容前跳过已知文章
+        self.seen_urls = seen_filter if seen_filter is not None else seen_urls
+        # 所有feed和网页请求共用一个连接池
+        self.http = http or HttpClient()
+        # 本次抓取的分阶段耗时、流量和缓存命中统计，每次crawl_news_sources重新开始
+        self.metrics = CrawlMetrics()
+        self._routed_ids: Set[int] = set()
         self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        # 页面池，支持并发渲染多个页面
+        self.page_pool: Optional[PagePool] = None
         # 初始化playwright可用性状态
         self._playwright_available = PLAYWRIGHT_AVAILABLE
     
@@ -50,8 +98,11 @@ class WebCrawler:
     
     async def start_browser(self):
         """启动浏览器"""
+        if self.http.replay:
+            logger.info("Replaying from the response cache, browser not needed")
+            return
         if not PLAYWRIGHT_AVAILABLE:
-            logger.warning("Playwright not available, using requests-based crawling")
+            logger.warning("Playwright not available, using HTTP client crawling")
             return
             
         try:
@@ -68,12 +119,8 @@ class WebCrawler:
                     '--disable-gpu'
                 ]
             )
-            self.page = await self.browser.new_page()
-            
-            # 设置用户代理
-            await self.page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            })
+            self.page_pool = PagePool(self.browser)
+            await self.page_pool.start()
             # 设置实例变量表示playwright可用
             self._playwright_available = True
         except Exception as e:
@@ -83,437 +130,599 @@ class WebCrawler:
     
     async def close_browser(self):
         """关闭浏览器"""
-        if self.page:
-            await self.page.close()
+        if self.page_pool:
+            await self.page_pool.close()
         if self.browser:
             await self.browser.close()
         if hasattr(self, 'playwright'):
             await self.playwright.stop()
+        await self.http.close()
     
-    async def crawl_news_sources(self) -> Dict[str, int]:
-        """抓取所有新闻源"""
-        sources = self.repo.get_active_sources()
+    async def crawl_news_sources(self, due_only: bool = False) -> Dict[str, int]:
+        """以流水线方式抓取新闻源，经持久化抓取队列执行，中断后可从队列续抓
+        
+        列表页/feed → 正文获取与提取 → 批量入库 三个阶段由有界队列连接（背压），
+        文章在发现后几秒内即可入库，内存占用与新闻源大小无关。
+        due_only时只加入已到期的新闻源；上次中断遗留在队列中的条目总会被继续处理。
+        熔断中的新闻源不加入队列。每次运行的分阶段耗时写入crawl_runs表。
+        """
+        self.metrics = CrawlMetrics()
+        # 本次运行已交给下游的文章条目
+        self._routed_ids: Set[int] = set()
+        sources = self.repo.get_due_sources() if due_only else self.repo.get_active_sources()
+        sources = self.source_health.select(sources)
+        self.seen_urls.ensure_loaded(self.repo)
+        self.frontier.seed_sources(sources)
+        sources_by_id = {source.id: source for source in sources}
+        
+        # 新闻源条目在取得并发槽位后才领取租约，等待槽位的时间不计入租约
+        source_items = self.frontier.peek(KIND_SOURCE)
         results = {
-            'total_sources': len(sources),
+            'total_sources': len(source_items),
             'success_count': 0,
             'error_count': 0,
             'new_articles': 0
         }
+        # 本次抓取成功的新闻源 -> 新文章数（失败为None），用于安排下次抓取
+        new_counts: Dict[int, Optional[int]] = {}
+        
+        # 阶段间的有界队列：下游处理不过来时上游等待
+        content_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.pipeline_queue_size))
+        persist_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.pipeline_queue_size))
+        content_workers = [
+            asyncio.create_task(self._content_stage(content_queue, persist_queue))
+            for _ in range(max(1, settings.pipeline_content_workers))
+        ]
+        persister = asyncio.create_task(self._persist_stage(persist_queue, results, new_counts))
+        
+        # 全局并发限制 + 按站点并发限制
+        semaphore = asyncio.Semaphore(max(1, settings.crawl_concurrency))
+        host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max(1, settings.crawl_per_host_concurrency))
+        )
+        
+        try:
+            await asyncio.gather(
+                self._resume_articles(content_queue, persist_queue, sources_by_id),
+                *[
+                    self._crawl_source(item, self._get_source(item.source_id, sources_by_id), results,
+                                       new_counts, semaphore, host_semaphores, content_queue, persist_queue)
+                    for item in source_items
+                ]
+            )
+            # 上游结束后依次关闭各阶段
+            for _ in content_workers:
+                await content_queue.put(None)
+            await asyncio.gather(*content_workers)
+            await persist_queue.put(None)
+            await persister
+        finally:
+            for task in content_workers + [persister]:
+                task.cancel()
+        
+        for source_id, new_count in new_counts.items():
+            self._record_crawl(sources_by_id[source_id], new_count)
         
-        for source in sources:
+        run_id = self._save_run(results)
+        if run_id is not None:
+            results['run_id'] = run_id
+        return results
+    
+    def _get_source(self, source_id: Optional[int], cache: Dict[int, NewsSource]) -> Optional[NewsSource]:
+        """按ID获取新闻源（带缓存），续抓时条目可能来自本次未选中的新闻源"""
+        if source_id is None:
+            return None
+        if source_id not in cache:
+            source = self.repo.get_source_by_id(source_id)
+            if source is None:
+                return None
+            cache[source_id] = source
+        return cache[source_id]
+    
+    async def _crawl_source(
+        self,
+        item: CrawlFrontierItem,
+        source: Optional[NewsSource],
+        results: Dict[str, int],
+        new_counts: Dict[int, Optional[int]],
+        semaphore: asyncio.Semaphore,
+        host_semaphores: Dict[str, asyncio.Semaphore],
+        content_queue: asyncio.Queue,
+        persist_queue: asyncio.Queue
+    ) -> None:
+        """列表阶段：在并发限制下抓取单个新闻源的列表页/feed，文章写入抓取队列后交给下游"""
+        if source is None:
+            # 新闻源已被删除
+            if self.frontier.claim(item):
+                self.frontier.complete([item])
+            return
+        
+        host = urlparse(source.url).netloc.lower()
+        # 先获取站点槽位，避免等待同站点时占用全局槽位
+        async with host_semaphores[host], semaphore:
+            if not self.frontier.claim(item):
+                # 等待槽位期间已被其他进程领取
+                results['total_sources'] -= 1
+                return
+            started = time.perf_counter()
             try:
                 logger.info(f"Crawling source: {source.name} ({source.url})")
                 
                 if source.type == 'web':
-                    articles = await self.crawl_web_source(source)
+                    with self.metrics.timed('listing', source.id):
+                        articles = await self.list_web_source(source)
                 elif source.type == 'rss':
-                    articles = await self.crawl_rss_source(source)
+                    with self.metrics.timed('listing', source.id):
+                        articles = await self.list_rss_source(source)
                 else:
                     logger.warning(f"Unknown source type: {source.type}")
-                    continue
-                
-                # 保存文章
-                for article_data in articles:
-                    try:
-                        # 检查是否已存在
-                        existing = self.repo.get_article_by_url(article_data['source_url'])
-                        if not existing:
-                            self.repo.create_article(article_data)
-                            results['new_articles'] += 1
-                            logger.info(f"Saved new article: {article_data['title'][:50]}...")
-                    except Exception as e:
-                        logger.error(f"Error saving article: {e}")
+                    self.frontier.complete([item])
+                    return
                 
+                self._record_health(source, started)
+                self.frontier.enqueue_articles(source, articles)
+                self.frontier.complete([item])
+                new_counts[source.id] = 0
                 results['success_count'] += 1
                 
             except Exception as e:
                 logger.error(f"Error crawling source {source.name}: {e}")
+                self._record_health(source, started, str(e) or type(e).__name__)
+                self.frontier.fail([item], str(e))
+                new_counts[source.id] = None
                 results['error_count'] += 1
+                return
         
-        return results
+        # 释放并发槽位后再交给下游，等待背压时不占用列表阶段的槽位；
+        # 条目在下游取出时才领取租约，排队时间不计入租约
+        article_items = self._take_unrouted(source_id=source.id)
+        await self._route_articles(source, article_items, content_queue, persist_queue)
+    
+    def _take_unrouted(self, limit: Optional[int] = None, source_id: Optional[int] = None) -> List[CrawlFrontierItem]:
+        """查询本次运行尚未交给下游的可领取文章条目，并记为已交付
+
+        查询与记录之间没有await，列表阶段和续抓循环不会重复交付同一条目。
+        """
+        items = self.frontier.peek(KIND_ARTICLE, limit=limit, exclude_ids=self._routed_ids, source_id=source_id)
+        self._routed_ids.update(item.id for item in items)
+        return items
+    
+    async def _resume_articles(
+        self,
+        content_queue: asyncio.Queue,
+        persist_queue: asyncio.Queue,
+        sources_by_id: Dict[int, NewsSource]
+    ) -> None:
+        """分批交付上次中断遗留的文章条目，交给下游继续处理"""
+        while True:
+            items = self._take_unrouted(limit=settings.frontier_batch_size)
+            if not items:
+                break
+            groups: Dict[Optional[int], List[CrawlFrontierItem]] = defaultdict(list)
+            for item in items:
+                groups[item.source_id].append(item)
+            for source_id, group in groups.items():
+                source = self._get_source(source_id, sources_by_id)
+                if source is None:
+                    # 新闻源已被删除
+                    self.frontier.complete([item for item in group if self.frontier.claim(item)])
+                    continue
+                await self._route_articles(source, group, content_queue, persist_queue)
+    
+    async def _route_articles(
+        self,
+        source: NewsSource,
+        items: List[CrawlFrontierItem],
+        content_queue: asyncio.Queue,
+        persist_queue: asyncio.Queue
+    ) -> None:
+        """缺少正文的文章送去获取正文（由正文阶段领取租约），已有内容的（如RSS摘要）领取后直接入库"""
+        for item in items:
+            try:
+                article = load_article(item.payload)
+            except Exception as e:
+                logger.error(f"Invalid frontier payload for {item.url}: {e}")
+                if self.frontier.claim(item):
+                    self.frontier.fail([item], str(e))
+                continue
+            entry = (source, item, article)
+            if article.get('source_url') and not article.get('original_content'):
+                await content_queue.put(entry)
+            elif self.frontier.claim(item):
+                await persist_queue.put(entry)
+    
+    async def _content_stage(self, content_queue: asyncio.Queue, persist_queue: asyncio.Queue) -> None:
+        """正文阶段：获取文章页面并提取正文，完成后交给入库阶段"""
+        while True:
+            entry = await content_queue.get()
+            if entry is None:
+                return
+            source, item, article = entry
+            if not self.frontier.claim(item):
+                # 已被其他抓取进程领取
+                continue
+            # 网页源获取失败时使用标题作为内容，RSS源保留摘要
+            await self._fill_article(article, fallback_to_title=source.type == 'web')
+            await persist_queue.put(entry)
+    
+    async def _persist_stage(
+        self,
+        persist_queue: asyncio.Queue,
+        results: Dict[str, int],
+        new_counts: Dict[int, Optional[int]]
+    ) -> None:
+        """入库阶段：攒够一批或等待超时后批量入库，文章尽快可见"""
+        batch = []
+        interval = settings.pipeline_persist_interval_seconds
+        while True:
+            try:
+                entry = await asyncio.wait_for(persist_queue.get(), timeout=interval if batch else None)
+            except asyncio.TimeoutError:
+                entry = False
+            if entry:
+                batch.append(entry)
+            if batch and (not entry or len(batch) >= settings.pipeline_persist_batch_size):
+                try:
+                    self._save_batch(batch, results, new_counts)
+                except Exception as e:
+                    # 入库阶段不能退出，否则上游会在满队列上一直等待；条目租约过期后会被续抓
+                    logger.error(f"Error persisting article batch: {e}")
+                batch = []
+            if entry is None:
+                return
+    
+    def _save_batch(
+        self,
+        batch: List[Any],
+        results: Dict[str, int],
+        new_counts: Dict[int, Optional[int]]
+    ) -> None:
+        """按新闻源分组批量保存：每组一次查重、一次提交"""
+        groups: Dict[int, List[Any]] = defaultdict(list)
+        for source, item, article in batch:
+            groups[source.id].append((source, item, article))
+        
+        for entries in groups.values():
+            source = entries[0][0]
+            items = [item for _, item, _ in entries]
+            articles = [article for _, _, article in entries]
+            try:
+                with self.metrics.timed('persist', source.id):
+                    article_ids = self.repo.bulk_create_articles(articles)
+                    self.seen_urls.add_many(article['source_url'] for article in articles)
+                    self.story_clusterer.assign(self.repo, article_ids)
+                    self.frontier.complete(items)
+                
+                results['new_articles'] += len(article_ids)
+                if new_counts.get(source.id) is not None:
+                    new_counts[source.id] += len(article_ids)
+                if article_ids:
+                    logger.info(f"Saved {len(article_ids)} new articles from {source.name}")
+            except Exception as e:
+                logger.error(f"Error saving articles from {source.name}: {e}")
+                self.frontier.fail(items, str(e))
+    
+    
+    def _save_run(self, results: Dict[str, int]) -> Optional[int]:
+        """保存本次运行的统计，返回记录ID"""
+        try:
+            report = self.metrics.report(results)
+            for key in ('stages', 'cache', 'counters', 'sources'):
+                report[key] = json.dumps(report[key], ensure_ascii=False)
+            return self.repo.create_crawl_run(report).id
+        except Exception as e:
+            logger.warning(f"Failed to save crawl run metrics: {e}")
+            return None
+    
+    def _record_health(self, source: NewsSource, started: float, error: Optional[str] = None) -> None:
+        """记录列表页/feed抓取耗时和成败，更新熔断状态"""
+        if self.http.replay:
+            # 回放耗时不代表站点真实情况
+            return
+        try:
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.source_health.record(self.repo, source, latency_ms, error)
+        except Exception as e:
+            logger.warning(f"Failed to record health for {source.name}: {e}")
+    
+    def _record_crawl(self, source: NewsSource, new_articles: Optional[int]) -> None:
+        """按本次新文章数更新发布速率并安排下次抓取"""
+        try:
+            self.crawl_schedule.record_crawl(self.repo, source, new_articles)
+        except Exception as e:
+            logger.warning(f"Failed to schedule next crawl for {source.name}: {e}")
     
     async def crawl_web_source(self, source: NewsSource) -> List[Dict[str, Any]]:
-        """抓取网页新闻源"""
+        """抓取网页新闻源：列表页 + 每篇文章的完整内容"""
         try:
-            # 使用实例变量检查playwright是否可用
-            playwright_available = getattr(self, '_playwright_available', PLAYWRIGHT_AVAILABLE)
-            if not playwright_available or not self.page:
-                # 使用requests作为备选方案
-                logger.info(f"Using requests for web crawling: {source.url}")
-                response = requests.get(source.url, timeout=60)  # 增加超时时间
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-            else:
-                # 使用playwright
-                await self.page.goto(source.url, wait_until='networkidle', timeout=60000)  # 增加超时时间到60秒
-                content = await self.page.content()
-                soup = BeautifulSoup(content, 'html.parser')
-            
-            # 根据不同的新闻源使用不同的解析策略
-            articles = []
-            
-            if 'cnn.com' in source.url:
-                articles = self._parse_cnn(soup, source)
-            elif 'bbc.com' in source.url:
-                articles = self._parse_bbc(soup, source)
-            elif 'reuters.com' in source.url:
-                articles = self._parse_reuters(soup, source)
-            elif 'techcrunch.com' in source.url:
-                articles = self._parse_techcrunch(soup, source)
-            elif 'bloomberg.com' in source.url:
-                articles = self._parse_bloomberg(soup, source)
-            else:
-                # 通用解析策略
-                articles = self._parse_generic(soup, source)
-            
-            # 为每个文章获取完整内容
-            for article in articles:
-                if article.get('source_url') and not article.get('original_content'):
-                    try:
-                        # 只有在playwright可用时才尝试获取完整内容
-                        playwright_available = getattr(self, '_playwright_available', PLAYWRIGHT_AVAILABLE)
-                        if playwright_available and self.page:
-                            full_content = await self._get_full_content(article['source_url'])
-                            if full_content:
-                                article['original_content'] = full_content
-                            else:
-                                # 如果获取失败，使用标题作为内容
-                                article['original_content'] = article['original_title']
-                        else:
-                            # 如果playwright不可用，使用标题作为内容
-                            article['original_content'] = article['original_title']
-                    except Exception as e:
-                        logger.warning(f"Failed to get full content for {article['source_url']}: {e}")
-                        article['original_content'] = article['original_title']
-            
-            return articles[:settings.max_articles_per_source]
-            
+            articles = await self.list_web_source(source)
+            # 并发获取每篇文章的完整内容，失败时使用标题作为内容
+            await self._fill_full_content(articles, fallback_to_title=True)
+            return articles
         except Exception as e:
             logger.error(f"Error crawling web source {source.url}: {e}")
             return []
     
     async def crawl_rss_source(self, source: NewsSource) -> List[Dict[str, Any]]:
-        """抓取RSS新闻源"""
+        """抓取RSS新闻源：feed条目 + 内容为空条目的完整内容"""
         try:
-            # 解析RSS
-            feed = feedparse(source.url)
-            articles = []
-            
-            for entry in feed.entries[:settings.max_articles_per_source]:
-                try:
-                    article_data = {
-                        'original_title': entry.get('title', ''),
-                        'original_content': entry.get('summary', ''),
-                        'source_url': entry.get('link', ''),
-                        'source_id': source.id,
-                        'source_name': source.name,
-                        'publish_time': self._parse_rss_date(entry.get('published')),
-                        'category': source.category,
-                        'original_language': 'en'  # 默认英文
-                    }
-                    
-                    # 如果内容为空，尝试获取完整内容
-                    if not article_data['original_content'] and entry.get('link'):
-                        try:
-                            # 只有在playwright可用时才尝试获取完整内容
-                            playwright_available = getattr(self, '_playwright_available', PLAYWRIGHT_AVAILABLE)
-                            if playwright_available and self.page:
-                                full_content = await self._get_full_content(entry.get('link'))
-                                if full_content:
-                                    article_data['original_content'] = full_content
-                        except Exception as e:
-                            logger.warning(f"Failed to get full content for {entry.get('link')}: {e}")
-                    
-                    articles.append(article_data)
-                    
-                except Exception as e:
-                    logger.error(f"Error parsing RSS entry: {e}")
-                    continue
-            
+            articles = await self.list_rss_source(source)
+            await self._fill_full_content(articles)
             return articles
-            
         except Exception as e:
             logger.error(f"Error crawling RSS source {source.url}: {e}")
             return []
     
-    async def _get_full_content(self, url: str) -> Optional[str]:
-        """获取完整内容"""
-        try:
-            await self.page.goto(url, wait_until='networkidle', timeout=30000)  # 增加超时时间到30秒
-            content = await self.page.content()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # 移除脚本、样式、导航、页脚等无关内容
-            for element in soup(["script", "style", "nav", "header", "footer", "aside", "menu"]):
-                element.decompose()
-            
-            # 尝试找到主要内容 - 更全面的选择器
-            content_selectors = [
-                'article',
-                '.article-content',
-                '.post-content',
-                '.entry-content',
-                '.content',
-                'main',
-                '.main-content',
-                '.story-content',
-                '.article-body',
-                '.post-body',
-                '.entry-body',
-                '.content-body',
-                '.text-content',
-                '.article-text',
-                '.story-text',
-                '[role="main"]',
-                '.article',
-                '.story'
-            ]
-            
-            for selector in content_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    if len(text) > 100:  # 确保内容足够长
-                        return text
-            
-            # 尝试找到包含最多文本的段落
-            paragraphs = soup.find_all('p')
-            if paragraphs:
-                # 按文本长度排序，取最长的几个段落
-                paragraphs.sort(key=lambda p: len(p.get_text()), reverse=True)
-                content_parts = []
-                total_length = 0
-                
-                for p in paragraphs[:10]:  # 最多取10个段落
-                    text = p.get_text(strip=True)
-                    if len(text) > 20:  # 只取有意义的段落
-                        content_parts.append(text)
-                        total_length += len(text)
-                        if total_length > 500:  # 如果总长度超过500字符就停止
-                            break
-                
-                if content_parts:
-                    return ' '.join(content_parts)
-            
-            # 如果没有找到特定内容区域，返回body文本
-            body = soup.find('body')
-            if body:
-                text = body.get_text(strip=True)
-                if len(text) > 100:
-                    return text
-            
-            return None
+    async def list_web_source(self, source: NewsSource) -> List[Dict[str, Any]]:
+        """抓取网页新闻源的列表页，返回尚未入库的文章（不含正文）"""
+        profile = self.site_registry.get(source.url)
+        # 使用实例变量检查playwright是否可用
+        playwright_available = getattr(self, '_playwright_available', PLAYWRIGHT_AVAILABLE)
+        if self.http.replay or not playwright_available or not self.page_pool:
+            # 使用异步HTTP客户端作为备选方案（回放模式下从响应缓存读取）
+            logger.info(f"Using HTTP client for web crawling: {source.url}")
+            response = await self._fetch_if_changed(source)
+            if response is None:
+                return []
+            articles = self._parse_listing_html(response.body, source, profile)
+        else:
+            # 先用条件请求判断页面是否变化，未变化则无需渲染
+            response = None
+            try:
+                response = await self._fetch_if_changed(source)
+                if response is None:
+                    return []
+            except RobotsDisallowedError:
+                raise
+            except Exception as e:
+                logger.debug(f"Conditional fetch failed for {source.url}, rendering anyway: {e}")
             
-        except Exception as e:
-            logger.warning(f"Error getting full content from {url}: {e}")
-            return None
-    
-    def _parse_cnn(self, soup: BeautifulSoup, source: NewsSource) -> List[Dict[str, Any]]:
-        """解析CNN页面"""
-        articles = []
+            # 已下载的静态页面能解析出文章时直接使用，只有链接由脚本生成时才用playwright渲染
+            articles = self._parse_listing_html(response.body, source, profile) if response is not None else []
+            if not articles:
+                timeout = self.source_health.timeout_for(source)
+                html = await self._render(source.url, profile.listing_wait, timeout, source.id)
+                articles = self._parse_listing_html(html, source, profile)
         
-        # CNN文章链接选择器
-        article_links = soup.select('a[href*="/2024/"], a[href*="/2025/"]')
+        articles = self._drop_seen(articles)[:settings.max_articles_per_source]
         
-        for link in article_links[:settings.max_articles_per_source]:
-            try:
-                href = link.get('href')
-                if not href or not href.startswith('http'):
-                    href = urljoin(source.url, href)
-                
-                title = link.get_text(strip=True)
-                if not title or len(title) < 10:
-                    continue
-                
-                article_data = {
-                    'original_title': title,
-                    'original_content': '',  # 稍后获取完整内容
-                    'source_url': href,
-                    'source_id': source.id,
-                    'source_name': source.name,
-                    'category': source.category,
-                    'original_language': 'en'
-                }
-                
-                articles.append(article_data)
-                
-            except Exception as e:
-                logger.error(f"Error parsing CNN article: {e}")
-                continue
+        if response is not None:
+            self._save_fetch_state(source, response)
         
         return articles
     
-    def _parse_bbc(self, soup: BeautifulSoup, source: NewsSource) -> List[Dict[str, Any]]:
-        """解析BBC页面"""
+    def _parse_listing_html(self, html, source: NewsSource, profile: SiteProfile) -> List[Dict[str, Any]]:
+        """按站点配置从列表页HTML解析文章列表"""
+        with self.metrics.timed('parse', source.id):
+            return self._parse_listing(parse_html(html), source, profile)
+    
+    async def list_rss_source(self, source: NewsSource) -> List[Dict[str, Any]]:
+        """抓取RSS新闻源的feed，返回高水位之后的新条目"""
+        # 下载后将字节交给feedparser解析，避免其同步联网
+        response = await self._fetch_if_changed(source)
+        if response is None:
+            return []
+        with self.metrics.timed('parse', source.id):
+            feed = feedparse(response.body, response_headers=response.headers)
+        watermark = FeedWatermark.from_source(source)
+        entries = watermark.new_entries(feed.entries)
+        self.metrics.count('watermark_new', len(entries))
+        self.metrics.count('watermark_skipped', len(feed.entries) - len(entries))
         articles = []
         
-        # BBC文章链接选择器
-        article_links = soup.select('a[href*="/news/"]')
-        
-        for link in article_links[:settings.max_articles_per_source]:
+        for entry in entries[:settings.max_articles_per_source]:
             try:
-                href = link.get('href')
-                if not href or not href.startswith('http'):
-                    href = urljoin(source.url, href)
-                
-                title = link.get_text(strip=True)
-                if not title or len(title) < 10:
-                    continue
-                
                 article_data = {
-                    'original_title': title,
-                    'original_content': '',
-                    'source_url': href,
+                    'original_title': entry.get('title', ''),
+                    'original_content': entry.get('summary', ''),
+                    'source_url': entry.get('link', ''),
+                    'canonical_url': canonicalize_url(entry.get('link', '')),
                     'source_id': source.id,
                     'source_name': source.name,
+                    'publish_time': self._parse_rss_date(entry.get('published')),
                     'category': source.category,
-                    'original_language': 'en'
+                    'original_language': 'en'  # 默认英文
                 }
                 
                 articles.append(article_data)
                 
             except Exception as e:
-                logger.error(f"Error parsing BBC article: {e}")
+                logger.error(f"Error parsing RSS entry: {e}")
                 continue
         
+        articles = self._drop_seen(articles)
+        watermark.advance(feed.entries)
+        self._save_fetch_state(source, response, watermark.to_update())
+        
         return articles
     
-    def _parse_reuters(self, soup: BeautifulSoup, source: NewsSource) -> List[Dict[str, Any]]:
-        """解析Reuters页面"""
-        articles = []
+    async def _fetch_if_changed(self, source: NewsSource) -> Optional[FetchResult]:
+        """条件请求新闻源，内容未变化（304或响应体哈希相同）时返回None"""
+        headers = {}
+        if source.http_etag:
+            headers['If-None-Match'] = source.http_etag
+        if source.http_last_modified:
+            headers['If-Modified-Since'] = source.http_last_modified
         
-        # Reuters文章链接选择器
-        article_links = soup.select('a[href*="/article/"]')
+        # 慢速新闻源按其历史耗时设置超时，避免每次都等满默认超时
+        try:
+            response = await self.http.fetch(
+                source.url, headers=headers, timeout=self.source_health.timeout_for(source)
+            )
+        except CacheMissError:
+            self.metrics.count('response_cache_miss')
+            raise
+        self.metrics.record_fetch(response.timings, len(response.body), source.id)
+        if response.from_cache:
+            self.metrics.count('response_cache_hit')
+        if response.status == 304:
+            logger.info(f"Source not modified (304): {source.url}")
+            self.metrics.count('not_modified')
+            return None
         
-        for link in article_links[:settings.max_articles_per_source]:
-            try:
-                href = link.get('href')
-                if not href or not href.startswith('http'):
-                    href = urljoin(source.url, href)
-                
-                title = link.get_text(strip=True)
-                if not title or len(title) < 10:
-                    continue
-                
-                article_data = {
-                    'original_title': title,
-                    'original_content': '',
-                    'source_url': href,
-                    'source_id': source.id,
-                    'source_name': source.name,
-                    'category': source.category,
-                    'original_language': 'en'
-                }
-                
-                articles.append(article_data)
-                
-            except Exception as e:
-                logger.error(f"Error parsing Reuters article: {e}")
-                continue
+        # 回放时总是重新处理缓存的内容
+        if not self.http.replay and source.content_hash and self._hash_body(response.body) == source.content_hash:
+            logger.info(f"Source content unchanged: {source.url}")
+            self.metrics.count('unchanged')
+            return None
         
-        return articles
+        self.metrics.count('changed')
+        return response
     
-    def _parse_techcrunch(self, soup: BeautifulSoup, source: NewsSource) -> List[Dict[str, Any]]:
-        """解析TechCrunch页面"""
-        articles = []
-        
-        # TechCrunch文章链接选择器
-        article_links = soup.select('a[href*="/2024/"], a[href*="/2025/"]')
-        
-        for link in article_links[:settings.max_articles_per_source]:
+    def _save_fetch_state(
+        self,
+        source: NewsSource,
+        response: FetchResult,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """记录ETag、Last-Modified和响应体哈希（及feed高水位），供下次抓取使用"""
+        try:
+            self.repo.update_source(source.id, {
+                'http_etag': response.headers.get('ETag'),
+                'http_last_modified': response.headers.get('Last-Modified'),
+                'content_hash': self._hash_body(response.body),
+                **(extra or {})
+            })
+        except Exception as e:
+            logger.warning(f"Failed to save fetch state for {source.url}: {e}")
+    
+    @staticmethod
+    def _hash_body(body: bytes) -> str:
+        """计算响应体哈希"""
+        return hashlib.sha256(body).hexdigest()
+    
+    def _drop_seen(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """去掉已入库的文章，避免为其获取完整内容"""
+        fresh = [article for article in articles if article.get('source_url') not in self.seen_urls]
+        self.metrics.count('seen_new', len(fresh))
+        self.metrics.count('seen_skipped', len(articles) - len(fresh))
+        if len(fresh) < len(articles):
+            logger.debug(f"Skipped {len(articles) - len(fresh)} already stored articles")
+        return fresh
+    
+    async def _fill_full_content(
+        self,
+        articles: List[Dict[str, Any]],
+        fallback_to_title: bool = False
+    ) -> None:
+        """通过页面池并发为缺少正文的文章获取完整内容"""
+        await asyncio.gather(*[
+            self._fill_article(article, fallback_to_title) for article in articles
+            if article.get('source_url') and not article.get('original_content')
+        ])
+    
+    async def _fill_article(self, article: Dict[str, Any], fallback_to_title: bool = False) -> None:
+        """为单篇文章获取完整内容（回放模式下从响应缓存读取）"""
+        playwright_available = getattr(self, '_playwright_available', PLAYWRIGHT_AVAILABLE)
+        try:
+            # 只有在playwright可用时才尝试获取完整内容
+            if self.http.replay or (playwright_available and self.page_pool):
+                full_content = await self._get_full_content(article['source_url'], article.get('source_id'))
+                if full_content:
+                    article['original_content'] = full_content
+        except Exception as e:
+            logger.warning(f"Failed to get full content for {article['source_url']}: {e}")
+        if fallback_to_title and not article.get('original_content'):
+            # 如果获取失败或playwright不可用，使用标题作为内容
+            article['original_content'] = article['original_title']
+    
+    async def _render(
+        self,
+        url: str,
+        strategy: WaitStrategy,
+        timeout: Optional[float] = None,
+        source_id: Optional[int] = None
+    ) -> Union[str, bytes]:
+        """经站点礼貌调度后借用页面渲染，返回页面HTML（timeout单位为秒）
+
+        回放模式下直接返回缓存的页面；启用响应缓存时渲染结果写入缓存。
+        """
+        if self.http.replay:
             try:
-                href = link.get('href')
-                if not href or not href.startswith('http'):
-                    href = urljoin(source.url, href)
-                
-                title = link.get_text(strip=True)
-                if not title or len(title) < 10:
-                    continue
-                
-                article_data = {
-                    'original_title': title,
-                    'original_content': '',
-                    'source_url': href,
-                    'source_id': source.id,
-                    'source_name': source.name,
-                    'category': source.category,
-                    'original_language': 'en'
-                }
-                
-                articles.append(article_data)
-                
-            except Exception as e:
-                logger.error(f"Error parsing TechCrunch article: {e}")
-                continue
-        
-        return articles
+                body = (await self.http.cached(url)).body
+            except CacheMissError:
+                self.metrics.count('response_cache_miss')
+                raise
+            self.metrics.count('response_cache_hit')
+            return body
+        with self.metrics.timed('politeness_wait', source_id):
+            await self.http.wait_turn(url)
+        with self.metrics.timed('render', source_id):
+            async with self.page_pool.lease() as page:
+                response = await navigate(page, url, strategy, timeout * 1000 if timeout else None)
+                status = 200
+                if response is not None:
+                    status = response.status
+                    self.http.politeness.report(url, response.status, response.headers)
+                html = await page.content()
+        self.metrics.record_fetch({}, len(html), source_id)
+        if status == 200:
+            await self.http.remember(url, html.encode('utf-8'), status, {'Content-Type': 'text/html; charset=utf-8'})
+        return html
     
-    def _parse_bloomberg(self, soup: BeautifulSoup, source: NewsSource) -> List[Dict[str, Any]]:
-        """解析Bloomberg页面"""
-        articles = []
+    async def _get_full_content(self, url: str, source_id: Optional[int] = None) -> Optional[str]:
+        """获取完整内容（source_id用于按新闻源统计耗时）"""
+        try:
+            profile = self.site_registry.get(url)
+            html = await self._render(url, profile.article_wait, source_id=source_id)
+            with self.metrics.timed('parse', source_id):
+                soup = parse_html(html)
+            with self.metrics.timed('extract', source_id):
+                return self._extract_content(soup, profile)
+            
+        except Exception as e:
+            logger.warning(f"Error getting full content from {url}: {e}")
+            return None
+    
+    def _extract_content(self, soup: BeautifulSoup, profile: SiteProfile) -> Optional[str]:
+        """提取正文：先按文本密度，置信度不足时按站点配置的正文选择器"""
+        # 按文本密度和链接密度提取正文，同时剔除导航、侧栏、评论等区块
+        result = self.content_extractor.extract(soup)
+        if result and result.confidence >= settings.content_min_confidence:
+            return result.text
         
-        # Bloomberg文章链接选择器
-        article_links = soup.select('a[href*="/news/"]')
+        # 置信度不足时，按站点配置的正文选择器尝试
+        for element in profile.iter_content_candidates(soup):
+            text = element.get_text(strip=True)
+            if len(text) > 100:  # 确保内容足够长
+                return text
         
-        for link in article_links[:settings.max_articles_per_source]:
-            try:
-                href = link.get('href')
-                if not href or not href.startswith('http'):
-                    href = urljoin(source.url, href)
-                
-                title = link.get_text(strip=True)
-                if not title or len(title) < 10:
-                    continue
-                
-                article_data = {
-                    'original_title': title,
-                    'original_content': '',
-                    'source_url': href,
-                    'source_id': source.id,
-                    'source_name': source.name,
-                    'category': source.category,
-                    'original_language': 'en'
-                }
-                
-                articles.append(article_data)
-                
-            except Exception as e:
-                logger.error(f"Error parsing Bloomberg article: {e}")
-                continue
+        if result:
+            return result.text
         
-        return articles
+        return None
     
-    def _parse_generic(self, soup: BeautifulSoup, source: NewsSource) -> List[Dict[str, Any]]:
-        """通用解析策略"""
+    def _parse_listing(self, soup: BeautifulSoup, source: NewsSource, profile: SiteProfile) -> List[Dict[str, Any]]:
+        """按站点配置解析列表页中的文章链接"""
         articles = []
+        seen_hrefs = set()
         
-        # 通用文章链接选择器
-        article_links = soup.select('a[href*="article"], a[href*="news"], a[href*="story"]')
-        
-        for link in article_links[:settings.max_articles_per_source]:
+        for link in profile.select_links(soup)[:settings.max_articles_per_source]:
             try:
                 href = link.get('href')
                 if not href or not href.startswith('http'):
                     href = urljoin(source.url, href)
                 
                 title = link.get_text(strip=True)
-                if not title or len(title) < 10:
+                if not profile.is_valid_title(title) or href in seen_hrefs:
                     continue
+                seen_hrefs.add(href)
                 
                 article_data = {
                     'original_title': title,
-                    'original_content': '',
+                    'original_content': '',  # 稍后获取完整内容
                     'source_url': href,
+                    'canonical_url': canonicalize_url(href),
                     'source_id': source.id,
                     'source_name': source.name,
                     'category': source.category,
-                    'original_language': 'en'
+                    'original_language': profile.language
                 }
                 
                 articles.append(article_data)
                 
             except Exception as e:
-                logger.error(f"Error parsing generic article: {e}")
+                logger.error(f"Error parsing article link on {source.url}: {e}")
                 continue
         
         return articles
@@ -0,0 +1,118 @@
+"""
+RSS high-water marks for incremental feed processing
+"""
+import calendar
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.models.news import NewsSource
+
+logger = logging.getLogger(__name__)
+
+
+def entry_guid(entry: Any) -> Optional[str]:
+    """条目唯一标识：guid/id，没有时使用链接"""
+    return entry.get('id') or entry.get('guid') or entry.get('link') or None
+
+
+def entry_published(entry: Any) -> Optional[datetime]:
+    """条目发布时间（UTC，不带时区），直接使用feedparser已解析的struct_time"""
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if not parsed:
+        return None
+    try:
+        return datetime.utcfromtimestamp(calendar.timegm(parsed))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class FeedWatermark:
+    """新闻源的feed高水位：最新发布时间 + 最近出现过的GUID集合
+
+    GUID已出现过的条目直接跳过；GUID未出现过的条目只要发布时间不早于
+    高水位减去宽限期就算新条目（晚收录或回填的条目），重复由GUID集合保证。
+    高水位不超过当前时间，个别发布时间在未来的条目不会让新闻源失声。
+    """
+
+    def __init__(
+        self,
+        published: Optional[datetime] = None,
+        guids: Optional[Iterable[str]] = None,
+        max_guids: Optional[int] = None,
+        grace: Optional[timedelta] = None,
+    ):
+        self.published = min(published, datetime.utcnow()) if published else published
+        self.guids = list(guids or [])
+        self.max_guids = max_guids or settings.rss_recent_guid_limit
+        self.grace = grace if grace is not None else timedelta(hours=settings.rss_watermark_grace_hours)
+        self._guid_set = set(self.guids)
+
+    @classmethod
+    def from_source(
+        cls,
+        source: NewsSource,
+        max_guids: Optional[int] = None,
+        grace: Optional[timedelta] = None
+    ) -> 'FeedWatermark':
+        guids: List[str] = []
+        if source.feed_recent_guids:
+            try:
+                guids = json.loads(source.feed_recent_guids)
+            except ValueError:
+                logger.warning(f"Invalid feed_recent_guids for {source.name}, resetting")
+        return cls(source.feed_last_published, guids, max_guids, grace)
+
+    def is_new(self, entry: Any) -> bool:
+        """GUID未出现过，且（没有发布时间或）发布时间在高水位的宽限期之内
+
+        没有GUID的条目无法查重，仍要求发布时间不早于高水位。
+        """
+        guid = entry_guid(entry)
+        if guid is not None and guid in self._guid_set:
+            return False
+        if self.published is None:
+            return True
+        published = entry_published(entry)
+        if published is None:
+            return True
+        if guid is None:
+            return published >= self.published
+        return published >= self.published - self.grace
+
+    def new_entries(self, entries: List[Any]) -> List[Any]:
+        """筛选新条目"""
+        fresh = [entry for entry in entries if self.is_new(entry)]
+        if len(fresh) < len(entries):
+            logger.debug(f"Skipped {len(entries) - len(fresh)} feed entries below the high-water mark")
+        return fresh
+
+    def advance(self, entries: List[Any], now: Optional[datetime] = None) -> None:
+        """用本次feed中的全部条目推进高水位（不超过当前时间）；GUID集合保留最近的max_guids个"""
+        now = now or datetime.utcnow()
+        latest = self.published
+        guids = []
+        for entry in entries:
+            published = entry_published(entry)
+            if published is not None:
+                published = min(published, now)
+                if latest is None or published > latest:
+                    latest = published
+            guid = entry_guid(entry)
+            if guid is not None:
+                guids.append(guid)
+        self.published = latest
+        # 本次feed中的GUID在前，其余按原顺序补足
+        current = set(guids)
+        merged = list(dict.fromkeys(guids)) + [guid for guid in self.guids if guid not in current]
+        self.guids = merged[:self.max_guids]
+        self._guid_set = set(self.guids)
+
+    def to_update(self) -> Dict[str, Any]:
+        """需要写回新闻源的字段"""
+        return {
+            'feed_last_published': self.published,
+            'feed_recent_guids': json.dumps(self.guids, ensure_ascii=False),
+        }
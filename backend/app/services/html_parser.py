@@ -0,0 +1,74 @@
+"""
+HTML parsing backend and single-pass selectors
+"""
+import logging
+from typing import Iterator, List, Optional, Sequence, Union
+
+import soupsieve
+from bs4 import BeautifulSoup, FeatureNotFound, Tag
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 可选解析器，按速度从快到慢
+SUPPORTED_PARSERS = ('lxml', 'html.parser', 'html5lib')
+FALLBACK_PARSER = 'html.parser'
+
+_unavailable_parsers = set()
+
+
+def parse_html(markup: Union[str, bytes], parser: Optional[str] = None) -> BeautifulSoup:
+    """使用配置的解析器解析HTML，默认lxml，未安装时回退到html.parser"""
+    parser = parser or settings.html_parser
+    if parser not in _unavailable_parsers:
+        try:
+            return BeautifulSoup(markup, parser)
+        except FeatureNotFound:
+            _unavailable_parsers.add(parser)
+            logger.warning(f"HTML parser '{parser}' is not installed, falling back to {FALLBACK_PARSER}")
+    return BeautifulSoup(markup, FALLBACK_PARSER)
+
+
+class PrioritySelector:
+    """按优先级排列的一组CSS选择器
+
+    所有选择器合并成一个联合选择器，只遍历文档树一次；
+    再对命中的少量元素逐个判断属于哪些选择器，结果按选择器优先级排序。
+    """
+
+    def __init__(self, selectors: Sequence[str]):
+        self.selectors = list(selectors)
+        self._parts = [soupsieve.compile(selector) for selector in self.selectors]
+        self._union = soupsieve.compile(', '.join(self.selectors)) if self.selectors else None
+
+    def buckets(self, tag: Tag) -> List[List[Tag]]:
+        """返回每个选择器命中的元素（文档顺序），与逐个调用select结果一致"""
+        buckets: List[List[Tag]] = [[] for _ in self._parts]
+        if self._union is None:
+            return buckets
+        for element in self._union.select(tag):
+            for index, part in enumerate(self._parts):
+                if part.match(element):
+                    buckets[index].append(element)
+        return buckets
+
+    def iter_first(self, tag: Tag) -> Iterator[Tag]:
+        """按优先级依次返回每个选择器的第一个命中元素，等价于逐个select_one"""
+        yielded = set()
+        for bucket in self.buckets(tag):
+            if bucket and id(bucket[0]) not in yielded:
+                yielded.add(id(bucket[0]))
+                yield bucket[0]
+
+    def iter_all(self, tag: Tag) -> Iterator[Tag]:
+        """按优先级、文档顺序返回所有命中元素，每个元素只返回一次"""
+        yielded = set()
+        for bucket in self.buckets(tag):
+            for element in bucket:
+                if id(element) not in yielded:
+                    yielded.add(id(element))
+                    yield element
+
+    def __bool__(self) -> bool:
+        return bool(self.selectors)
@@ -0,0 +1,147 @@
+"""
+Near-duplicate story detection with SimHash
+"""
+import hashlib
+import logging
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.news_service import NewsRepository
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+BAND_COUNT = 4  # 汉明距离≤3时，4个16位分段中至少有一段完全相同
+BAND_BITS = FINGERPRINT_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def _hash_token(token: str) -> int:
+    """计算特征的64位哈希"""
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """计算文本的64位SimHash指纹（基于词级shingle）"""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return 0
+    if len(tokens) >= shingle_size:
+        features = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        features = [' '.join(tokens)]
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        value = _hash_token(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个指纹的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+def article_fingerprint(title: str, content: str, max_content_chars: int = 2000) -> int:
+    """由标题和正文开头计算文章指纹"""
+    return simhash(f"{title or ''} {(content or '')[:max_content_chars]}")
+
+
+class SimHashIndex:
+    """SimHash分段索引：按16位分段做LSH，查找汉明距离阈值内的已知指纹"""
+
+    def __init__(self, max_distance: Optional[int] = None):
+        self.max_distance = settings.near_duplicate_max_distance if max_distance is None else max_distance
+        self._bands: List[Dict[int, List[Tuple[int, int]]]] = [defaultdict(list) for _ in range(BAND_COUNT)]
+        self._size = 0
+
+    @staticmethod
+    def _band_keys(fingerprint: int) -> List[int]:
+        return [(fingerprint >> (band * BAND_BITS)) & BAND_MASK for band in range(BAND_COUNT)]
+
+    def add(self, fingerprint: int, cluster_id: int) -> None:
+        """加入一个指纹及其所属故事簇"""
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            self._bands[band][key].append((fingerprint, cluster_id))
+        self._size += 1
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """返回最相近的故事簇ID，没有近似重复时返回None"""
+        best: Optional[Tuple[int, int]] = None
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for candidate, cluster_id in self._bands[band].get(key, ()):
+                distance = hamming_distance(fingerprint, candidate)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, cluster_id)
+        return best[1] if best else None
+
+    def clear(self) -> None:
+        for band in self._bands:
+            band.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class StoryClusterer:
+    """入库时为新文章分配故事簇
+
+    每个簇以第一篇文章（代表文章）的ID作为簇ID，
+    AI处理只需处理代表文章，其余文章复用其结果。
+    """
+
+    # 索引按时间窗口定期重建
+    REBUILD_INTERVAL_SECONDS = 3600
+
+    def __init__(self, index: Optional[SimHashIndex] = None):
+        self.index = index or SimHashIndex()
+        self._loaded_at: Optional[float] = None
+
+    def ensure_loaded(self, repo: NewsRepository) -> None:
+        """从数据库加载时间窗口内的指纹，过期后重建"""
+        if self._loaded_at is not None and time.time() - self._loaded_at < self.REBUILD_INTERVAL_SECONDS:
+            return
+        self.index.clear()
+        since = datetime.utcnow() - timedelta(days=settings.near_duplicate_window_days)
+        for fingerprint, cluster_id in repo.iter_story_fingerprints(since):
+            self.index.add(int(fingerprint, 16), cluster_id)
+        self._loaded_at = time.time()
+        logger.info(f"Story index loaded with {len(self.index)} fingerprints")
+
+    def assign(self, repo: NewsRepository, article_ids: List[int]) -> Dict[int, int]:
+        """为新入库的文章计算指纹并分配故事簇，返回 {文章ID: 簇ID}"""
+        if not article_ids:
+            return {}
+        self.ensure_loaded(repo)
+
+        assignments: Dict[int, Tuple[str, int]] = {}
+        for article in repo.get_articles_by_ids(article_ids):
+            fingerprint = article_fingerprint(article.original_title, article.original_content)
+            cluster_id = self.index.find(fingerprint)
+            if cluster_id is None:
+                cluster_id = article.id
+            else:
+                logger.info(f"Article {article.id} is a near-duplicate of story {cluster_id}")
+            self.index.add(fingerprint, cluster_id)
+            assignments[article.id] = (f"{fingerprint:016x}", cluster_id)
+
+        repo.update_story_clusters(assignments)
+        return {article_id: cluster_id for article_id, (_, cluster_id) in assignments.items()}
+
+
+# 全局故事聚类器
+story_clusterer = StoryClusterer()
@@ -2,13 +2,15 @@
 News service layer - Repository pattern implementation
 """
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc, and_, or_, func
 
-from app.models.news import NewsArticle, NewsSource
+from app.models.news import CrawlRun, NewsArticle, NewsSource
 from app.core.config import settings
+from app.services.url_canonical import canonicalize_url
 
 
 class NewsRepository:
@@ -38,6 +40,17 @@ class NewsRepository:
         """获取所有活跃的新闻源"""
         return self.db.query(NewsSource).filter(NewsSource.is_active == True).all()
     
+    def get_due_sources(self, now: Optional[datetime] = None) -> List[NewsSource]:
+        """获取到期需要抓取的活跃新闻源（从未抓取过的也算到期，熔断冷却期内的不算）"""
+        now = now or datetime.utcnow()
+        return self.db.query(NewsSource).filter(
+            and_(
+                NewsSource.is_active == True,
+                or_(NewsSource.next_crawl_at.is_(None), NewsSource.next_crawl_at <= now),
+                or_(NewsSource.circuit_open_until.is_(None), NewsSource.circuit_open_until <= now)
+            )
+        ).order_by(asc(NewsSource.next_crawl_at)).all()
+    
     def get_sources_by_category(self, category: str) -> List[NewsSource]:
         """根据分类获取新闻源"""
         return self.db.query(NewsSource).filter(
@@ -67,12 +80,117 @@ class NewsRepository:
     # NewsArticle operations
     def create_article(self, article_data: Dict[str, Any]) -> NewsArticle:
         """创建新闻文章"""
+        if not article_data.get('canonical_url') and article_data.get('source_url'):
+            article_data = {**article_data, 'canonical_url': canonicalize_url(article_data['source_url'])}
         article = NewsArticle(**article_data)
         self.db.add(article)
         self.db.commit()
         self.db.refresh(article)
         return article
     
+    def bulk_create_articles(self, articles_data: List[Dict[str, Any]]) -> List[int]:
+        """批量创建新闻文章：按规范化URL去重，一次提交，返回新文章ID"""
+        # 批内按规范化URL去重，保留第一次出现的文章
+        unique_articles: Dict[str, Dict[str, Any]] = {}
+        for article_data in articles_data:
+            source_url = article_data.get('source_url')
+            if not source_url:
+                continue
+            canonical_url = article_data.get('canonical_url') or canonicalize_url(source_url)
+            if canonical_url not in unique_articles:
+                unique_articles[canonical_url] = {**article_data, 'canonical_url': canonical_url}
+        
+        if not unique_articles:
+            return []
+        
+        existing_canonical_urls = self.get_existing_canonical_urls(list(unique_articles))
+        existing_urls = self.get_existing_article_urls(
+            [article_data['source_url'] for article_data in unique_articles.values()]
+        )
+        new_articles_data = [
+            article_data for canonical_url, article_data in unique_articles.items()
+            if canonical_url not in existing_canonical_urls
+            and article_data['source_url'] not in existing_urls
+        ]
+        if not new_articles_data:
+            return []
+        
+        try:
+            articles = [NewsArticle(**article_data) for article_data in new_articles_data]
+            self.db.add_all(articles)
+            self.db.flush()
+            # 提交前读取ID，避免提交后逐行刷新
+            article_ids = [article.id for article in articles]
+            self.db.commit()
+            return article_ids
+        except IntegrityError:
+            # 并发写入导致URL冲突时，退回逐条插入并跳过冲突行
+            self.db.rollback()
+            article_ids = []
+            for article_data in new_articles_data:
+                try:
+                    article_ids.append(self.create_article(article_data).id)
+                except IntegrityError:
+                    self.db.rollback()
+            return article_ids
+    
+    def get_existing_article_urls(self, source_urls: List[str], chunk_size: int = 500) -> Set[str]:
+        """批量查询已存在的文章URL"""
+        existing_urls: Set[str] = set()
+        # 分块查询，避免超出SQLite的参数数量限制
+        for start in range(0, len(source_urls), chunk_size):
+            chunk = source_urls[start:start + chunk_size]
+            rows = self.db.query(NewsArticle.source_url).filter(
+                NewsArticle.source_url.in_(chunk)
+            ).all()
+            existing_urls.update(row.source_url for row in rows)
+        return existing_urls
+    
+    def get_existing_canonical_urls(self, canonical_urls: List[str], chunk_size: int = 500) -> Set[str]:
+        """批量查询已存在的规范化URL"""
+        existing_urls: Set[str] = set()
+        for start in range(0, len(canonical_urls), chunk_size):
+            chunk = canonical_urls[start:start + chunk_size]
+            rows = self.db.query(NewsArticle.canonical_url).filter(
+                NewsArticle.canonical_url.in_(chunk)
+            ).all()
+            existing_urls.update(row.canonical_url for row in rows)
+        return existing_urls
+    
+    def iter_article_urls(self, batch_size: int = 1000) -> Iterator[str]:
+        """逐批遍历所有文章URL（优先返回规范化URL）"""
+        query = self.db.query(NewsArticle.source_url, NewsArticle.canonical_url).yield_per(batch_size)
+        for row in query:
+            yield row.canonical_url or row.source_url
+    
+    def get_articles_by_ids(self, article_ids: List[int]) -> List[NewsArticle]:
+        """根据ID列表获取新闻文章"""
+        if not article_ids:
+            return []
+        return self.db.query(NewsArticle).filter(NewsArticle.id.in_(article_ids)).order_by(asc(NewsArticle.id)).all()
+    
+    def iter_story_fingerprints(self, since: datetime, batch_size: int = 1000) -> Iterator[Tuple[str, int]]:
+        """遍历指定时间之后入库文章的(指纹, 故事簇ID)"""
+        query = self.db.query(NewsArticle.simhash, NewsArticle.story_cluster_id).filter(
+            and_(
+                NewsArticle.created_at >= since,
+                NewsArticle.simhash.isnot(None),
+                NewsArticle.story_cluster_id.isnot(None)
+            )
+        ).yield_per(batch_size)
+        for row in query:
+            yield row.simhash, row.story_cluster_id
+    
+    def update_story_clusters(self, assignments: Dict[int, Tuple[str, int]]) -> None:
+        """批量写入文章指纹和故事簇：{文章ID: (指纹, 簇ID)}"""
+        if not assignments:
+            return
+        self.db.bulk_update_mappings(NewsArticle, [
+            {'id': article_id, 'simhash': fingerprint, 'story_cluster_id': cluster_id}
+            for article_id, (fingerprint, cluster_id) in assignments.items()
+        ])
+        self.db.commit()
+    
     def get_article_by_id(self, article_id: int) -> Optional[NewsArticle]:
         """根据ID获取新闻文章"""
         return self.db.query(NewsArticle).filter(NewsArticle.id == article_id).first()
@@ -185,6 +303,41 @@ class NewsRepository:
         """获取未处理的新闻文章"""
         return self.db.query(NewsArticle).filter(NewsArticle.is_processed == False).order_by(desc(NewsArticle.created_at)).limit(limit).all()
     
+    def get_untranslated_title_articles(self, limit: int = 50) -> List[NewsArticle]:
+        """获取标题尚未翻译的英文文章，最新的在前"""
+        return self.db.query(NewsArticle).filter(
+            NewsArticle.original_language == 'en',
+            NewsArticle.is_title_translated == False,
+            NewsArticle.original_title.isnot(None)
+        ).order_by(desc(NewsArticle.created_at)).limit(limit).all()
+    
+    # CrawlRun operations
+    def create_crawl_run(self, run_data: Dict[str, Any]) -> CrawlRun:
+        """保存一次抓取运行的统计"""
+        run = CrawlRun(**run_data)
+        self.db.add(run)
+        self.db.commit()
+        self.db.refresh(run)
+        return run
+    
+    def get_crawl_runs(self, limit: int = 20) -> List[CrawlRun]:
+        """获取最近的抓取运行记录"""
+        return self.db.query(CrawlRun).order_by(desc(CrawlRun.started_at)).limit(limit).all()
+    
+    def get_crawl_run(self, run_id: int) -> Optional[CrawlRun]:
+        """根据ID获取抓取运行记录"""
+        return self.db.query(CrawlRun).filter(CrawlRun.id == run_id).first()
+    
+    def delete_old_crawl_runs(self, days: int = None) -> int:
+        """删除旧的抓取运行记录"""
+        if days is None:
+            days = settings.crawl_run_retention_days
+        
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        deleted_count = self.db.query(CrawlRun).filter(CrawlRun.started_at < cutoff_date).delete()
+        self.db.commit()
+        return deleted_count
+    
     # Statistics
     def get_statistics(self) -> Dict[str, Any]:
         """获取统计信息"""
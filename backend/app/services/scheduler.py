@@ -10,6 +10,7 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 from app.core.config import settings
+from app.services.crawl_frontier import CrawlFrontier
 from app.services.crawler import WebCrawler
 from app.services.news_service import NewsRepository
 from app.core.database import SessionLocal
@@ -27,13 +28,16 @@ class NewsScheduler:
     def start(self):
         """启动调度器"""
         if not self.is_running:
-            # 添加定时采集任务
+            # 添加定时采集任务：定期检查并抓取到期的新闻源，
+            # 每个新闻源的抓取间隔按其发布速率自适应调整
             self.scheduler.add_job(
                 func=self._crawl_job,
-                trigger=CronTrigger(hour='*/6'),  # 每6小时执行一次
+                trigger=IntervalTrigger(minutes=settings.crawl_tick_minutes),
                 id='news_crawl',
                 name='News Collection Job',
-                replace_existing=True
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
             )
             
             # 添加数据清理任务
@@ -67,20 +71,27 @@ class NewsScheduler:
             logger.info("News scheduler stopped")
     
     async def _crawl_job(self):
-        """新闻采集任务"""
-        logger.info("Starting news collection job")
-        
+        """新闻采集任务：只抓取已到期的新闻源"""
         try:
             db = SessionLocal()
             repo = NewsRepository(db)
             
+            if not repo.get_due_sources():
+                logger.debug("No news sources due for crawling")
+                return
+            
+            logger.info("Starting news collection job")
             async with WebCrawler(repo) as crawler:
-                results = await crawler.crawl_news_sources()
+                results = await crawler.crawl_news_sources(due_only=True)
                 
                 logger.info(f"News collection completed: {results}")
                 
                 # 记录任务执行结果
                 self._log_job_result('crawl', results)
+            
+            # 新文章入库后先批量翻译标题，完整AI处理由定时任务稍后完成
+            if results.get('new_articles'):
+                await self._translate_titles_job(repo)
                 
         except Exception as e:
             logger.error(f"Error in news collection job: {e}")
@@ -99,11 +110,17 @@ class NewsScheduler:
             
             # 删除旧文章
             deleted_count = repo.delete_old_articles()
+            # 删除抓取队列中已结束的旧条目和旧的抓取运行统计
+            purged_count = CrawlFrontier(db).purge()
+            repo.delete_old_crawl_runs()
             
-            logger.info(f"Data cleanup completed: deleted {deleted_count} old articles")
+            logger.info(
+                f"Data cleanup completed: deleted {deleted_count} old articles, "
+                f"purged {purged_count} frontier items"
+            )
             
             # 记录任务执行结果
-            self._log_job_result('cleanup', {'deleted_count': deleted_count})
+            self._log_job_result('cleanup', {'deleted_count': deleted_count, 'purged_count': purged_count})
             
         except Exception as e:
             logger.error(f"Error in data cleanup job: {e}")
@@ -112,6 +129,17 @@ class NewsScheduler:
             if 'db' in locals():
                 db.close()
 
+    async def _translate_titles_job(self, repo: NewsRepository):
+        """批量翻译新文章标题"""
+        try:
+            from app.services.ai_processor import AIProcessor
+            processor = AIProcessor(repo)
+            results = await processor.translate_pending_titles()
+            self._log_job_result('translate_titles', results)
+        except Exception as e:
+            logger.error(f"Error in title translation job: {e}")
+            self._log_job_result('translate_titles', {'error': str(e)})
+    
     async def _ai_process_job(self):
         """AI处理任务：每10分钟处理未处理新闻"""
         logger.info("Starting AI process job (定时AI处理未处理新闻)")
@@ -0,0 +1,138 @@
+"""
+Declarative per-site crawl profiles
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern
+from urllib.parse import urlparse
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+from app.core.config import settings
+from app.services.browser_pool import WaitStrategy
+from app.services.html_parser import PrioritySelector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_PATH = Path(__file__).with_name('site_profiles.json')
+
+
+@dataclass
+class SiteProfile:
+    """站点抓取配置，选择器和正则在加载时编译一次"""
+    domain: str
+    link_selector: str
+    link_pattern: Optional[str] = None
+    title_min_length: int = 10
+    content_selectors: List[str] = field(default_factory=list)
+    listing_wait: WaitStrategy = field(default_factory=WaitStrategy)
+    article_wait: WaitStrategy = field(default_factory=WaitStrategy)
+    language: str = 'en'
+
+    def __post_init__(self):
+        self._link_selector = soupsieve.compile(self.link_selector)
+        self._link_pattern: Optional[Pattern] = re.compile(self.link_pattern) if self.link_pattern else None
+        self._content_selector = PrioritySelector(self.content_selectors)
+
+    def select_links(self, soup: BeautifulSoup) -> List[Tag]:
+        """选出文章链接"""
+        links = self._link_selector.select(soup)
+        if self._link_pattern is None:
+            return links
+        return [link for link in links if self._link_pattern.search(link.get('href') or '')]
+
+    def is_valid_title(self, title: str) -> bool:
+        """标题规则"""
+        return bool(title) and len(title) >= self.title_min_length
+
+    def iter_content_candidates(self, soup: BeautifulSoup):
+        """按优先级依次返回正文候选元素（一次遍历文档树）"""
+        return self._content_selector.iter_first(soup)
+
+
+def _wait_strategy(config: Dict[str, Any], default: WaitStrategy) -> WaitStrategy:
+    """由配置生成等待策略，未指定的字段沿用默认值"""
+    return WaitStrategy(
+        wait_until=config.get('wait_until', default.wait_until),
+        selector=config.get('selector', default.selector),
+        selector_timeout_ms=config.get('selector_timeout_ms', default.selector_timeout_ms),
+    )
+
+
+class SiteRegistry:
+    """按注册域名查找站点配置的注册表"""
+
+    def __init__(self, default: SiteProfile, sites: Optional[Dict[str, SiteProfile]] = None):
+        self.default = default
+        self.sites: Dict[str, SiteProfile] = dict(sites or {})
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SiteRegistry':
+        """由配置字典构建注册表，站点配置继承默认配置"""
+        default_config = config.get('default', {})
+        default = cls._build_profile('*', default_config, None)
+        registry = cls(default)
+        for domain, site_config in config.get('sites', {}).items():
+            registry.register(cls._build_profile(domain, site_config, default))
+        return registry
+
+    @classmethod
+    def from_files(cls, *paths: Path) -> 'SiteRegistry':
+        """加载一个或多个配置文件，后面的文件覆盖前面的站点"""
+        merged: Dict[str, Any] = {'default': {}, 'sites': {}}
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                config = json.load(f)
+            merged['default'].update(config.get('default', {}))
+            merged['sites'].update(config.get('sites', {}))
+        return cls.from_config(merged)
+
+    @staticmethod
+    def _build_profile(domain: str, config: Dict[str, Any], default: Optional[SiteProfile]) -> SiteProfile:
+        default_wait = WaitStrategy(wait_until=settings.browser_default_wait_until)
+        content_selectors = list(config.get('content_selectors', []))
+        if default is not None:
+            # 站点选择器优先，其后回退到通用选择器
+            content_selectors += [s for s in default.content_selectors if s not in content_selectors]
+        return SiteProfile(
+            domain=domain,
+            link_selector=config.get('link_selector', default.link_selector if default else 'a[href]'),
+            link_pattern=config.get('link_pattern'),
+            title_min_length=config.get('title_min_length', default.title_min_length if default else 10),
+            content_selectors=content_selectors,
+            listing_wait=_wait_strategy(config.get('listing_wait', {}), default.listing_wait if default else default_wait),
+            article_wait=_wait_strategy(config.get('article_wait', {}), default.article_wait if default else default_wait),
+            language=config.get('language', default.language if default else 'en'),
+        )
+
+    def register(self, profile: SiteProfile) -> None:
+        """注册或替换站点配置"""
+        self.sites[profile.domain.lower()] = profile
+
+    def get(self, url: str) -> SiteProfile:
+        """按主机名逐级匹配父域名，如 edition.cnn.com -> cnn.com"""
+        host = (urlparse(url).hostname or '').lower()
+        while host:
+            profile = self.sites.get(host)
+            if profile is not None:
+                return profile
+            host = host.partition('.')[2]
+        return self.default
+
+
+def load_site_registry() -> SiteRegistry:
+    """加载内置站点配置，以及配置项指定的额外配置文件"""
+    paths = [DEFAULT_PROFILES_PATH]
+    if settings.site_profiles_file:
+        paths.append(Path(settings.site_profiles_file))
+    registry = SiteRegistry.from_files(*paths)
+    logger.debug(f"Loaded {len(registry.sites)} site profiles")
+    return registry
+
+
+# 全局站点注册表
+site_registry = load_site_registry()
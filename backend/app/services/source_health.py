@@ -0,0 +1,170 @@
+"""
+Per-source health tracking and circuit breaker
+"""
+import json
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.news import NewsSource
+from app.services.news_service import NewsRepository
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """最近邻法百分位数"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def load_samples(source: NewsSource) -> List[float]:
+    """读取新闻源最近的抓取耗时样本（毫秒）"""
+    if not source.latency_samples:
+        return []
+    try:
+        return [float(sample) for sample in json.loads(source.latency_samples)]
+    except (TypeError, ValueError):
+        return []
+
+
+class SourceHealthPolicy:
+    """新闻源健康状态与熔断策略
+
+    - 记录连续失败次数、最近成功/失败时间和最近N次抓取耗时的p50/p95
+    - 连续失败达到阈值后熔断（open），冷却期内跳过该新闻源；
+      冷却期随连续失败次数翻倍，不超过上限
+    - 冷却期结束后放行一次探测请求（half_open）：成功则恢复，失败则重新熔断
+    - 慢速新闻源排在最后抓取，并按其p95耗时缩短超时时间
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[timedelta] = None,
+        max_cooldown: Optional[timedelta] = None,
+        latency_window: Optional[int] = None,
+        slow_latency_ms: Optional[float] = None,
+        timeout_multiplier: Optional[float] = None,
+        min_timeout: Optional[float] = None,
+    ):
+        self.failure_threshold = failure_threshold or settings.source_failure_threshold
+        self.cooldown = cooldown or timedelta(minutes=settings.source_cooldown_minutes)
+        self.max_cooldown = max_cooldown or timedelta(minutes=settings.source_max_cooldown_minutes)
+        self.latency_window = latency_window or settings.source_latency_window
+        self.slow_latency_ms = slow_latency_ms or settings.source_slow_latency_ms
+        self.timeout_multiplier = timeout_multiplier or settings.source_timeout_multiplier
+        self.min_timeout = min_timeout or settings.source_min_timeout_seconds
+
+    def circuit_state(self, source: NewsSource, now: Optional[datetime] = None) -> str:
+        """当前熔断状态，冷却期已过的熔断视为半开"""
+        now = now or datetime.utcnow()
+        if source.circuit_state in (None, CIRCUIT_CLOSED):
+            return CIRCUIT_CLOSED
+        if source.circuit_open_until and source.circuit_open_until > now:
+            return CIRCUIT_OPEN
+        return CIRCUIT_HALF_OPEN
+
+    def is_slow(self, source: NewsSource) -> bool:
+        return source.latency_p95_ms is not None and source.latency_p95_ms > self.slow_latency_ms
+
+    def select(self, sources: List[NewsSource], now: Optional[datetime] = None) -> List[NewsSource]:
+        """去掉熔断中的新闻源；健康的快速新闻源先抓，慢速和探测中的排在后面"""
+        now = now or datetime.utcnow()
+        selected = []
+        for source in sources:
+            state = self.circuit_state(source, now)
+            if state == CIRCUIT_OPEN:
+                logger.debug(f"Skipping {source.name}: circuit open until {source.circuit_open_until}")
+                continue
+            if state == CIRCUIT_HALF_OPEN:
+                logger.info(f"Probing {source.name} after cooling off")
+            selected.append((state == CIRCUIT_HALF_OPEN, self.is_slow(source), source.latency_p95_ms or 0, source))
+        skipped = len(sources) - len(selected)
+        if skipped:
+            logger.info(f"Skipped {skipped} sources with open circuits")
+        # 排序稳定，同一档内保持原顺序
+        selected.sort(key=lambda entry: entry[:3])
+        return [entry[3] for entry in selected]
+
+    def timeout_for(self, source: NewsSource) -> Optional[float]:
+        """按历史p95耗时设置超时（秒），没有样本时使用默认超时"""
+        if source.latency_p95_ms is None:
+            return None
+        timeout = source.latency_p95_ms / 1000 * self.timeout_multiplier
+        return min(float(settings.http_timeout_seconds), max(self.min_timeout, timeout))
+
+    def on_success(self, source: NewsSource, latency_ms: float, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """抓取成功后需要更新的字段：关闭熔断，清零连续失败"""
+        now = now or datetime.utcnow()
+        update = self._latency_update(source, latency_ms)
+        update.update({
+            'consecutive_failures': 0,
+            'last_success_at': now,
+            'circuit_state': CIRCUIT_CLOSED,
+            'circuit_open_until': None,
+        })
+        return update
+
+    def on_failure(
+        self,
+        source: NewsSource,
+        error: str,
+        latency_ms: Optional[float] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """抓取失败后需要更新的字段；达到阈值或探测失败时熔断"""
+        now = now or datetime.utcnow()
+        failures = (source.consecutive_failures or 0) + 1
+        # 超时等失败也计入耗时，慢速新闻源的p95才能反映真实情况
+        update = self._latency_update(source, latency_ms) if latency_ms is not None else {}
+        update.update({
+            'consecutive_failures': failures,
+            'last_failure_at': now,
+            'last_error': error[:500] if error else None,
+        })
+        probing = self.circuit_state(source, now) == CIRCUIT_HALF_OPEN
+        if probing or failures >= self.failure_threshold:
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** max(0, failures - self.failure_threshold))
+            update['circuit_state'] = CIRCUIT_OPEN
+            update['circuit_open_until'] = now + cooldown
+            logger.warning(
+                f"Circuit opened for {source.name} after {failures} consecutive failures, "
+                f"cooling off until {update['circuit_open_until']:%Y-%m-%d %H:%M}"
+            )
+        return update
+
+    def _latency_update(self, source: NewsSource, latency_ms: float) -> Dict[str, Any]:
+        samples = (load_samples(source) + [round(latency_ms, 1)])[-self.latency_window:]
+        return {
+            'latency_samples': json.dumps(samples),
+            'latency_p50_ms': percentile(samples, 50),
+            'latency_p95_ms': percentile(samples, 95),
+        }
+
+    def record(
+        self,
+        repo: NewsRepository,
+        source: NewsSource,
+        latency_ms: float,
+        error: Optional[str] = None
+    ) -> None:
+        """记录一次抓取结果"""
+        if error is None:
+            update = self.on_success(source, latency_ms)
+        else:
+            update = self.on_failure(source, error, latency_ms)
+        repo.update_source(source.id, update)
+
+
+# 全局新闻源健康策略
+source_health = SourceHealthPolicy()
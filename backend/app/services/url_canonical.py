@@ -0,0 +1,64 @@
+"""
+URL canonicalization for article dedup and cache keys
+"""
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'yclid',
+    'mc_cid', 'mc_eid', '_ga', '_gl',
+    'ref', 'ref_src', 'referrer', 'cmpid', 'cmp', 'ocid', 'smid', 'smtyp',
+    'amp', 'outputtype',
+})
+TRACKING_PREFIXES = ('utm_', 'at_', 'pk_', 'mtm_')
+
+# 常见的子域名前缀，同一站点的不同入口
+STRIP_HOST_PREFIXES = ('www.', 'amp.', 'm.', 'mobile.')
+
+_AMP_SUFFIX = re.compile(r'\.amp(?=\.html?$)|\.amp$', re.IGNORECASE)
+_MULTI_SLASH = re.compile(r'/{2,}')
+
+
+def canonicalize_url(url: str, base_url: Optional[str] = None) -> str:
+    """将URL规范化为去重键
+
+    - 补全相对地址，统一为https、小写域名，去掉www/amp/m前缀和默认端口
+    - 去掉片段、跟踪参数（utm_*、fbclid等），其余参数排序
+    - 去掉AMP路径变体和末尾斜杠
+
+    规范化结果只用于比较和索引，不保证可以直接访问。
+    """
+    if not url:
+        return ''
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url, url)
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https'):
+        return url
+
+    host = (parts.hostname or '').lower().rstrip('.')
+    for prefix in STRIP_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = _MULTI_SLASH.sub('/', parts.path or '/')
+    segments = [segment for segment in path.split('/') if segment.lower() != 'amp']
+    path = _AMP_SUFFIX.sub('', '/'.join(segments)) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ))
+
+    return urlunsplit(('https', host, path, query, ''))
@@ -0,0 +1,65 @@
+"""
+In-process filter of article URLs that are already stored
+"""
+import hashlib
+import logging
+from typing import Iterable, Set
+
+from app.services.news_service import NewsRepository
+from app.services.url_canonical import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class SeenUrlFilter:
+    """已入库文章URL的集合
+
+    URL先规范化再取64位哈希，内存占用远小于保存完整URL；
+    进程启动后首次使用时从数据库重建，之后随入库增量更新。
+    """
+
+    def __init__(self):
+        self._hashes: Set[int] = set()
+        self._loaded = False
+
+    @staticmethod
+    def _hash(url: str) -> int:
+        """计算规范化URL的64位哈希"""
+        key = canonicalize_url(url)
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def ensure_loaded(self, repo: NewsRepository) -> None:
+        """首次使用时从数据库加载所有文章URL"""
+        if self._loaded:
+            return
+        self.add_many(repo.iter_article_urls())
+        self._loaded = True
+        logger.info(f"Seen URL filter loaded with {len(self._hashes)} URLs")
+
+    def add(self, url: str) -> None:
+        """记录一个已入库的URL"""
+        if url:
+            self._hashes.add(self._hash(url))
+
+    def add_many(self, urls: Iterable[str]) -> None:
+        """批量记录已入库的URL"""
+        self._hashes.update(self._hash(url) for url in urls if url)
+
+    def reset(self) -> None:
+        """清空过滤器，下次使用时重新加载"""
+        self._hashes.clear()
+        self._loaded = False
+
+    def __contains__(self, url: str) -> bool:
+        return bool(url) and self._hash(url) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+# 全局过滤器实例
+seen_urls = SeenUrlFilter()
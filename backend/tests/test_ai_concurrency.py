@@ -0,0 +1,212 @@
+"""
+Concurrent and combined AI processing tests
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.services.ai_processor import AIProcessor, LLMResponse, parse_combined_response
+from app.services.news_service import NewsRepository
+
+CONTENT = (
+    "The city council approved a new budget on Tuesday that increases spending on "
+    "public transport and road maintenance, while cutting administrative costs."
+)
+REPLY = "市议会周二批准新预算，增加公共交通和道路维护支出，同时削减行政开支。"
+CALL_DELAY = 0.1
+
+
+class SlowLLM:
+    """每次调用等待CALL_DELAY秒，记录最大并发数"""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(CALL_DELAY)
+        finally:
+            self.in_flight -= 1
+        return LLMResponse(content=REPLY)
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    """调用次数断言不受全局LLM缓存影响"""
+    monkeypatch.setattr(settings, 'llm_cache_enabled', False)
+
+
+@pytest.fixture
+def repo():
+    """Repository fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield NewsRepository(db)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def article_ids(repo):
+    """6篇未处理的英文文章"""
+    source = repo.create_source({"name": "Wire", "url": "https://wire.com", "type": "rss", "category": "测试"})
+    return repo.bulk_create_articles([
+        {
+            "original_title": f"Council approves budget {n}",
+            "original_content": f"{CONTENT} ({n})",
+            "source_url": f"https://wire.com/budget{n}",
+            "source_id": source.id,
+            "source_name": source.name,
+            "original_language": "en"
+        }
+        for n in range(6)
+    ])
+
+
+@pytest.mark.asyncio
+async def test_single_article_calls_run_concurrently(repo, article_ids):
+    """测试单篇文章的摘要、标题翻译、正文翻译并发调用"""
+    llm = SlowLLM()
+    processor = AIProcessor(repo, llm=llm, concurrency=3, combined=False)
+
+    started = time.perf_counter()
+    assert await processor.process_single_article(repo.get_article_by_id(article_ids[0]))
+    elapsed = time.perf_counter() - started
+
+    assert llm.calls == 3
+    assert llm.max_in_flight == 3
+    assert elapsed < CALL_DELAY * 2
+    article = repo.get_article_by_id(article_ids[0])
+    assert article.is_processed
+    assert article.translated_title == REPLY
+    assert article.translated_content == REPLY
+
+
+@pytest.mark.asyncio
+async def test_process_articles_bounded_by_semaphore(repo, article_ids):
+    """测试多篇文章同时处理，LLM并发数不超过信号量，并报告吞吐量"""
+    llm = SlowLLM()
+    processor = AIProcessor(repo, llm=llm, concurrency=6, combined=False)
+
+    started = time.perf_counter()
+    results = await processor.process_articles(limit=10)
+    elapsed = time.perf_counter() - started
+
+    assert results['success_count'] == 6
+    assert results['error_count'] == 0
+    assert results['api_calls'] == 18
+    assert llm.max_in_flight == 6
+    # 18次调用、6路并发：约3轮延迟，串行需要18轮
+    assert elapsed < CALL_DELAY * 8
+    assert results['articles_per_minute'] > 0
+    assert results['elapsed_seconds'] <= round(elapsed, 2) + 0.01
+    assert all(repo.get_article_by_id(i).is_processed for i in article_ids)
+
+
+@pytest.mark.asyncio
+async def test_process_articles_counts_failures(repo, article_ids):
+    """测试个别文章失败不影响其他文章"""
+    llm = SlowLLM()
+    processor = AIProcessor(repo, llm=llm, concurrency=4, combined=False)
+
+    async def fail_for_first(content):
+        if content.endswith("(0)"):
+            return None
+        return REPLY
+
+    processor._generate_summary_zh = fail_for_first
+    results = await processor.process_articles(limit=10)
+
+    assert results['success_count'] == 5
+    assert results['error_count'] == 1
+    assert not repo.get_article_by_id(article_ids[0]).is_processed
+
+
+class ScriptedLLM:
+    """合并调用返回预设回复，单独调用返回REPLY"""
+
+    def __init__(self, combined_reply):
+        self.combined_reply = combined_reply
+        self.prompts = []
+
+    async def ainvoke(self, messages):
+        prompt = messages[0].content
+        self.prompts.append(prompt)
+        return LLMResponse(content=self.combined_reply if "JSON" in prompt else REPLY)
+
+
+def test_parse_combined_response():
+    """测试合并回复解析：代码块、前后说明文字、字段校验"""
+    full = {"summary_zh": REPLY, "translated_title": "市议会批准新预算", "translated_content": REPLY}
+    assert parse_combined_response(json.dumps(full, ensure_ascii=False)) == full
+    fenced = f"以下是结果：\n```json\n{json.dumps(full, ensure_ascii=False)}\n```"
+    assert parse_combined_response(fenced) == full
+    partial = {"summary_zh": REPLY, "translated_title": "短", "translated_content": 42}
+    assert parse_combined_response(json.dumps(partial, ensure_ascii=False)) == {"summary_zh": REPLY}
+    assert parse_combined_response("not json") == {}
+    assert parse_combined_response('{"summary_zh": ') == {}
+
+
+@pytest.mark.asyncio
+async def test_combined_processing_single_call(repo, article_ids):
+    """测试合并处理一次调用得到全部字段"""
+    reply = json.dumps({
+        "summary_zh": REPLY, "translated_title": "市议会批准新预算", "translated_content": REPLY + "（全文）"
+    }, ensure_ascii=False)
+    llm = ScriptedLLM(reply)
+    processor = AIProcessor(repo, llm=llm, combined=True)
+
+    assert await processor.process_single_article(repo.get_article_by_id(article_ids[0]))
+
+    assert len(llm.prompts) == 1
+    article = repo.get_article_by_id(article_ids[0])
+    assert article.summary_zh == REPLY
+    assert article.translated_title == "市议会批准新预算"
+    assert article.translated_content == REPLY + "（全文）"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reply,expected_calls", [
+    (json.dumps({"summary_zh": REPLY, "translated_title": "市议会批准新预算"}, ensure_ascii=False), 2),
+    ("抱歉，我无法处理。", 4),
+])
+async def test_combined_processing_falls_back_per_field(repo, article_ids, reply, expected_calls):
+    """测试合并回复缺失或无法解析的字段回退为单独调用"""
+    llm = ScriptedLLM(reply)
+    processor = AIProcessor(repo, llm=llm, combined=True)
+
+    assert await processor.process_single_article(repo.get_article_by_id(article_ids[0]))
+
+    assert len(llm.prompts) == expected_calls
+    article = repo.get_article_by_id(article_ids[0])
+    assert article.summary_zh == REPLY
+    assert article.translated_content == REPLY
+    assert article.is_content_translated
+
+
+@pytest.mark.asyncio
+async def test_processors_share_backend_concurrency_limit(repo, article_ids):
+    """测试同一后端上的多个处理器（API请求、定时任务）共享并发上限"""
+    llm = SlowLLM()
+    first = AIProcessor(repo, llm=llm, concurrency=2, combined=False)
+    second = AIProcessor(repo, llm=llm, combined=False)
+    assert second.semaphore is first.semaphore
+
+    await asyncio.gather(
+        first.process_single_article(repo.get_article_by_id(article_ids[0])),
+        second.process_single_article(repo.get_article_by_id(article_ids[1])),
+    )
+
+    assert llm.calls == 6
+    assert llm.max_in_flight == 2
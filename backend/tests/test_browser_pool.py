@@ -0,0 +1,151 @@
+"""
+Playwright page pool tests
+"""
+import asyncio
+
+import pytest
+
+from app.services.browser_pool import PagePool, ResourceBlockPolicy, WaitStrategy, navigate
+
+
+class FakePage:
+    """模拟Playwright页面"""
+
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeContext:
+    """模拟Playwright浏览器上下文"""
+
+    def __init__(self):
+        self.closed = False
+        self.navigation_timeout = None
+        self.route_handler = None
+        self.page = FakePage()
+
+    def set_default_navigation_timeout(self, timeout):
+        self.navigation_timeout = timeout
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+    async def new_page(self):
+        return self.page
+
+    async def close(self):
+        self.closed = True
+        self.page.closed = True
+
+
+class FakeBrowser:
+    """模拟Playwright浏览器"""
+
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+@pytest.mark.asyncio
+async def test_pool_limits_concurrent_leases():
+    """测试同时借出的页面数不超过池大小"""
+    pool = PagePool(FakeBrowser(), size=2, max_navigations=100, navigation_timeout_ms=5000)
+    await pool.start()
+
+    active = {'now': 0, 'max': 0}
+
+    async def use_page():
+        async with pool.lease():
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+            await asyncio.sleep(0.01)
+            active['now'] -= 1
+
+    await asyncio.gather(*[use_page() for _ in range(6)])
+    assert active['max'] == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_after_max_navigations():
+    """测试页面达到导航次数上限后被回收"""
+    browser = FakeBrowser()
+    pool = PagePool(browser, size=1, max_navigations=2, navigation_timeout_ms=5000)
+    await pool.start()
+    first_context = browser.contexts[0]
+    assert first_context.navigation_timeout == 5000
+
+    async with pool.lease():
+        pass
+    assert not first_context.closed
+
+    async with pool.lease():
+        pass
+    assert first_context.closed
+    assert len(browser.contexts) == 2
+
+    await pool.close()
+    assert browser.contexts[1].closed
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_page_after_error():
+    """测试使用中出错的页面被回收"""
+    browser = FakeBrowser()
+    pool = PagePool(browser, size=1, max_navigations=100, navigation_timeout_ms=5000)
+    await pool.start()
+
+    with pytest.raises(RuntimeError):
+        async with pool.lease():
+            raise RuntimeError("navigation failed")
+
+    assert browser.contexts[0].closed
+    async with pool.lease() as page:
+        assert page is browser.contexts[1].page
+    await pool.close()
+
+
+def test_resource_block_policy():
+    """测试按资源类型和第三方域名拦截请求"""
+    policy = ResourceBlockPolicy(
+        resource_types=["image", "font"],
+        hosts=["google-analytics.com"]
+    )
+    assert policy.should_block("image", "https://news.com/a.png")
+    assert policy.should_block("script", "https://www.google-analytics.com/analytics.js")
+    assert not policy.should_block("document", "https://news.com/article")
+    assert not policy.should_block("script", "https://news.com/app.js")
+    assert not ResourceBlockPolicy(resource_types=[], hosts=[]).enabled
+
+
+@pytest.mark.asyncio
+async def test_pool_installs_block_policy():
+    """测试页面池为每个上下文安装请求拦截"""
+    browser = FakeBrowser()
+    policy = ResourceBlockPolicy(resource_types=["image"], hosts=[])
+    pool = PagePool(browser, size=1, max_navigations=10, navigation_timeout_ms=5000, block_policy=policy)
+    await pool.start()
+    assert browser.contexts[0].route_handler == policy.handle_route
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_navigate_waits_for_selector():
+    """测试domcontentloaded + 选择器等待策略"""
+    from unittest.mock import AsyncMock
+
+    page = AsyncMock()
+    await navigate(page, "https://news.com/a", WaitStrategy(selector="article", selector_timeout_ms=1000))
+    page.goto.assert_awaited_once_with("https://news.com/a", wait_until="domcontentloaded")
+    page.wait_for_selector.assert_awaited_once_with("article", timeout=1000)
+
+    # 选择器超时不影响后续提取
+    page.wait_for_selector.side_effect = TimeoutError()
+    await navigate(page, "https://news.com/b", WaitStrategy(selector="article"))
@@ -0,0 +1,52 @@
+"""
+Main-content extraction tests
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services.content_extractor import ContentExtractor, content_extractor
+
+PAGES_DIR = Path(__file__).parent / 'fixtures' / 'pages'
+EXPECTED = json.loads((PAGES_DIR / 'expected.json').read_text(encoding='utf-8'))
+
+
+@pytest.mark.parametrize("page", sorted(EXPECTED))
+def test_extracts_main_content_from_synthetic_pages(page):
+    """测试在合成的新闻页面上提取正文：包含全部正文段落，不含导航、侧栏、评论等"""
+    expected = EXPECTED[page]
+    result = content_extractor.extract((PAGES_DIR / page).read_bytes())
+
+    assert result is not None
+    assert result.confidence >= 0.5
+    missing = [snippet for snippet in expected['must_contain'] if snippet not in result.text]
+    leaked = [snippet for snippet in expected['must_not_contain'] if snippet in result.text]
+    assert missing == []
+    assert leaked == []
+
+
+def test_returns_clean_paragraphs():
+    """测试返回规范化的段落，空白被折叠"""
+    result = content_extractor.extract("""
+        <html><body><div class="story">
+          <p>First paragraph of the story,   with
+             some wrapped whitespace and enough text to count.</p>
+          <p>Second paragraph of the story, which is also long enough to be kept.</p>
+        </div></body></html>
+    """)
+
+    assert result.paragraphs == [
+        "First paragraph of the story, with some wrapped whitespace and enough text to count.",
+        "Second paragraph of the story, which is also long enough to be kept.",
+    ]
+    assert result.text == '\n\n'.join(result.paragraphs)
+
+
+def test_rejects_link_lists_and_short_pages():
+    """测试只有链接列表或正文过短的页面返回None"""
+    links = ''.join(f'<p><a href="/n/{i}">Headline number {i} about something important</a></p>' for i in range(20))
+    assert content_extractor.extract(f"<html><body><div>{links}</div></body></html>") is None
+    assert ContentExtractor(min_content_length=500).extract(
+        "<html><body><p>Only one short paragraph that is not an article.</p></body></html>"
+    ) is None
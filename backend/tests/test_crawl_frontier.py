@@ -0,0 +1,289 @@
+"""
+Crawl frontier tests
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.models.news import CrawlFrontierItem
+from app.services.crawl_frontier import (
+    KIND_ARTICLE,
+    KIND_SOURCE,
+    CrawlFrontier,
+    dump_article,
+    load_article,
+)
+from app.services.crawler import WebCrawler
+from app.services.near_duplicate import StoryClusterer
+from app.services.news_service import NewsRepository
+from app.services.url_filter import SeenUrlFilter
+
+
+@pytest.fixture
+def db():
+    """数据库会话fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def repo(db):
+    """Repository fixture"""
+    return NewsRepository(db)
+
+
+@pytest.fixture
+def source(repo):
+    """测试新闻源"""
+    return repo.create_source({
+        "name": "Wire",
+        "url": "https://wire.com/feed",
+        "type": "rss",
+        "category": "测试"
+    })
+
+
+def make_article(source, n):
+    return {
+        "original_title": f"Story {n}",
+        "original_content": f"Content of story {n}",
+        "source_url": f"https://wire.com/story{n}",
+        "source_id": source.id,
+        "source_name": source.name,
+        "publish_time": datetime(2024, 1, 1, 8, n),
+        "original_language": "en"
+    }
+
+
+def test_article_payload_roundtrip(source):
+    """测试文章数据序列化保留日期"""
+    article = make_article(source, 1)
+    assert load_article(dump_article(article)) == article
+
+
+def test_lease_is_exclusive_between_workers(db, source):
+    """测试两个抓取进程不会领取同一条目"""
+    first = CrawlFrontier(db, worker_id="worker-1")
+    second = CrawlFrontier(db, worker_id="worker-2")
+    first.enqueue_articles(source, [make_article(source, n) for n in range(4)])
+
+    leased = first.lease(KIND_ARTICLE, limit=3)
+    assert len(leased) == 3
+    remaining = second.lease(KIND_ARTICLE)
+    assert [item.url for item in remaining] == ["https://wire.com/story3"]
+    assert second.lease(KIND_ARTICLE) == []
+
+    # 其他进程不能完成不属于自己的租约
+    second.complete(leased)
+    assert {item.state for item in leased} == {'in_flight'}
+    first.complete(leased)
+    assert {item.state for item in leased} == {'done'}
+
+
+def test_concurrent_seeding_of_same_url(db, source, monkeypatch):
+    """测试两个进程同时加入同一新闻源时不因唯一约束报错，只保留一个条目"""
+    other_db = SessionLocal()
+    try:
+        first = CrawlFrontier(db, worker_id="first")
+        other = CrawlFrontier(other_db, worker_id="other")
+        seeded = []
+        add = db.add
+
+        def add_after_other_worker(item):
+            # 第一个进程查询已有条目之后、写入之前，另一个进程先写入了相同条目
+            if not seeded:
+                seeded.append(other.seed_sources([source]))
+            add(item)
+        monkeypatch.setattr(db, 'add', add_after_other_worker)
+
+        assert first.seed_sources([source]) == 0
+        assert seeded == [1]
+        assert db.query(CrawlFrontierItem).filter(CrawlFrontierItem.kind == KIND_SOURCE).count() == 1
+    finally:
+        other_db.close()
+
+
+def test_expired_lease_is_resumed_and_failures_are_bounded(db, source):
+    """测试租约过期的条目被重新领取，失败达到上限后标记为failed"""
+    crashed = CrawlFrontier(db, worker_id="crashed", max_attempts=2)
+    crashed.seed_sources([source])
+    item = crashed.lease(KIND_SOURCE)[0]
+    item.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    worker = CrawlFrontier(db, worker_id="worker", max_attempts=2)
+    resumed = worker.lease(KIND_SOURCE)
+    assert [i.id for i in resumed] == [item.id]
+    assert resumed[0].attempts == 2
+
+    worker.fail(resumed, "boom")
+    assert resumed[0].state == 'failed'
+    assert resumed[0].last_error == "boom"
+    assert worker.lease(KIND_SOURCE) == []
+
+    # 下次运行重新加入队列
+    assert worker.seed_sources([source]) == 1
+    assert len(worker.lease(KIND_SOURCE)) == 1
+
+
+@pytest.mark.asyncio
+async def test_crawler_resumes_interrupted_article_fetches(repo, source):
+    """测试上次中断时已入队的文章在下次运行时继续获取并入库"""
+    crashed = CrawlFrontier(repo.db, worker_id="crashed")
+    crashed.enqueue_articles(source, [make_article(source, n) for n in range(3)])
+    for item in crashed.lease(KIND_ARTICLE):
+        item.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    repo.db.commit()
+
+    # 新闻源本次未到期，只处理遗留的文章条目
+    repo.update_source(source.id, {'next_crawl_at': datetime.utcnow() + timedelta(hours=1)})
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer())
+    crawler.list_rss_source = AsyncMock(return_value=[])
+
+    results = await crawler.crawl_news_sources(due_only=True)
+
+    crawler.list_rss_source.assert_not_awaited()
+    assert results['new_articles'] == 3
+    assert repo.get_article_by_url("https://wire.com/story2").publish_time == datetime(2024, 1, 1, 8, 2)
+    assert crawler.frontier.stats()[KIND_ARTICLE] == {'done': 3}
+
+
+@pytest.mark.asyncio
+async def test_failed_save_is_retried(repo, source):
+    """测试入库失败的文章条目保留在队列中，下次运行重试"""
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer())
+    crawler.list_rss_source = AsyncMock(return_value=[make_article(source, 1)])
+    original_bulk_create = repo.bulk_create_articles
+    repo.bulk_create_articles = lambda articles: (_ for _ in ()).throw(RuntimeError("db down"))
+
+    results = await crawler.crawl_news_sources()
+    assert results['new_articles'] == 0
+    item = repo.db.query(CrawlFrontierItem).filter(CrawlFrontierItem.kind == KIND_ARTICLE).one()
+    assert (item.state, item.attempts, item.last_error) == ('pending', 1, "db down")
+
+    repo.bulk_create_articles = original_bulk_create
+    crawler.list_rss_source = AsyncMock(return_value=[])
+    results = await crawler.crawl_news_sources()
+    assert results['new_articles'] == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_persists_before_slow_sources_finish(repo, source, monkeypatch):
+    """测试流水线：先完成列表的新闻源的文章在其他新闻源仍在抓取时就已入库"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, 'pipeline_persist_interval_seconds', 0.01)
+    slow = repo.create_source({
+        "name": "Slow", "url": "https://slow.com/feed", "type": "rss", "category": "测试"
+    })
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer())
+
+    async def list_rss_source(listed):
+        if listed.id == slow.id:
+            # 快速新闻源的文章入库后才结束
+            for _ in range(200):
+                if repo.get_article_by_url("https://wire.com/story1"):
+                    return [dict(make_article(slow, 2), source_url="https://slow.com/story2")]
+                await asyncio.sleep(0.01)
+            raise AssertionError("articles were not persisted while another source was still listing")
+        return [make_article(listed, 1)]
+    crawler.list_rss_source = AsyncMock(side_effect=list_rss_source)
+
+    results = await asyncio.wait_for(crawler.crawl_news_sources(), timeout=10)
+    assert results['success_count'] == 2
+    assert results['new_articles'] == 2
+
+
+@pytest.mark.asyncio
+async def test_pipeline_fetches_content_only_when_missing(repo, source, monkeypatch):
+    """测试有摘要的文章直接入库，缺少正文的经过正文阶段，并受有界队列约束"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, 'pipeline_queue_size', 1)
+    monkeypatch.setattr(settings, 'pipeline_content_workers', 2)
+    articles = [make_article(source, n) for n in range(6)]
+    for article in articles[3:]:
+        article['original_content'] = ''
+
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer())
+    crawler.list_rss_source = AsyncMock(return_value=articles)
+    filled = []
+
+    async def fill_article(article, fallback_to_title=False):
+        filled.append(article['source_url'])
+        article['original_content'] = "fetched body"
+    crawler._fill_article = fill_article
+
+    results = await crawler.crawl_news_sources()
+
+    assert results['new_articles'] == 6
+    assert sorted(filled) == [f"https://wire.com/story{n}" for n in range(3, 6)]
+    assert repo.get_article_by_url("https://wire.com/story4").original_content == "fetched body"
+    assert crawler.frontier.stats()[KIND_ARTICLE] == {'done': 6}
+
+
+@pytest.mark.asyncio
+async def test_queued_articles_do_not_outlive_their_lease(repo, source, monkeypatch):
+    """测试文章在正文阶段取出时才领取租约，排队时间超过租约时长也不会被重复领取"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, 'pipeline_queue_size', 1)
+    monkeypatch.setattr(settings, 'pipeline_content_workers', 1)
+    monkeypatch.setattr(settings, 'frontier_batch_size', 1)
+    # 另一个（已停用）新闻源上次中断遗留的条目，让续抓循环在本次运行中持续领取
+    paused = repo.create_source({
+        "name": "Paused", "url": "https://paused.com/feed", "type": "rss", "category": "测试", "is_active": False
+    })
+    leftovers = [dict(make_article(paused, n), original_content='', source_url=f"https://paused.com/story{n}")
+                 for n in range(6)]
+    CrawlFrontier(repo.db, worker_id="crashed").enqueue_articles(paused, leftovers)
+    articles = [dict(make_article(source, n), original_content='') for n in range(6)]
+
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer(),
+                         frontier=CrawlFrontier(repo.db, lease_seconds=1))
+    crawler.list_rss_source = AsyncMock(return_value=articles)
+    filled = []
+
+    async def fill_article(article, fallback_to_title=False):
+        filled.append(article['source_url'])
+        await asyncio.sleep(0.3)
+        article['original_content'] = "fetched body"
+    crawler._fill_article = fill_article
+
+    results = await crawler.crawl_news_sources()
+
+    assert results['new_articles'] == 12
+    assert sorted(filled) == sorted(article['source_url'] for article in articles + leftovers)
+    items = repo.db.query(CrawlFrontierItem).filter(CrawlFrontierItem.kind == KIND_ARTICLE).all()
+    assert {(item.state, item.attempts) for item in items} == {('done', 1)}
+
+
+@pytest.mark.asyncio
+async def test_sources_are_leased_only_when_their_turn_comes(repo, source, monkeypatch):
+    """测试新闻源条目取得并发槽位后才领取租约，排队等待同站点时仍可被其他进程领取"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, 'crawl_per_host_concurrency', 1)
+    second = repo.create_source({
+        "name": "Wire Sport", "url": "https://wire.com/sport.xml", "type": "rss", "category": "测试"
+    })
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer())
+    other = CrawlFrontier(repo.db, worker_id="other")
+    taken = []
+
+    async def list_rss_source(crawled):
+        if not taken:
+            # 第一个新闻源抓取期间，另一个进程领取了仍在等待站点槽位的新闻源
+            taken.extend(other.lease(KIND_SOURCE))
+        return []
+    crawler.list_rss_source = list_rss_source
+
+    results = await crawler.crawl_news_sources()
+
+    assert [item.source_id for item in taken] == [second.id]
+    assert results['total_sources'] == 1
+    assert results['success_count'] == 1
@@ -0,0 +1,122 @@
+"""
+Crawl instrumentation tests
+"""
+import json
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.core.http_client import HttpClient
+from app.core.politeness import PolitenessScheduler
+from app.services.crawl_metrics import CrawlMetrics, StageTimer
+from app.services.crawler import WebCrawler
+from app.services.near_duplicate import StoryClusterer
+from app.services.news_service import NewsRepository
+from app.services.url_filter import SeenUrlFilter
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Wire</title>
+    <item><title>Story</title><link>https://wire.com/a1</link><description>Summary</description></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def repo():
+    """Repository fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield NewsRepository(db)
+    finally:
+        db.close()
+
+
+@pytest_asyncio.fixture
+async def feed_server_url():
+    """本地feed站点"""
+    async def handler(request):
+        return web.Response(body=FEED, content_type='application/rss+xml')
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+def test_stage_histogram():
+    """测试阶段耗时汇总与直方图分桶"""
+    timer = StageTimer()
+    for ms in [5, 8, 40, 300, 45000]:
+        timer.add(ms)
+    summary = timer.summary()
+    assert (summary['count'], summary['p50_ms'], summary['max_ms']) == (5, 40, 45000)
+    assert summary['histogram'] == {'<=10': 2, '<=50': 1, '<=500': 1, '>30000': 1}
+
+
+def test_cache_rates_and_per_source_totals():
+    """测试缓存命中率和按新闻源累计"""
+    metrics = CrawlMetrics()
+    metrics.count('not_modified', 3)
+    metrics.count('changed')
+    metrics.count('seen_skipped', 0)
+    metrics.record_fetch({'ttfb': 120.0, 'download': 30.0}, 2048, source_id=7)
+    metrics.record('parse', 10.0, source_id=7)
+
+    report = metrics.report({'total_sources': 4, 'new_articles': 2})
+    assert report['cache'] == {'conditional_get': {'hits': 3, 'misses': 1, 'hit_rate': 0.75}}
+    assert report['bytes_downloaded'] == 2048
+    assert report['sources'][7] == {
+        'bytes': 2048,
+        'stages': {'ttfb': {'count': 1, 'total_ms': 120.0},
+                   'download': {'count': 1, 'total_ms': 30.0},
+                   'parse': {'count': 1, 'total_ms': 10.0}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_http_client_reports_request_phases(feed_server_url):
+    """测试HTTP请求记录建连、首字节和下载耗时"""
+    client = HttpClient(scheduler=PolitenessScheduler(respect_robots=False))
+    try:
+        result = await client.fetch(f"{feed_server_url}/feed.xml")
+    finally:
+        await client.close()
+    assert {'connect', 'ttfb', 'download'} <= set(result.timings)
+    assert all(ms >= 0 for ms in result.timings.values())
+
+
+@pytest.mark.asyncio
+async def test_crawl_run_is_recorded(repo, feed_server_url):
+    """测试每次抓取写入crawl_runs记录"""
+    source = repo.create_source({
+        "name": "Local", "url": f"{feed_server_url}/feed.xml", "type": "rss", "category": "测试"
+    })
+    crawler = WebCrawler(
+        repo,
+        http=HttpClient(scheduler=PolitenessScheduler(respect_robots=False)),
+        seen_filter=SeenUrlFilter(),
+        clusterer=StoryClusterer(),
+    )
+    try:
+        results = await crawler.crawl_news_sources()
+    finally:
+        await crawler.http.close()
+
+    run = repo.get_crawl_run(results['run_id'])
+    assert (run.total_sources, run.success_count, run.new_articles) == (1, 1, 1)
+    assert run.bytes_downloaded == len(FEED)
+    stages = json.loads(run.stages)
+    assert {'listing', 'ttfb', 'download', 'parse', 'persist'} <= set(stages)
+    assert json.loads(run.cache)['conditional_get'] == {'hits': 0, 'misses': 1, 'hit_rate': 0.0}
+    assert set(json.loads(run.sources)[str(source.id)]['stages']) >= {'listing', 'parse', 'persist'}
+    assert repo.get_crawl_runs()[0].id == run.id
@@ -0,0 +1,123 @@
+"""
+Adaptive crawl scheduling tests
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.services.crawl_schedule import CrawlSchedulePolicy
+from app.services.crawler import WebCrawler
+from app.services.news_service import NewsRepository
+from app.services.url_filter import SeenUrlFilter
+from app.services.near_duplicate import StoryClusterer
+
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def db():
+    """数据库会话fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def repo(db):
+    """Repository fixture"""
+    return NewsRepository(db)
+
+
+@pytest.fixture
+def policy():
+    """无抖动的排期策略：15分钟~24小时，期望每次5篇"""
+    return CrawlSchedulePolicy(
+        min_interval=timedelta(minutes=15),
+        max_interval=timedelta(hours=24),
+        initial_interval=timedelta(hours=1),
+        target_new_articles=5,
+        smoothing=0.5,
+        jitter_ratio=0,
+    )
+
+
+def make_source(repo, n=1, **fields):
+    source = repo.create_source({
+        "name": f"Source {n}",
+        "url": f"https://source{n}.com/feed",
+        "type": "rss",
+        "category": "测试"
+    })
+    return repo.update_source(source.id, fields) if fields else source
+
+
+def test_first_crawl_uses_initial_interval(repo, policy):
+    """测试首次抓取没有速率数据，使用初始间隔"""
+    schedule = policy.next_schedule(make_source(repo), new_articles=20, now=NOW)
+    assert schedule['publish_rate'] is None
+    assert schedule['last_crawled_at'] == NOW
+    assert schedule['next_crawl_at'] == NOW + timedelta(hours=1)
+
+
+def test_busy_source_polled_often_quiet_source_rarely(repo, policy):
+    """测试发布频繁的新闻源间隔缩短到下限，无更新的新闻源间隔延长到上限"""
+    busy = make_source(repo, 1, last_crawled_at=NOW - timedelta(hours=1), publish_rate=10.0)
+    schedule = policy.next_schedule(busy, new_articles=30, now=NOW)
+    assert schedule['publish_rate'] == pytest.approx(20.0)  # 0.5*30 + 0.5*10
+    assert schedule['next_crawl_at'] == NOW + timedelta(minutes=15)
+
+    quiet = make_source(repo, 2, last_crawled_at=NOW - timedelta(hours=24), publish_rate=0.05)
+    schedule = policy.next_schedule(quiet, new_articles=0, now=NOW)
+    assert schedule['publish_rate'] == pytest.approx(0.025)
+    assert schedule['next_crawl_at'] == NOW + timedelta(hours=24)
+
+    steady = make_source(repo, 3, last_crawled_at=NOW - timedelta(hours=2), publish_rate=1.0)
+    schedule = policy.next_schedule(steady, new_articles=2, now=NOW)
+    assert schedule['next_crawl_at'] == NOW + timedelta(hours=5)
+
+
+def test_failed_crawl_keeps_rate(repo, policy):
+    """测试抓取失败时不更新速率和上次抓取时间"""
+    source = make_source(repo, last_crawled_at=NOW - timedelta(hours=3), publish_rate=2.5)
+    schedule = policy.next_schedule(source, new_articles=None, now=NOW)
+    assert schedule['publish_rate'] == 2.5
+    assert schedule['last_crawled_at'] == NOW - timedelta(hours=3)
+    assert schedule['next_crawl_at'] == NOW + timedelta(hours=2)
+
+
+def test_jitter_stays_within_bounds():
+    """测试抖动范围"""
+    policy = CrawlSchedulePolicy(
+        min_interval=timedelta(minutes=15), jitter_ratio=0.1, rng=random.Random(42)
+    )
+    for _ in range(100):
+        interval = policy.jitter(timedelta(hours=1))
+        assert timedelta(minutes=54) <= interval <= timedelta(minutes=66)
+    assert policy.jitter(timedelta(minutes=15)) >= timedelta(minutes=15)
+
+
+@pytest.mark.asyncio
+async def test_crawler_only_crawls_due_sources(repo, policy):
+    """测试调度只抓取到期的新闻源，并为其安排下次抓取"""
+    due = make_source(repo, 1)
+    make_source(repo, 2, next_crawl_at=datetime.utcnow() + timedelta(hours=1))
+
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer(), schedule=policy)
+    crawler.list_rss_source = AsyncMock(return_value=[])
+
+    results = await crawler.crawl_news_sources(due_only=True)
+
+    assert results['total_sources'] == 1
+    crawler.list_rss_source.assert_awaited_once()
+    assert crawler.list_rss_source.call_args.args[0].id == due.id
+    refreshed = repo.get_source_by_id(due.id)
+    assert refreshed.last_crawled_at is not None
+    assert refreshed.next_crawl_at > datetime.utcnow()
+    assert [source.id for source in repo.get_due_sources()] == []
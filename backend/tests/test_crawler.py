@@ -5,9 +5,12 @@ import pytest
 import asyncio
 from unittest.mock import Mock, patch
 
+from app.core.config import settings
 from app.core.database import SessionLocal, create_tables, drop_tables
 from app.services.news_service import NewsRepository
 from app.services.crawler import WebCrawler
+from app.services.near_duplicate import StoryClusterer
+from app.services.url_filter import SeenUrlFilter
 from app.models.news import NewsSource
 
 
@@ -46,7 +49,7 @@ async def test_crawler_initialization(repo):
     """测试爬虫初始化"""
     async with WebCrawler(repo) as crawler:
         assert crawler.browser is not None
-        assert crawler.page is not None
+        assert crawler.page_pool is not None
 
 
 @pytest.mark.asyncio
@@ -142,10 +145,11 @@ async def test_parse_cnn_mock(repo, test_source):
     soup = BeautifulSoup(html_content, 'html.parser')
     
     async with WebCrawler(repo) as crawler:
-        articles = crawler._parse_cnn(soup, test_source)
+        profile = crawler.site_registry.get("https://edition.cnn.com")
+        articles = crawler._parse_listing(soup, test_source, profile)
         
         assert len(articles) > 0
-        assert all('CNN' in article['title'] or 'Test' in article['title'] for article in articles)
+        assert all('CNN' in article['original_title'] or 'Test' in article['original_title'] for article in articles)
 
 
 @pytest.mark.asyncio
@@ -166,10 +170,11 @@ async def test_parse_bbc_mock(repo, test_source):
     soup = BeautifulSoup(html_content, 'html.parser')
     
     async with WebCrawler(repo) as crawler:
-        articles = crawler._parse_bbc(soup, test_source)
+        profile = crawler.site_registry.get("https://www.bbc.com/news")
+        articles = crawler._parse_listing(soup, test_source, profile)
         
         assert len(articles) > 0
-        assert all('BBC' in article['title'] or 'Test' in article['title'] for article in articles)
+        assert all('BBC' in article['original_title'] or 'Test' in article['original_title'] for article in articles)
 
 
 def test_parse_rss_date():
@@ -218,4 +223,184 @@ async def test_get_full_content_mock(repo):
             
             assert content is not None
             assert "Test Article" in content
-            assert "full content" in content 
\ No newline at end of file
+            assert "full content" in content 
+
+
+@pytest.mark.asyncio
+async def test_crawl_news_sources_concurrency_limits(repo):
+    """测试并发抓取的全局与站点并发限制"""
+    for i in range(6):
+        repo.create_source({
+            "name": f"Source {i}",
+            "url": f"https://site{i % 2}.example.com/feed{i}",
+            "type": "rss",
+            "category": "测试"
+        })
+    
+    active = {'total': 0, 'max_total': 0}
+    active_hosts = {}
+    max_hosts = {}
+    
+    async def fake_crawl(source):
+        host = source.url.split('/')[2]
+        active['total'] += 1
+        active_hosts[host] = active_hosts.get(host, 0) + 1
+        active['max_total'] = max(active['max_total'], active['total'])
+        max_hosts[host] = max(max_hosts.get(host, 0), active_hosts[host])
+        await asyncio.sleep(0.01)
+        active['total'] -= 1
+        active_hosts[host] -= 1
+        return [{
+            'original_title': f"Article from {source.name}",
+            'original_content': "content",
+            'source_url': f"{source.url}/article",
+            'source_id': source.id,
+            'source_name': source.name,
+            'category': source.category,
+            'original_language': 'en'
+        }]
+    
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer())
+    with patch.object(settings, 'crawl_concurrency', 3), \
+            patch.object(settings, 'crawl_per_host_concurrency', 1), \
+            patch.object(crawler, 'list_rss_source', side_effect=fake_crawl):
+        results = await crawler.crawl_news_sources()
+    
+    assert results['success_count'] == 6
+    assert results['new_articles'] == 6
+    assert active['max_total'] <= 3
+    assert all(count == 1 for count in max_hosts.values())
+
+
+@pytest.mark.asyncio
+async def test_crawl_rss_source_parses_downloaded_bytes(repo):
+    """测试RSS使用共享HTTP客户端下载后再解析"""
+    from unittest.mock import AsyncMock
+    from app.core.http_client import FetchResult
+    
+    rss_source = repo.create_source({
+        "name": "Bytes RSS",
+        "url": "https://bytes-rss.com/feed.xml",
+        "type": "rss",
+        "category": "测试"
+    })
+    feed_xml = b"""<?xml version="1.0"?>
+    <rss version="2.0"><channel><title>Feed</title>
+        <item>
+            <title>Downloaded Article</title>
+            <link>https://bytes-rss.com/a1</link>
+            <description>Article summary text</description>
+            <pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>
+        </item>
+    </channel></rss>"""
+    
+    crawler = WebCrawler(repo)
+    crawler.http.fetch = AsyncMock(return_value=FetchResult(
+        url=rss_source.url, status=200, body=feed_xml,
+        headers={'Content-Type': 'application/rss+xml'}
+    ))
+    articles = await crawler.crawl_rss_source(rss_source)
+    
+    crawler.http.fetch.assert_awaited_once()
+    assert len(articles) == 1
+    assert articles[0]['original_title'] == "Downloaded Article"
+    assert articles[0]['source_url'] == "https://bytes-rss.com/a1"
+
+
+@pytest.mark.asyncio
+async def test_crawl_rss_source_conditional_get(repo):
+    """测试条件请求：304或内容未变化时跳过解析"""
+    from unittest.mock import AsyncMock
+    from app.core.http_client import FetchResult
+    
+    rss_source = repo.create_source({
+        "name": "Conditional RSS",
+        "url": "https://conditional-rss.com/feed.xml",
+        "type": "rss",
+        "category": "测试"
+    })
+    feed_xml = b"""<?xml version="1.0"?>
+    <rss version="2.0"><channel><title>Feed</title>
+        <item><title>Conditional Article</title><link>https://conditional-rss.com/a1</link></item>
+    </channel></rss>"""
+    first = FetchResult(url=rss_source.url, status=200, body=feed_xml,
+                        headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+    
+    crawler = WebCrawler(repo)
+    crawler.http.fetch = AsyncMock(return_value=first)
+    assert len(await crawler.crawl_rss_source(rss_source)) == 1
+    assert rss_source.http_etag == '"v1"'
+    assert rss_source.content_hash is not None
+    
+    # 内容相同：不再解析
+    with patch('app.services.crawler.feedparse') as mock_feedparse:
+        assert await crawler.crawl_rss_source(rss_source) == []
+        mock_feedparse.assert_not_called()
+    sent_headers = crawler.http.fetch.call_args.kwargs['headers']
+    assert sent_headers['If-None-Match'] == '"v1"'
+    assert sent_headers['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+    
+    # 304：不再解析
+    crawler.http.fetch = AsyncMock(return_value=FetchResult(url=rss_source.url, status=304))
+    with patch('app.services.crawler.feedparse') as mock_feedparse:
+        assert await crawler.crawl_rss_source(rss_source) == []
+        mock_feedparse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_web_listing_renders_only_without_static_links(repo, test_source):
+    """测试已下载的列表页能解析出文章时不再用浏览器渲染，链接由脚本生成时才渲染"""
+    from unittest.mock import AsyncMock
+    from app.core.http_client import FetchResult
+    
+    static_html = b'<html><body><a href="/news/budget">City council approves the new budget</a></body></html>'
+    rendered_html = '<html><body><a href="/news/rendered">Rendered headline about the city budget</a></body></html>'
+    crawler = WebCrawler(repo)
+    crawler._playwright_available = True
+    crawler.page_pool = Mock()
+    crawler._render = AsyncMock(return_value=rendered_html)
+    
+    crawler.http.fetch = AsyncMock(return_value=FetchResult(url=test_source.url, status=200, body=static_html))
+    articles = await crawler.list_web_source(test_source)
+    assert [a['source_url'] for a in articles] == ["https://test-news.com/news/budget"]
+    crawler._render.assert_not_awaited()
+    
+    crawler.http.fetch = AsyncMock(return_value=FetchResult(
+        url=test_source.url, status=200, body=b'<html><body><div id="app"></div></body></html>'
+    ))
+    articles = await crawler.list_web_source(test_source)
+    assert [a['source_url'] for a in articles] == ["https://test-news.com/news/rendered"]
+    crawler._render.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_seen_urls_skip_full_content_fetch(repo, test_source):
+    """测试已入库的文章在获取完整内容前被跳过"""
+    from unittest.mock import AsyncMock
+    
+    repo.create_article({
+        "original_title": "Known Article",
+        "original_content": "Stored content",
+        "source_url": "https://test-news.com/known",
+        "source_id": test_source.id,
+        "source_name": test_source.name,
+        "original_language": "en"
+    })
+    seen_filter = SeenUrlFilter()
+    seen_filter.ensure_loaded(repo)
+    assert "https://test-news.com/known" in seen_filter
+    assert "https://test-news.com/new" not in seen_filter
+    
+    crawler = WebCrawler(repo, seen_filter=seen_filter)
+    crawler._playwright_available = True
+    crawler.page_pool = Mock()
+    crawler._get_full_content = AsyncMock(return_value="Fetched full content")
+    
+    articles = crawler._drop_seen([
+        {'original_title': "Known Article", 'source_url': "https://test-news.com/known"},
+        {'original_title': "New Article", 'source_url': "https://test-news.com/new"},
+    ])
+    await crawler._fill_full_content(articles)
+    
+    assert [article['source_url'] for article in articles] == ["https://test-news.com/new"]
+    crawler._get_full_content.assert_awaited_once_with("https://test-news.com/new", None)
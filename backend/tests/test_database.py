@@ -178,4 +178,68 @@ def test_get_statistics(repo):
     assert stats["processed_articles"] == 2
     assert stats["unprocessed_articles"] == 1
     assert stats["total_sources"] == 1
-    assert stats["processing_rate"] == 66.66666666666666 
\ No newline at end of file
+    assert stats["processing_rate"] == 66.66666666666666 
+
+def test_bulk_create_articles(repo):
+    """测试批量创建文章：跳过已存在和批内重复的URL"""
+    source = repo.create_source({
+        "name": "Bulk Source",
+        "url": "https://bulk.com",
+        "type": "rss",
+        "category": "测试"
+    })
+    
+    def make_article(n):
+        return {
+            "original_title": f"Bulk Article {n}",
+            "original_content": f"Content {n}",
+            "source_url": f"https://bulk.com/article{n}",
+            "source_id": source.id,
+            "source_name": source.name,
+            "original_language": "en"
+        }
+    
+    existing = repo.create_article(make_article(0))
+    
+    article_ids = repo.bulk_create_articles([
+        make_article(0), make_article(1), make_article(2), make_article(1)
+    ])
+    
+    assert len(article_ids) == 2
+    assert existing.id not in article_ids
+    assert repo.get_article_by_id(article_ids[0]).source_url == "https://bulk.com/article1"
+    assert repo.get_existing_article_urls([
+        "https://bulk.com/article1", "https://bulk.com/missing"
+    ]) == {"https://bulk.com/article1"}
+    assert repo.bulk_create_articles([make_article(2)]) == []
+
+
+def test_bulk_create_articles_dedupes_canonical_urls(repo):
+    """测试批量创建按规范化URL去重"""
+    source = repo.create_source({
+        "name": "Canonical Source",
+        "url": "https://canonical.com",
+        "type": "web",
+        "category": "测试"
+    })
+    
+    def make_article(url):
+        return {
+            "original_title": "Same Story",
+            "original_content": "Content",
+            "source_url": url,
+            "source_id": source.id,
+            "source_name": source.name,
+            "original_language": "en"
+        }
+    
+    article_ids = repo.bulk_create_articles([
+        make_article("https://www.canonical.com/story/?utm_source=rss"),
+        make_article("http://canonical.com/story#comments"),
+    ])
+    assert len(article_ids) == 1
+    article = repo.get_article_by_id(article_ids[0])
+    assert article.canonical_url == "https://canonical.com/story"
+    
+    # 已入库文章的AMP变体同样被跳过
+    assert repo.bulk_create_articles([make_article("https://amp.canonical.com/story/amp")]) == []
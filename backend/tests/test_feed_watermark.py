@@ -0,0 +1,122 @@
+"""
+RSS high-water mark tests
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.core.http_client import FetchResult
+from app.services.crawler import WebCrawler
+from app.services.feed_watermark import FeedWatermark, entry_published
+from app.services.news_service import NewsRepository
+from app.services.url_filter import SeenUrlFilter
+
+
+@pytest.fixture
+def db():
+    """数据库会话fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def repo(db):
+    """Repository fixture"""
+    return NewsRepository(db)
+
+
+def entry(n, hour=None, guid=True):
+    """feedparser风格的条目"""
+    data = {'link': f"https://wire.com/a{n}", 'title': f"Story {n}"}
+    if guid:
+        data['id'] = f"urn:wire:{n}"
+    if hour is not None:
+        data['published_parsed'] = datetime(2024, 1, 1, hour).timetuple()
+    return data
+
+
+def feed_xml(*items):
+    body = ''.join(
+        f"<item><title>Story {n}</title><link>https://wire.com/a{n}</link><guid>urn:wire:{n}</guid>"
+        f"<pubDate>Mon, 01 Jan 2024 {hour:02d}:00:00 GMT</pubDate></item>"
+        for n, hour in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Wire</title>{body}</channel></rss>'.encode()
+
+
+def test_entry_published_is_naive_utc():
+    """测试发布时间转为不带时区的UTC时间"""
+    assert entry_published(entry(1, hour=8)) == datetime(2024, 1, 1, 8)
+    assert entry_published(entry(1)) is None
+
+
+def test_watermark_filters_and_advances():
+    """测试只保留新条目，高水位推进到最新发布时间"""
+    watermark = FeedWatermark(grace=timedelta(hours=2))
+    first = [entry(3, 10), entry(2, 9), entry(1, 8)]
+    assert watermark.new_entries(first) == first
+    watermark.advance(first)
+    assert watermark.published == datetime(2024, 1, 1, 10)
+
+    # 同一时间发布的新条目不会丢失；GUID未知的条目在宽限期内仍是新条目，更早的视为旧条目
+    second = [entry(5, 10), entry(4, 11), entry(3, 10), entry(8, 9), entry(0, 7)]
+    assert watermark.new_entries(second) == [entry(5, 10), entry(4, 11), entry(8, 9)]
+
+    # 没有GUID和发布时间时按链接识别
+    watermark.advance([entry(6, guid=False)])
+    assert watermark.new_entries([entry(6, guid=False), entry(7, guid=False)]) == [entry(7, guid=False)]
+
+
+def test_recent_guids_are_bounded():
+    """测试GUID集合只保留最近的条目"""
+    watermark = FeedWatermark(max_guids=3)
+    watermark.advance([entry(1), entry(2)])
+    watermark.advance([entry(3), entry(4)])
+    assert watermark.guids == ["urn:wire:3", "urn:wire:4", "urn:wire:1"]
+
+
+def test_future_dated_entry_does_not_silence_feed():
+    """测试发布时间在未来的条目不会把高水位推到未来"""
+    now = datetime(2024, 1, 1, 12)
+    watermark = FeedWatermark(grace=timedelta(hours=2))
+    bogus = {'id': "urn:wire:future", 'published_parsed': datetime(2024, 1, 31, 12).timetuple()}
+    watermark.advance([bogus, entry(1, 10)], now=now)
+    assert watermark.published == now
+
+    assert watermark.new_entries([bogus, entry(2, 11), entry(1, 10)]) == [entry(2, 11)]
+    # 已写入数据库的未来高水位在加载时截断到当前时间
+    assert FeedWatermark(published=datetime(2999, 1, 1)).published <= datetime.utcnow()
+
+
+@pytest.mark.asyncio
+async def test_steady_state_feed_skips_known_entries(repo):
+    """测试再次抓取时只解析高水位之后的条目"""
+    source = repo.create_source({
+        "name": "Wire",
+        "url": "https://wire.com/feed.xml",
+        "type": "rss",
+        "category": "测试"
+    })
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter())
+    crawler.http.fetch = AsyncMock(return_value=FetchResult(
+        url=source.url, status=200, body=feed_xml((2, 9), (1, 8))
+    ))
+    assert [a['source_url'] for a in await crawler.list_rss_source(source)] == [
+        "https://wire.com/a2", "https://wire.com/a1"
+    ]
+    assert source.feed_last_published == datetime(2024, 1, 1, 9)
+
+    crawler.http.fetch = AsyncMock(return_value=FetchResult(
+        url=source.url, status=200, body=feed_xml((3, 10), (2, 9), (1, 8))
+    ))
+    with patch.object(crawler, '_parse_rss_date', wraps=crawler._parse_rss_date) as parse_date:
+        articles = await crawler.list_rss_source(source)
+    assert [a['source_url'] for a in articles] == ["https://wire.com/a3"]
+    assert parse_date.call_count == 1
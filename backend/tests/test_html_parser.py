@@ -0,0 +1,45 @@
+"""
+HTML parsing backend tests
+"""
+from app.services.html_parser import PrioritySelector, parse_html
+
+PAGE = """
+<html><body>
+  <div class="content">Sidebar content</div>
+  <main>
+    <article class="article-body">First article</article>
+    <div class="post-content">Post</div>
+    <article>Second article</article>
+  </main>
+</body></html>
+"""
+
+SELECTORS = ['.article-body', 'article', '.missing', '.content', 'main']
+
+
+def test_parse_html_uses_lxml_and_falls_back():
+    """测试默认使用lxml，解析器不可用时回退到html.parser"""
+    assert parse_html(PAGE).builder.NAME == 'lxml'
+    soup = parse_html(PAGE, parser='no-such-parser')
+    assert soup.builder.NAME == 'html.parser'
+    assert soup.find('article').get_text() == 'First article'
+
+
+def test_priority_selector_matches_sequential_select_one():
+    """测试联合选择器结果与逐个select_one一致"""
+    soup = parse_html(PAGE)
+    expected = []
+    for selector in SELECTORS:
+        element = soup.select_one(selector)
+        if element is not None and element not in expected:
+            expected.append(element)
+
+    assert list(PrioritySelector(SELECTORS).iter_first(soup)) == expected
+
+
+def test_priority_selector_orders_all_matches_by_priority():
+    """测试所有命中元素按选择器优先级、文档顺序排列且不重复"""
+    soup = parse_html(PAGE)
+    texts = [element.get_text(strip=True) for element in PrioritySelector(['article', '.content']).iter_all(soup)]
+    assert texts == ['First article', 'Second article', 'Sidebar content']
+    assert list(PrioritySelector([]).iter_all(soup)) == []
@@ -0,0 +1,204 @@
+"""
+LLM result cache tests
+"""
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.core.llm_cache import LLMCache, cache_key
+from app.services.ai_processor import AIProcessor, LLMResponse
+from app.services.news_service import NewsRepository
+
+REPLY = "市议会周二批准新预算，增加公共交通和道路维护支出，同时削减行政开支。"
+
+
+class CountingLLM:
+    """记录实际调用次数"""
+    model = "test-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return LLMResponse(content=REPLY)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """临时目录中的LLM缓存"""
+    cache = LLMCache(str(tmp_path / "llm_cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def repo():
+    """Repository fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield NewsRepository(db)
+    finally:
+        db.close()
+
+
+def test_cache_key_normalizes_input():
+    """测试缓存键忽略空白差异，区分模板版本、模型和消息角色"""
+    messages = [SystemMessage(content="翻译"), HumanMessage(content="Council  approves\nbudget")]
+    key = cache_key("1", "m", messages)
+    assert key == cache_key("1", "m", [SystemMessage(content="翻译 "), HumanMessage(content="Council approves budget")])
+    assert key != cache_key("2", "m", messages)
+    assert key != cache_key("1", "other", messages)
+    assert key != cache_key("1", "m", [HumanMessage(content="翻译"), HumanMessage(content="Council approves budget")])
+
+
+def test_get_put_and_stats(cache):
+    """测试读写与命中统计"""
+    assert cache.get("k1") is None
+    cache.put("k1", "m", REPLY)
+    assert cache.get("k1") == REPLY
+
+    stats = cache.stats()
+    assert stats['entries'] == 1
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    assert stats['total_bytes'] == len(REPLY.encode('utf-8'))
+
+
+def test_persists_across_instances(tmp_path):
+    """测试缓存写入磁盘，重新打开后仍可命中"""
+    path = str(tmp_path / "llm_cache.sqlite")
+    first = LLMCache(path)
+    first.put("k1", "m", REPLY)
+    first.close()
+
+    second = LLMCache(path)
+    try:
+        assert second.get("k1") == REPLY
+    finally:
+        second.close()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """测试超过大小上限时淘汰最久未访问的回复"""
+    cache = LLMCache(str(tmp_path / "llm_cache.sqlite"), max_bytes=250)
+    try:
+        cache.put("old", "m", "a" * 100)
+        cache.put("recent", "m", "b" * 100)
+        cache.get("old")  # 访问后old变为最近使用
+        cache.put("new", "m", "c" * 100)
+
+        assert cache.get("recent") is None
+        assert cache.get("old") == "a" * 100
+        assert cache.get("new") == "c" * 100
+        assert cache.stats()['total_bytes'] <= 250
+    finally:
+        cache.close()
+
+
+@pytest.mark.asyncio
+async def test_reprocessing_hits_cache(repo, cache):
+    """测试重新处理同一文章时不再调用LLM"""
+    source = repo.create_source({"name": "Wire", "url": "https://wire.com", "type": "rss", "category": "测试"})
+    article = repo.create_article({
+        "original_title": "Council approves budget",
+        "original_content": "The city council approved a new budget on Tuesday that increases transport spending.",
+        "source_url": "https://wire.com/budget",
+        "source_id": source.id,
+        "source_name": source.name,
+        "original_language": "en"
+    })
+    llm = CountingLLM()
+
+    first = AIProcessor(repo, llm=llm, combined=False, cache=cache)
+    assert await first.reprocess_article(article.id)
+    assert llm.calls == 3
+
+    second = AIProcessor(repo, llm=llm, combined=False, cache=cache)
+    assert await second.reprocess_article(article.id)
+    assert llm.calls == 3
+    assert second.cache_hits == 3
+    assert second.api_calls == 0
+    assert repo.get_article_by_id(article.id).translated_title == REPLY
+
+
+def test_hits_batch_access_updates(cache):
+    """测试命中只在内存中记录访问时间，写入时批量落盘；总大小在内存中维护"""
+    cache.put("k1", "m", REPLY)
+    cache.put("k1", "m", REPLY + "（更新）")
+    assert cache.stats()['total_bytes'] == len((REPLY + "（更新）").encode('utf-8'))
+
+    before = cache.conn.execute("SELECT last_access FROM llm_responses WHERE key = 'k1'").fetchone()[0]
+    assert cache.get("k1") is not None
+    assert not cache.conn.in_transaction
+    assert "k1" in cache._touches
+
+    cache.put("k2", "m", REPLY)
+    after = cache.conn.execute("SELECT last_access FROM llm_responses WHERE key = 'k1'").fetchone()[0]
+    assert after > before
+    assert cache._touches == {}
+
+
+@pytest.mark.asyncio
+async def test_rejected_reply_not_cached(cache):
+    """测试未通过校验的回复不写入缓存，再次调用时重新请求LLM"""
+    class ShortThenFullLLM(CountingLLM):
+        async def ainvoke(self, messages):
+            self.calls += 1
+            return LLMResponse(content="太短" if self.calls == 1 else REPLY)
+
+    llm = ShortThenFullLLM()
+    processor = AIProcessor(None, llm=llm, combined=False, cache=cache)
+    content = "The city council approved a new budget on Tuesday that increases transport spending."
+
+    assert await processor._translate_to_chinese(content) is None
+    assert cache.stats()['entries'] == 0
+    assert await processor._translate_to_chinese(content) == REPLY
+    assert await processor._translate_to_chinese(content) == REPLY
+    assert llm.calls == 2
+    assert processor.cache_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_cached_reply_is_replaced(cache):
+    """测试缓存中已有的不合格回复视为未命中，重新调用后被合格回复覆盖"""
+    llm = CountingLLM()
+    processor = AIProcessor(None, llm=llm, combined=False, cache=cache)
+
+    assert await processor._translate_title_to_chinese("Council approves budget") == REPLY
+    key = cache.conn.execute("SELECT key FROM llm_responses").fetchone()[0]
+    cache.put(key, llm.model, "短")
+
+    assert await processor._translate_title_to_chinese("Council approves budget") == REPLY
+    assert llm.calls == 2
+    assert cache.get(key) == REPLY
+
+
+@pytest.mark.asyncio
+async def test_model_switch_misses_cache(cache):
+    """测试后端切换模型后不返回旧模型缓存的回复；无法确定模型时不使用缓存"""
+    class SwitchableLLM(CountingLLM):
+        loaded = "model-a"
+
+        async def model_id(self):
+            return self.loaded
+
+    llm = SwitchableLLM()
+    processor = AIProcessor(None, llm=llm, combined=False, cache=cache)
+    title = "Council approves budget"
+
+    assert await processor._translate_title_to_chinese(title) == REPLY
+    assert await processor._translate_title_to_chinese(title) == REPLY
+    assert llm.calls == 1
+
+    llm.loaded = "model-b"
+    assert await processor._translate_title_to_chinese(title) == REPLY
+    assert llm.calls == 2
+
+    llm.loaded = None
+    assert await processor._translate_title_to_chinese(title) == REPLY
+    assert llm.calls == 3
+    assert cache.stats()['entries'] == 2
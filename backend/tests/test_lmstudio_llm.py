@@ -0,0 +1,152 @@
+"""
+LM Studio client tests
+"""
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.core.config import settings
+from app.services.ai_processor import LMStudioLLM
+
+REPLY_DELAY = 0.3
+
+
+@pytest_asyncio.fixture
+async def llm_server():
+    """本地OpenAI兼容接口，每次回复前等待REPLY_DELAY秒"""
+    state = {'requests': [], 'peers': set(), 'cancelled': 0, 'models': ["qwen2.5-7b-instruct"], 'model_reads': 0}
+
+    async def handler(request):
+        payload = await request.json()
+        state['requests'].append(payload)
+        state['peers'].add(request.transport.get_extra_info('peername'))
+        if payload['messages'][-1]['content'] == 'fail':
+            return web.Response(status=500)
+        try:
+            await asyncio.sleep(REPLY_DELAY)
+        except asyncio.CancelledError:
+            state['cancelled'] += 1
+            raise
+        return web.json_response({
+            'choices': [{'message': {'content': f"echo: {payload['messages'][-1]['content']}"}}]
+        })
+
+    async def models_handler(request):
+        state['model_reads'] += 1
+        return web.json_response({'object': 'list', 'data': [{'id': model} for model in state['models']]})
+
+    app = web.Application()
+    app.router.add_post('/v1/chat/completions', handler)
+    app.router.add_get('/v1/models', models_handler)
+    runner = web.AppRunner(app, handler_cancellation=True)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state['url'] = f"http://127.0.0.1:{port}/v1/chat/completions"
+    try:
+        yield state
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_ainvoke(llm_server):
+    """测试OpenAI格式请求与回复解析"""
+    llm = LMStudioLLM(api_url=llm_server['url'])
+    try:
+        response = await llm.ainvoke([SystemMessage(content="翻译"), HumanMessage(content="hello")])
+    finally:
+        await llm.close()
+
+    assert response.content == "echo: hello"
+    assert llm_server['requests'][0]['messages'] == [
+        {'role': 'system', 'content': "翻译"},
+        {'role': 'user', 'content': "hello"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_does_not_block_event_loop(llm_server):
+    """测试调用期间事件循环继续运行，并发调用复用连接池"""
+    llm = LMStudioLLM(api_url=llm_server['url'], pool_size=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    try:
+        responses = await asyncio.gather(*[
+            llm.ainvoke([HumanMessage(content=str(i))]) for i in range(4)
+        ])
+        elapsed = time.perf_counter() - started
+        await llm.ainvoke([HumanMessage(content="again")])
+    finally:
+        ticker_task.cancel()
+        await llm.close()
+
+    assert [r.content for r in responses] == [f"echo: {i}" for i in range(4)]
+    # 4个请求、2个连接：约两轮延迟，而不是串行的四轮
+    assert elapsed < REPLY_DELAY * 3.5
+    assert ticks >= 10
+    # keep-alive：后续请求复用已有连接
+    assert len(llm_server['peers']) <= 2
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_cancellation(llm_server):
+    """测试取消任务时请求随之中断，异常不被包装"""
+    llm = LMStudioLLM(api_url=llm_server['url'])
+    try:
+        task = asyncio.create_task(llm.ainvoke([HumanMessage(content="slow")]))
+        await asyncio.sleep(REPLY_DELAY / 3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.05)
+    finally:
+        await llm.close()
+
+    assert llm_server['cancelled'] == 1
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_errors(llm_server):
+    """测试HTTP错误和超时包装为RuntimeError"""
+    llm = LMStudioLLM(api_url=llm_server['url'], timeout=REPLY_DELAY / 3)
+    try:
+        with pytest.raises(RuntimeError, match="调用失败"):
+            await llm.ainvoke([HumanMessage(content="fail")])
+        with pytest.raises(RuntimeError, match="超时"):
+            await llm.ainvoke([HumanMessage(content="slow")])
+    finally:
+        await llm.close()
+
+
+@pytest.mark.asyncio
+async def test_model_id_follows_loaded_model(llm_server, monkeypatch):
+    """测试未配置模型时从/v1/models读取当前模型，缓存期内不重复读取，过期后反映模型切换"""
+    llm = LMStudioLLM(api_url=llm_server['url'])
+    try:
+        assert await llm.model_id() == "qwen2.5-7b-instruct"
+        llm_server['models'] = ["llama-3.1-8b-instruct"]
+        assert await llm.model_id() == "qwen2.5-7b-instruct"
+        assert llm_server['model_reads'] == 1
+
+        monkeypatch.setattr(settings, 'lmstudio_model_ttl_seconds', 0)
+        assert await llm.model_id() == "llama-3.1-8b-instruct"
+    finally:
+        await llm.close()
+
+    configured = LMStudioLLM(api_url=llm_server['url'], model="mistral-7b")
+    assert await configured.model_id() == "mistral-7b"
+    assert llm_server['model_reads'] == 2
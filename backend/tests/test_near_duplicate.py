@@ -0,0 +1,138 @@
+"""
+Near-duplicate story detection tests
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.services.news_service import NewsRepository
+from app.services.near_duplicate import (
+    SimHashIndex,
+    StoryClusterer,
+    article_fingerprint,
+    hamming_distance,
+    simhash,
+)
+
+STORY = (
+    "The central bank raised interest rates by a quarter point on Wednesday, "
+    "citing persistent inflation and a strong labour market. Officials signalled "
+    "that further increases were possible if price growth does not slow in the "
+    "coming months, and markets reacted with a modest sell-off in government bonds."
+)
+REWRITE = STORY.replace("on Wednesday", "on Wednesday afternoon")
+OTHER_STORY = (
+    "A new species of frog has been discovered in the rainforest of northern Peru. "
+    "Researchers said the tiny amphibian lives in leaf litter and has a distinctive "
+    "call that helped them tell it apart from closely related species in the region."
+)
+
+
+@pytest.fixture
+def db():
+    """数据库会话fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def repo(db):
+    """Repository fixture"""
+    return NewsRepository(db)
+
+
+@pytest.fixture
+def source(repo):
+    """测试新闻源"""
+    return repo.create_source({
+        "name": "Wire",
+        "url": "https://wire.com",
+        "type": "rss",
+        "category": "测试"
+    })
+
+
+def make_article(source, n, title, content):
+    return {
+        "original_title": title,
+        "original_content": content,
+        "source_url": f"https://wire.com/story{n}",
+        "source_id": source.id,
+        "source_name": source.name,
+        "original_language": "en"
+    }
+
+
+def test_simhash_near_and_far_texts():
+    """测试近似文本指纹距离小，不同文本距离大"""
+    assert hamming_distance(simhash(STORY), simhash(STORY)) == 0
+    assert hamming_distance(simhash(STORY), simhash(REWRITE)) <= 10
+    assert hamming_distance(simhash(STORY), simhash(OTHER_STORY)) > 10
+    assert simhash("") == 0
+
+
+def test_simhash_index_finds_within_distance():
+    """测试分段索引按汉明距离阈值查找"""
+    index = SimHashIndex(max_distance=3)
+    fingerprint = simhash(STORY)
+    index.add(fingerprint, cluster_id=7)
+
+    assert index.find(fingerprint) == 7
+    assert index.find(fingerprint ^ 0b101) == 7  # 距离2
+    assert index.find(fingerprint ^ 0b1111) is None  # 距离4
+    assert len(index) == 1
+
+
+def test_clusterer_assigns_duplicates_to_representative(repo, source):
+    """测试入库时近似重复文章归入代表文章的故事簇"""
+    clusterer = StoryClusterer(SimHashIndex(max_distance=3))
+    article_ids = repo.bulk_create_articles([
+        make_article(source, 1, "Central bank raises rates", STORY),
+        make_article(source, 2, "Central bank raises rates", STORY + " "),
+        make_article(source, 3, "New frog species found", OTHER_STORY),
+    ])
+
+    assignments = clusterer.assign(repo, article_ids)
+
+    first, duplicate, other = article_ids
+    assert assignments[first] == first
+    assert assignments[duplicate] == first
+    assert assignments[other] == other
+    assert repo.get_article_by_id(duplicate).simhash == \
+        f"{article_fingerprint('Central bank raises rates', STORY):016x}"
+
+
+@pytest.mark.asyncio
+async def test_ai_processor_reuses_representative_results(repo, source, monkeypatch):
+    """测试AI处理只处理代表文章，近似重复文章复用其结果"""
+    from app.core.config import settings
+    from app.services.ai_processor import AIProcessor
+
+    monkeypatch.setattr(settings, 'llm_cache_enabled', False)
+
+    clusterer = StoryClusterer(SimHashIndex(max_distance=3))
+    article_ids = repo.bulk_create_articles([
+        make_article(source, 1, "Central bank raises rates", STORY),
+        make_article(source, 2, "Central bank raises rates", STORY + " "),
+    ])
+    clusterer.assign(repo, article_ids)
+
+    response = Mock()
+    response.content = "央行宣布加息四分之一个百分点，理由是通胀持续且劳动力市场强劲，未来可能继续加息。"
+    llm = Mock()
+    llm.ainvoke = AsyncMock(return_value=response)
+    processor = AIProcessor(repo, llm=llm, combined=False)
+
+    results = await processor.process_articles(limit=10)
+
+    assert results['success_count'] == 2
+    assert results['reused_count'] == 1
+    assert llm.ainvoke.await_count == 3  # 只有代表文章调用了LLM
+    duplicate = repo.get_article_by_id(article_ids[1])
+    assert duplicate.is_processed
+    assert duplicate.summary_zh == response.content
@@ -0,0 +1,137 @@
+"""
+Per-host politeness tests
+"""
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from app.core.http_client import HttpClient
+from app.core.politeness import PolitenessScheduler, RobotsDisallowedError, TokenBucket, parse_retry_after
+
+ROBOTS = """
+User-agent: *
+Disallow: /private/
+Crawl-delay: 5
+"""
+SLOW_REPLY = 2.0
+
+
+def test_token_bucket_allows_burst_then_queues():
+    """测试令牌桶允许突发，之后按速率依次排队"""
+    bucket = TokenBucket(rate=2, capacity=2)
+    now = bucket.updated
+    assert bucket.reserve(now) == 0
+    assert bucket.reserve(now) == 0
+    assert bucket.reserve(now) == pytest.approx(0.5)
+    assert bucket.reserve(now) == pytest.approx(1.0)
+    # 一秒后补充两个令牌，正好还清预支
+    assert bucket.reserve(now + 1) == pytest.approx(0.5)
+
+
+def test_robots_rules_and_crawl_delay():
+    """测试robots.txt的Disallow和Crawl-delay"""
+    scheduler = PolitenessScheduler(rate=10, burst=5)
+    assert scheduler.robots_url_if_stale("https://news.com/a") == "https://news.com/robots.txt"
+
+    scheduler.update_robots("https://news.com/a", 200, ROBOTS)
+    assert scheduler.robots_url_if_stale("https://news.com/b") is None
+    with pytest.raises(RobotsDisallowedError):
+        scheduler.reserve("https://news.com/private/x")
+
+    # Crawl-delay: 5 → 每5秒一个请求，无突发
+    assert scheduler.reserve("https://news.com/a") == 0
+    assert scheduler.reserve("https://news.com/b") == pytest.approx(5, abs=0.1)
+    # 其他站点不受影响
+    assert scheduler.reserve("https://other.com/a") == 0
+
+
+def test_missing_robots_allows_everything():
+    """测试robots.txt不存在或获取失败时允许抓取"""
+    scheduler = PolitenessScheduler()
+    scheduler.update_robots("https://news.com/", 404)
+    scheduler.update_robots("https://down.com/", 0)
+    assert scheduler.reserve("https://news.com/private/x") == 0
+    assert scheduler.reserve("https://down.com/private/x") == 0
+
+
+def test_backoff_on_429_and_503():
+    """测试429/503按Retry-After暂停站点，否则指数退避"""
+    scheduler = PolitenessScheduler(rate=100, burst=10, max_backoff=60)
+    assert scheduler.report("https://news.com/a", 429, {'Retry-After': '30'}) == 30
+    assert scheduler.reserve("https://news.com/b") == pytest.approx(30, abs=0.5)
+    assert scheduler.reserve("https://other.com/a") == 0
+
+    assert scheduler.report("https://slow.com/a", 503, {}) == 2
+    assert scheduler.report("https://slow.com/a", 503, {}) == 4
+    assert scheduler.report("https://slow.com/a", 429, {'retry-after': '3600'}) == 60
+    assert scheduler.report("https://slow.com/a", 200, {}) is None
+
+
+def test_parse_retry_after_http_date():
+    """测试解析HTTP日期格式的Retry-After"""
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412500) == pytest.approx(10)
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.asyncio
+async def test_http_client_honours_robots_and_retries_after_429(aiohttp_server_url):
+    """测试HttpClient遵守robots.txt，并在429后退避重试"""
+    base_url, hits = aiohttp_server_url
+    client = HttpClient(scheduler=PolitenessScheduler(rate=100, burst=10))
+    try:
+        result = await client.fetch(f"{base_url}/news")
+        assert result.status == 200
+        assert result.body == b"ok"
+        assert hits['/news'] == 2
+        assert hits['/robots.txt'] == 1
+
+        with pytest.raises(RobotsDisallowedError):
+            await client.fetch(f"{base_url}/private/page")
+        assert '/private/page' not in hits
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_http_client_applies_session_timeout_without_override(aiohttp_server_url):
+    """测试未指定单次超时时仍按客户端超时中断挂起的请求"""
+    base_url, _ = aiohttp_server_url
+    client = HttpClient(timeout=0.2, scheduler=PolitenessScheduler(respect_robots=False))
+    started = time.perf_counter()
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await client.fetch(f"{base_url}/slow")
+    finally:
+        await client.close()
+    assert time.perf_counter() - started < SLOW_REPLY / 2
+
+
+@pytest_asyncio.fixture
+async def aiohttp_server_url():
+    """本地测试站点：/news 第一次返回429"""
+    hits = {}
+
+    async def handler(request):
+        hits[request.path] = hits.get(request.path, 0) + 1
+        if request.path == '/robots.txt':
+            return web.Response(text="User-agent: *\nDisallow: /private/\n")
+        if request.path == '/news' and hits['/news'] == 1:
+            return web.Response(status=429, headers={'Retry-After': '0'})
+        if request.path == '/slow':
+            await asyncio.sleep(SLOW_REPLY)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}", hits
+    finally:
+        await runner.cleanup()
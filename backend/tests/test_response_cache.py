@@ -0,0 +1,136 @@
+"""
+On-disk response cache tests
+"""
+import os
+from datetime import datetime
+
+import pytest
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.core.http_client import HttpClient
+from app.core.response_cache import CacheMissError, ResponseCache
+from app.services.crawler import WebCrawler
+from app.services.news_service import NewsRepository
+from app.services.url_filter import SeenUrlFilter
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Wire</title>
+    <item><title>Cached Story</title><link>https://wire.com/a1</link><guid>urn:wire:1</guid></item>
+</channel></rss>"""
+
+ARTICLE = ("<html><body><nav><a href='/'>Home</a></nav><article>"
+           + "<p>The cached article body is long enough to be extracted, with several clauses, commas, "
+             "and sentences that look like real prose written by a reporter.</p>" * 6
+           + "</article></body></html>").encode()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """临时目录中的响应缓存"""
+    cache = ResponseCache(str(tmp_path / "responses"))
+    yield cache
+    cache.close()
+
+
+def test_store_and_lookup_by_canonical_url(cache):
+    """测试按规范化URL读取最近一次响应"""
+    cache.store("https://www.wire.com/a1?utm_source=rss", b"first", headers={'ETag': '"v1"'},
+                fetched_at=datetime(2024, 1, 1, 8))
+    cache.store("https://wire.com/a1", b"second", fetched_at=datetime(2024, 1, 1, 9))
+
+    latest = cache.lookup("https://wire.com/a1/")
+    assert latest.body == b"second"
+    assert latest.fetched_at == datetime(2024, 1, 1, 9)
+
+    earlier = cache.lookup("https://wire.com/a1", before=datetime(2024, 1, 1, 8, 30))
+    assert (earlier.body, earlier.headers) == (b"first", {'ETag': '"v1"'})
+    assert cache.lookup("https://wire.com/missing") is None
+
+
+def test_identical_bodies_stored_once(cache):
+    """测试相同内容只存一份压缩文件"""
+    body = b"<html>" + b"same page " * 1000 + b"</html>"
+    first = cache.store("https://wire.com/a", body)
+    second = cache.store("https://wire.com/b", body)
+    assert first == second
+    assert len(cache.history("https://wire.com/a")) == 1
+    assert cache.total_bytes() < len(body) / 10
+    objects = [name for _, _, files in os.walk(cache.root / 'objects') for name in files]
+    assert objects == [f"{first}.gz"]
+
+
+def test_eviction_keeps_recently_used(tmp_path):
+    """测试超过大小上限时淘汰最久未访问的响应"""
+    cache = ResponseCache(str(tmp_path / "small"), max_bytes=2500)
+    for n in range(3):
+        cache.store(f"https://wire.com/{n}", os.urandom(1000))
+        if n == 1:
+            cache.lookup("https://wire.com/0")
+    assert cache.contains("https://wire.com/0")
+    assert not cache.contains("https://wire.com/1")
+    assert cache.contains("https://wire.com/2")
+    assert cache.total_bytes() <= 2500
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_async_access_batches_reads_and_tracks_size(cache):
+    """测试异步读写；读取不提交事务，访问时间在写入时批量落盘；总大小在内存中维护"""
+    digest = await cache.astore("https://wire.com/a1", FEED)
+    await cache.astore("https://wire.com/a1", FEED)
+    assert cache.total_bytes() == cache._blob_path(digest).stat().st_size
+
+    before = cache.conn.execute("SELECT last_access FROM blobs WHERE digest = ?", (digest,)).fetchone()[0]
+    assert (await cache.alookup("https://wire.com/a1")).body == FEED
+    assert not cache.conn.in_transaction
+    assert digest in cache._touches
+
+    await cache.astore("https://wire.com/a2", ARTICLE)
+    after = cache.conn.execute("SELECT last_access FROM blobs WHERE digest = ?", (digest,)).fetchone()[0]
+    assert after > before
+    assert cache._touches == {}
+
+    reopened = ResponseCache(str(cache.root))
+    try:
+        assert reopened.total_bytes() == cache.total_bytes()
+    finally:
+        reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_never_touches_network(cache):
+    """测试回放模式只读缓存，缓存中没有时报错"""
+    cache.store("https://wire.com/feed.xml", FEED)
+    http = HttpClient(cache=cache, replay=True)
+    http.wait_turn = None  # 回放时不应经过站点礼貌调度
+
+    assert (await http.fetch("https://wire.com/feed.xml")).body == FEED
+    with pytest.raises(CacheMissError):
+        await http.fetch("https://wire.com/other.xml")
+
+
+@pytest.mark.asyncio
+async def test_crawler_replays_feed_and_articles(cache):
+    """测试抓取器回放缓存的feed和文章页面，重新提取正文"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        repo = NewsRepository(db)
+        source = repo.create_source({
+            "name": "Wire", "url": "https://wire.com/feed.xml", "type": "rss", "category": "测试"
+        })
+        cache.store("https://wire.com/feed.xml", FEED)
+        cache.store("https://wire.com/a1", ARTICLE)
+        crawler = WebCrawler(repo, http=HttpClient(cache=cache, replay=True), seen_filter=SeenUrlFilter())
+
+        articles = await crawler.crawl_rss_source(source)
+        assert len(articles) == 1
+        assert articles[0]['original_content'].startswith("The cached article body")
+        assert "Home" not in articles[0]['original_content']
+
+        # 响应体哈希未变化时仍然重新处理
+        source.feed_recent_guids = None
+        assert len(await crawler.crawl_rss_source(source)) == 1
+    finally:
+        db.close()
@@ -0,0 +1,54 @@
+"""
+Site registry tests
+"""
+from bs4 import BeautifulSoup
+
+from app.services.site_registry import SiteRegistry, site_registry
+
+
+def test_lookup_by_registered_domain():
+    """测试按主机名逐级匹配父域名"""
+    assert site_registry.get("https://edition.cnn.com/world").domain == "cnn.com"
+    assert site_registry.get("https://www.bbc.com/news").domain == "bbc.com"
+    assert site_registry.get("https://unknown-site.org/").domain == "*"
+
+
+def test_link_pattern_replaces_hardcoded_years():
+    """测试CNN链接按日期路径规则匹配，不依赖写死的年份"""
+    soup = BeautifulSoup("""
+        <a href="/2031/04/02/world/story/index.html">Future CNN Story Headline</a>
+        <a href="/videos">Videos</a>
+    """, "html.parser")
+    links = site_registry.get("https://cnn.com").select_links(soup)
+    assert [link["href"] for link in links] == ["/2031/04/02/world/story/index.html"]
+
+
+def test_site_inherits_default_and_can_be_added_from_config():
+    """测试站点配置继承默认配置，新站点只需数据配置"""
+    registry = SiteRegistry.from_config({
+        "default": {
+            "link_selector": 'a[href*="news"]',
+            "content_selectors": ["article"],
+            "article_wait": {"selector": "article"}
+        },
+        "sites": {
+            "example.com": {
+                "link_selector": "h3 > a",
+                "title_min_length": 5,
+                "content_selectors": [".story-body"]
+            }
+        }
+    })
+    profile = registry.get("https://news.example.com/")
+    assert profile.domain == "example.com"
+    assert profile.content_selectors == [".story-body", "article"]
+    assert profile.article_wait.selector == "article"
+    assert profile.is_valid_title("Short")
+
+    soup = BeautifulSoup("""
+        <div><p>Intro</p></div>
+        <div class="story-body">Body text</div>
+        <article>Fallback</article>
+    """, "html.parser")
+    first = next(profile.iter_content_candidates(soup))
+    assert first.get_text() == "Body text"
@@ -0,0 +1,173 @@
+"""
+Source health and circuit breaker tests
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.services.crawl_schedule import CrawlSchedulePolicy
+from app.services.crawler import WebCrawler
+from app.services.near_duplicate import StoryClusterer
+from app.services.news_service import NewsRepository
+from app.services.source_health import SourceHealthPolicy, percentile
+from app.services.url_filter import SeenUrlFilter
+
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def db():
+    """数据库会话fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def repo(db):
+    """Repository fixture"""
+    return NewsRepository(db)
+
+
+@pytest.fixture
+def policy():
+    """失败3次熔断，冷却10分钟，最长1小时"""
+    return SourceHealthPolicy(
+        failure_threshold=3,
+        cooldown=timedelta(minutes=10),
+        max_cooldown=timedelta(hours=1),
+        latency_window=5,
+        slow_latency_ms=5000,
+        timeout_multiplier=2,
+        min_timeout=5,
+    )
+
+
+def make_source(repo, n=1, **fields):
+    source = repo.create_source({
+        "name": f"Source {n}",
+        "url": f"https://source{n}.com/feed",
+        "type": "rss",
+        "category": "测试"
+    })
+    return repo.update_source(source.id, fields) if fields else source
+
+
+def test_percentile():
+    """测试百分位数"""
+    samples = [100, 200, 300, 400, 5000]
+    assert percentile(samples, 50) == 300
+    assert percentile(samples, 95) == 5000
+    assert percentile([], 50) is None
+
+
+def test_latency_window(repo, policy):
+    """测试只保留最近N次耗时"""
+    source = make_source(repo)
+    for latency in [9000, 9000, 100, 200, 300, 400, 500]:
+        source = repo.update_source(source.id, policy.on_success(source, latency, NOW))
+    assert (source.latency_p50_ms, source.latency_p95_ms) == (300, 500)
+    assert source.last_success_at == NOW
+
+
+def test_circuit_opens_and_cooldown_doubles(repo, policy):
+    """测试连续失败达到阈值后熔断，探测失败后冷却时间翻倍"""
+    source = make_source(repo)
+    for _ in range(2):
+        source = repo.update_source(source.id, policy.on_failure(source, "timeout", now=NOW))
+    assert policy.circuit_state(source, NOW) == 'closed'
+
+    source = repo.update_source(source.id, policy.on_failure(source, "timeout", now=NOW))
+    assert source.consecutive_failures == 3
+    assert source.circuit_open_until == NOW + timedelta(minutes=10)
+    assert policy.select([source], NOW + timedelta(minutes=5)) == []
+
+    # 冷却期过后半开探测，探测失败重新熔断，冷却时间翻倍
+    probe_time = NOW + timedelta(minutes=11)
+    assert policy.circuit_state(source, probe_time) == 'half_open'
+    assert policy.select([source], probe_time) == [source]
+    source = repo.update_source(source.id, policy.on_failure(source, "timeout", now=probe_time))
+    assert source.circuit_open_until == probe_time + timedelta(minutes=20)
+
+    # 探测成功后恢复
+    probe_time += timedelta(minutes=21)
+    source = repo.update_source(source.id, policy.on_success(source, 800, probe_time))
+    assert policy.circuit_state(source, probe_time) == 'closed'
+    assert source.consecutive_failures == 0
+
+
+def test_slow_sources_last_with_tighter_timeout(repo, policy):
+    """测试慢速新闻源排在后面，超时按p95计算"""
+    slow = make_source(repo, 1, latency_p95_ms=8000)
+    probing = make_source(repo, 2, circuit_state='open', circuit_open_until=NOW - timedelta(minutes=1))
+    fast = make_source(repo, 3, latency_p95_ms=300)
+    fresh = make_source(repo, 4)
+
+    assert policy.select([slow, probing, fast, fresh], NOW) == [fresh, fast, slow, probing]
+    assert policy.timeout_for(slow) == 16
+    assert policy.timeout_for(fast) == 5
+    assert policy.timeout_for(fresh) is None
+
+
+@pytest.mark.asyncio
+async def test_crawler_skips_open_circuits(repo):
+    """测试抓取器跳过熔断中的新闻源，并记录失败和耗时"""
+    broken = make_source(repo, 1, consecutive_failures=2)
+    make_source(repo, 2, circuit_state='open', circuit_open_until=datetime.utcnow() + timedelta(hours=1))
+    healthy = make_source(repo, 3)
+
+    crawler = WebCrawler(repo, seen_filter=SeenUrlFilter(), clusterer=StoryClusterer())
+
+    async def list_rss_source(source):
+        if source.id == broken.id:
+            raise TimeoutError("feed timed out")
+        return []
+    crawler.list_rss_source = AsyncMock(side_effect=list_rss_source)
+
+    results = await crawler.crawl_news_sources()
+
+    assert results['total_sources'] == 2
+    assert {call.args[0].id for call in crawler.list_rss_source.await_args_list} == {broken.id, healthy.id}
+    broken = repo.get_source_by_id(broken.id)
+    assert broken.circuit_state == 'open'
+    assert broken.last_error == "feed timed out"
+    healthy = repo.get_source_by_id(healthy.id)
+    assert healthy.consecutive_failures == 0
+    assert healthy.latency_p50_ms is not None
+
+
+def test_open_circuit_not_due_and_rescheduled_after_cooldown(repo, policy):
+    """测试熔断中的新闻源不算到期，下次抓取时间不早于冷却期结束"""
+    source = make_source(repo, consecutive_failures=2)
+    source = repo.update_source(source.id, policy.on_failure(source, "timeout", now=NOW))
+    open_until = source.circuit_open_until
+
+    schedule_policy = CrawlSchedulePolicy(min_interval=timedelta(minutes=1), initial_interval=timedelta(minutes=1))
+    schedule = schedule_policy.next_schedule(source, None, NOW)
+    assert schedule['next_crawl_at'] == open_until
+
+    repo.update_source(source.id, {'next_crawl_at': NOW})
+    assert repo.get_due_sources(NOW + timedelta(minutes=5)) == []
+    assert [s.id for s in repo.get_due_sources(open_until)] == [source.id]
+
+
+@pytest.mark.asyncio
+async def test_tick_with_only_open_circuits_does_not_crawl(repo, monkeypatch):
+    """测试只有熔断中的新闻源到期时，定时任务不启动抓取"""
+    from app.services import scheduler as scheduler_module
+
+    make_source(repo, 1, next_crawl_at=datetime.utcnow() - timedelta(minutes=5),
+                circuit_state='open', circuit_open_until=datetime.utcnow() + timedelta(hours=1))
+    crawler_class = Mock()
+    monkeypatch.setattr(scheduler_module, 'WebCrawler', crawler_class)
+
+    await scheduler_module.NewsScheduler()._crawl_job()
+
+    crawler_class.assert_not_called()
+    assert repo.get_crawl_runs() == []
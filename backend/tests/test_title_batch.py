@@ -0,0 +1,145 @@
+"""
+Batched title translation tests
+"""
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, create_tables, drop_tables
+from app.services.ai_processor import AIProcessor, LLMResponse, parse_numbered_list
+from app.services.news_service import NewsRepository
+
+SUMMARY = "市议会周二批准新预算，增加公共交通和道路维护支出，同时削减行政开支。"
+
+
+class BatchLLM:
+    """按编号逐行回复“标题N的中文译文”，可指定第一次回复时遗漏或重复的编号"""
+
+    def __init__(self, drop_first=(), duplicate_first=()):
+        self.drop_first = set(drop_first)
+        self.duplicate_first = set(duplicate_first)
+        self.batches = []
+
+    async def ainvoke(self, messages):
+        prompt = messages[-1].content
+        if not prompt.startswith("英文标题："):
+            return LLMResponse(content=SUMMARY)
+        lines = re.findall(r"^(\d+)\. (.+)$", prompt, re.MULTILINE)
+        self.batches.append([title for _, title in lines])
+        first = len(self.batches) == 1
+        reply = []
+        for number, title in lines:
+            if first and title in self.drop_first:
+                continue
+            reply.append(f"{number}. 中文译文：{title}")
+            if first and title in self.duplicate_first:
+                reply.append(f"{number}. 中文译文：错位")
+        return LLMResponse(content="\n".join(reply))
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    """调用次数断言不受全局LLM缓存影响"""
+    monkeypatch.setattr(settings, 'llm_cache_enabled', False)
+
+
+@pytest.fixture
+def repo():
+    """Repository fixture"""
+    drop_tables()
+    create_tables()
+    db = SessionLocal()
+    try:
+        yield NewsRepository(db)
+    finally:
+        db.close()
+
+
+def test_parse_numbered_list():
+    """测试编号列表解析：多种分隔符、越界编号和重复编号"""
+    text = "以下是翻译：\n1. 第一条标题\n2、第二条标题\n3：“第三条标题”\n3) 重复的编号\n7. 越界"
+    assert parse_numbered_list(text, 4) == {1: "第一条标题", 2: "第二条标题"}
+    assert parse_numbered_list("", 3) == {}
+
+
+@pytest.mark.asyncio
+async def test_translate_titles_in_batches(monkeypatch):
+    """测试按批次大小组批，多批结果与输入对齐"""
+    monkeypatch.setattr(settings, 'title_batch_size', 4)
+    llm = BatchLLM()
+    processor = AIProcessor(None, llm=llm)
+    titles = [f"Headline {n}" for n in range(10)]
+
+    translations = await processor.translate_titles(titles)
+
+    assert translations == [f"中文译文：Headline {n}" for n in range(10)]
+    assert [len(batch) for batch in llm.batches] == [4, 4, 2]
+    assert processor.api_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_translate_titles_retries_only_missing(monkeypatch):
+    """测试只重试缺失或错位的标题"""
+    monkeypatch.setattr(settings, 'title_batch_size', 50)
+    llm = BatchLLM(drop_first={"Headline 2"}, duplicate_first={"Headline 5"})
+    processor = AIProcessor(None, llm=llm)
+    titles = [f"Headline {n}" for n in range(8)]
+
+    translations = await processor.translate_titles(titles)
+
+    assert translations == [f"中文译文：Headline {n}" for n in range(8)]
+    assert llm.batches[1] == ["Headline 2", "Headline 5"]
+    assert len(llm.batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_translate_titles_gives_up_after_retries(monkeypatch):
+    """测试重试轮数用完后返回None"""
+    monkeypatch.setattr(settings, 'title_batch_retries', 1)
+
+    class SilentLLM:
+        calls = 0
+
+        async def ainvoke(self, messages):
+            SilentLLM.calls += 1
+            return LLMResponse(content="无法翻译")
+
+    processor = AIProcessor(None, llm=SilentLLM())
+    assert await processor.translate_titles(["Headline", ""]) == [None, None]
+    assert SilentLLM.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_translate_pending_titles_then_process(repo):
+    """测试批量翻译入库文章标题，完整处理时复用已翻译的标题"""
+    source = repo.create_source({"name": "Wire", "url": "https://wire.com", "type": "rss", "category": "测试"})
+    article_ids = repo.bulk_create_articles([
+        {
+            "original_title": f"Headline {n}",
+            "original_content": f"The city council approved a new budget on Tuesday ({n}).",
+            "source_url": f"https://wire.com/h{n}",
+            "source_id": source.id,
+            "source_name": source.name,
+            "original_language": language
+        }
+        for n, language in enumerate(["en", "en", "zh"])
+    ])
+    llm = BatchLLM()
+    processor = AIProcessor(repo, llm=llm, combined=False)
+
+    results = await processor.translate_pending_titles()
+
+    assert results['total_titles'] == 2
+    assert results['translated_count'] == 2
+    assert results['api_calls'] == 1
+    article = repo.get_article_by_id(article_ids[0])
+    assert article.is_title_translated
+    assert article.translated_title == "中文译文：Headline 0"
+    assert not repo.get_article_by_id(article_ids[2]).is_title_translated
+    assert repo.get_untranslated_title_articles() == []
+
+    processor.api_calls = 0
+    assert await processor.process_single_article(article)
+    assert processor.api_calls == 2  # 只有摘要和正文翻译
+    assert repo.get_article_by_id(article_ids[0]).translated_title == "中文译文：Headline 0"
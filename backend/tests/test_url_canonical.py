@@ -0,0 +1,34 @@
+"""
+URL canonicalization tests
+"""
+from app.services.url_canonical import canonicalize_url
+
+
+def test_canonicalize_strips_tracking_and_fragment():
+    """测试去掉跟踪参数和片段，其余参数排序"""
+    assert canonicalize_url(
+        "https://news.com/a?utm_source=x&utm_medium=rss&b=2&a=1&fbclid=abc#top"
+    ) == "https://news.com/a?a=1&b=2"
+
+
+def test_canonicalize_scheme_host_and_trailing_slash():
+    """测试统一协议、域名和末尾斜杠"""
+    assert canonicalize_url("http://WWW.News.com:80/world/story/") == "https://news.com/world/story"
+    assert canonicalize_url("https://news.com:8443/a") == "https://news.com:8443/a"
+    assert canonicalize_url("https://news.com") == "https://news.com/"
+
+
+def test_canonicalize_amp_variants():
+    """测试AMP变体与原文规范化为同一URL"""
+    canonical = "https://news.com/world/story"
+    assert canonicalize_url("https://amp.news.com/world/story") == canonical
+    assert canonicalize_url("https://news.com/world/story/amp") == canonical
+    assert canonicalize_url("https://news.com/amp/world/story") == canonical
+    assert canonicalize_url("https://news.com/world/story.amp.html") == "https://news.com/world/story.html"
+
+
+def test_canonicalize_relative_and_non_http():
+    """测试相对地址补全和非HTTP地址"""
+    assert canonicalize_url("/news/x", base_url="https://www.bbc.com/news") == "https://bbc.com/news/x"
+    assert canonicalize_url("mailto:editor@news.com") == "mailto:editor@news.com"
+    assert canonicalize_url("") == ""
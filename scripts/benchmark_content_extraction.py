@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+正文提取基准
+在新闻页面上比较文本密度提取器与旧的选择器+最长段落策略的速度和准确率
+默认使用 backend/tests/fixtures/pages 中手写的合成页面（见该目录的README），也可指定实际抓取的页面目录
+
+用法:
+    python scripts/benchmark_content_extraction.py [页面目录] [--repeat 5]
+
+页面目录中的 expected.json 记录每个页面必须包含和不得包含的文本片段。
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from app.services.content_extractor import content_extractor
+from app.services.html_parser import parse_html
+from app.services.site_registry import site_registry
+
+DEFAULT_PAGES_DIR = Path(__file__).resolve().parent.parent / 'backend' / 'tests' / 'fixtures' / 'pages'
+
+
+def legacy_extract(markup: bytes):
+    """旧策略：移除无关标签，依次尝试通用正文选择器，再取最长段落，最后取body"""
+    soup = parse_html(markup)
+    for element in soup(["script", "style", "nav", "header", "footer", "aside", "menu"]):
+        element.decompose()
+    for element in site_registry.default.iter_content_candidates(soup):
+        text = element.get_text(strip=True)
+        if len(text) > 100:
+            return text
+    paragraphs = sorted(soup.find_all('p'), key=lambda p: len(p.get_text()), reverse=True)
+    parts = [p.get_text(strip=True) for p in paragraphs[:10] if len(p.get_text(strip=True)) > 20]
+    if parts:
+        return ' '.join(parts)
+    body = soup.find('body')
+    return body.get_text(strip=True) if body else None
+
+
+def density_extract(markup: bytes):
+    """新策略：文本密度提取"""
+    result = content_extractor.extract(markup)
+    return result.text if result else None
+
+
+def score(text, expected) -> float:
+    """准确率：命中的必含片段与未泄漏的排除片段占全部片段的比例"""
+    text = text or ''
+    hits = sum(snippet in text for snippet in expected['must_contain'])
+    clean = sum(snippet not in text for snippet in expected['must_not_contain'])
+    return (hits + clean) / (len(expected['must_contain']) + len(expected['must_not_contain']))
+
+
+def time_it(func, markup: bytes, repeat: int) -> float:
+    """预热一次后多次运行取中位数（毫秒）"""
+    func(markup)
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(markup)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='正文提取基准')
+    parser.add_argument('pages_dir', nargs='?', default=str(DEFAULT_PAGES_DIR), help='HTML页面目录，默认为合成测试页面')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    args = parser.parse_args()
+
+    pages_dir = Path(args.pages_dir)
+    expected_path = pages_dir / 'expected.json'
+    if not expected_path.exists():
+        print(f"❌ 缺少标注文件: {expected_path}")
+        sys.exit(1)
+    expected = json.loads(expected_path.read_text(encoding='utf-8'))
+
+    strategies = {'选择器+最长段落': legacy_extract, '文本密度': density_extract}
+    totals = {name: {'ms': 0.0, 'accuracy': 0.0} for name in strategies}
+
+    print(f"{'页面':<40}" + ''.join(f"{name:>18}" for name in strategies))
+    for page, page_expected in sorted(expected.items()):
+        markup = (pages_dir / page).read_bytes()
+        row = f"{page:<40}"
+        for name, func in strategies.items():
+            elapsed = time_it(func, markup, args.repeat)
+            accuracy = score(func(markup), page_expected)
+            totals[name]['ms'] += elapsed
+            totals[name]['accuracy'] += accuracy
+            row += f"{accuracy:>9.0%} {elapsed:>6.2f}ms"
+        print(row)
+
+    count = len(expected)
+    print(f"\n页面数: {count}")
+    for name, total in totals.items():
+        print(f"{name}: 平均准确率 {total['accuracy'] / count:.0%}，平均耗时 {total['ms'] / count:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+HTML解析性能基准
+在网页语料（默认为合成测试页面）上比较不同解析器，以及联合选择器与逐个select_one的耗时
+
+用法:
+    python scripts/benchmark_html_parsing.py [页面目录] [--parsers lxml html.parser] [--repeat 5]
+
+页面文件名以站点域名开头时（如 cnn.com_index.html）使用对应站点配置，否则使用默认配置。
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from app.services.html_parser import SUPPORTED_PARSERS, parse_html
+from app.services.site_registry import site_registry
+
+DEFAULT_PAGES_DIR = Path(__file__).resolve().parent.parent / 'backend' / 'tests' / 'fixtures' / 'pages'
+
+
+def load_pages(pages_dir: Path):
+    """读取语料目录下的HTML文件"""
+    pages = []
+    for path in sorted(pages_dir.glob('*.html')):
+        profile = site_registry.get('https://' + path.stem.split('_')[0])
+        pages.append((path.name, path.read_bytes(), profile))
+    return pages
+
+
+def time_it(func, repeat: int) -> float:
+    """预热一次后多次运行取中位数（毫秒）"""
+    func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def sequential_select_one(soup, profile):
+    """旧实现：每个正文选择器各遍历一次文档树"""
+    for selector in profile.content_selectors:
+        soup.select_one(selector)
+
+
+def union_select(soup, profile):
+    """新实现：合并选择器只遍历一次"""
+    list(profile.iter_content_candidates(soup))
+
+
+def run_benchmark(pages, parsers, repeat: int):
+    """逐页面、逐解析器计时"""
+    totals = {parser: {'parse': 0.0, 'links': 0.0, 'sequential': 0.0, 'union': 0.0} for parser in parsers}
+
+    for name, markup, profile in pages:
+        for parser in parsers:
+            soup = parse_html(markup, parser)
+            totals[parser]['parse'] += time_it(lambda: parse_html(markup, parser), repeat)
+            totals[parser]['links'] += time_it(lambda: profile.select_links(soup), repeat)
+            totals[parser]['sequential'] += time_it(lambda: sequential_select_one(soup, profile), repeat)
+            totals[parser]['union'] += time_it(lambda: union_select(soup, profile), repeat)
+
+    return totals
+
+
+def print_report(totals, page_count: int):
+    """输出每页平均耗时"""
+    print(f"\n页面数: {page_count}（每页平均耗时，毫秒）")
+    print(f"{'解析器':<14}{'解析':>10}{'链接选择':>12}{'逐个选择':>12}{'联合选择':>12}")
+    for parser, timing in totals.items():
+        print(
+            f"{parser:<14}"
+            f"{timing['parse'] / page_count:>10.2f}"
+            f"{timing['links'] / page_count:>12.2f}"
+            f"{timing['sequential'] / page_count:>12.2f}"
+            f"{timing['union'] / page_count:>12.2f}"
+        )
+
+    baseline = totals.get('html.parser')
+    if baseline:
+        for parser, timing in totals.items():
+            if parser != 'html.parser' and timing['parse']:
+                print(f"{parser} 解析速度为 html.parser 的 {baseline['parse'] / timing['parse']:.1f} 倍")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='HTML解析性能基准')
+    parser.add_argument('pages_dir', nargs='?', default=str(DEFAULT_PAGES_DIR), help='HTML页面目录，默认为合成测试页面')
+    parser.add_argument('--parsers', nargs='+', default=['lxml', 'html.parser'], choices=SUPPORTED_PARSERS)
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    args = parser.parse_args()
+
+    pages = load_pages(Path(args.pages_dir))
+    if not pages:
+        print(f"❌ 目录中没有HTML页面: {args.pages_dir}")
+        sys.exit(1)
+
+    totals = run_benchmark(pages, args.parsers, args.repeat)
+    print_report(totals, len(pages))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,17 +2,22 @@
 """
 采集指定新闻源的真实数据
 """
-import requests
 import sqlite3
 from datetime import datetime
 import xml.etree.ElementTree as ET
 from urllib.parse import urljoin
 import time
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from app.core.politeness import PoliteSession
 
 def crawl_specific_sources():
     """采集指定新闻源"""
     conn = sqlite3.connect("backend/newsmind.db")
     cursor = conn.cursor()
+    # 按站点限速、遵守robots.txt，429/503时自动退避
+    session = PoliteSession()
     
     # 新闻源配置
     sources = [
@@ -46,7 +51,7 @@ def crawl_specific_sources():
                 headers = {
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
                 }
-                response = requests.get(source['url'], headers=headers, timeout=10)
+                response = session.get(source['url'], headers=headers, timeout=10)
                 response.raise_for_status()
                 
                 # 解析RSS
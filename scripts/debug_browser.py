@@ -27,7 +27,7 @@ async def debug_browser():
         print(f"✅ 爬虫创建成功")
         print(f"   Playwright Available: {crawler._playwright_available}")
         print(f"   Browser: {crawler.browser}")
-        print(f"   Page: {crawler.page}")
+        print(f"   Page Pool: {crawler.page_pool}")
         
         # 启动浏览器
         print("\n🚀 启动浏览器...")
@@ -35,14 +35,15 @@ async def debug_browser():
         print(f"✅ 浏览器启动完成")
         print(f"   Playwright Available: {crawler._playwright_available}")
         print(f"   Browser: {crawler.browser}")
-        print(f"   Page: {crawler.page}")
+        print(f"   Page Pool: {crawler.page_pool}")
         
-        if crawler.page:
+        if crawler.page_pool:
             print("\n🔗 测试页面访问...")
             try:
                 # 使用一个更简单的网站进行测试
-                await crawler.page.goto('https://httpbin.org/html', timeout=30000)
-                title = await crawler.page.title()
+                async with crawler.page_pool.lease() as page:
+                    await page.goto('https://httpbin.org/html', timeout=30000)
+                    title = await page.title()
                 print(f"✅ 页面访问成功，标题: {title}")
                 
                 # 测试内容提取
@@ -6,7 +6,6 @@ import sys
 import os
 import time
 import json
-import requests
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -23,12 +22,15 @@ except ImportError:
     print("安装feedparser: pip install feedparser")
     sys.exit(1)
 
+from app.core.politeness import PoliteSession
+
 class RealNewsCrawler:
     """真实新闻爬虫"""
     
     def __init__(self):
         self.db_path = "newsmind.db"
-        self.session = requests.Session()
+        # 按站点限速、遵守robots.txt，429/503时自动退避
+        self.session = PoliteSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+从响应缓存重新提取文章正文
+改进正文提取逻辑后，用缓存的原始页面重新处理已入库文章，不访问网络
+
+用法:
+    python scripts/reextract_from_cache.py [--limit 500] [--cache-dir cache/responses] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from sqlalchemy import desc
+
+from app.core.database import SessionLocal
+from app.core.http_client import HttpClient
+from app.core.response_cache import ResponseCache
+from app.models.news import NewsArticle
+from app.services.crawler import WebCrawler
+from app.services.news_service import NewsRepository
+
+
+async def reextract(limit: int, cache: ResponseCache, dry_run: bool):
+    """逐篇文章从缓存重新提取正文，内容变化时更新"""
+    db = SessionLocal()
+    repo = NewsRepository(db)
+    crawler = WebCrawler(repo, http=HttpClient(cache=cache, replay=True))
+    counts = {'total': 0, 'missing': 0, 'failed': 0, 'unchanged': 0, 'updated': 0}
+    start = time.perf_counter()
+
+    try:
+        articles = db.query(NewsArticle).order_by(desc(NewsArticle.created_at)).limit(limit).all()
+        for article in articles:
+            counts['total'] += 1
+            if not cache.contains(article.source_url):
+                counts['missing'] += 1
+                continue
+
+            content = await crawler._get_full_content(article.source_url)
+            if not content:
+                counts['failed'] += 1
+                continue
+            if content == article.original_content:
+                counts['unchanged'] += 1
+                continue
+
+            counts['updated'] += 1
+            print(f"✅ 文章 {article.id}: {len(article.original_content or '')} -> {len(content)} 字符")
+            if not dry_run:
+                article.original_content = content
+
+        if not dry_run:
+            db.commit()
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n共 {counts['total']} 篇（{elapsed:.1f} 秒）: 更新 {counts['updated']}，未变化 {counts['unchanged']}，"
+          f"提取失败 {counts['failed']}，缓存中没有 {counts['missing']}")
+    if dry_run:
+        print("（dry-run，未写入数据库）")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='从响应缓存重新提取文章正文')
+    parser.add_argument('--limit', type=int, default=500, help='最多处理的文章数（按入库时间倒序）')
+    parser.add_argument('--cache-dir', default=None, help='响应缓存目录，默认使用配置中的目录')
+    parser.add_argument('--dry-run', action='store_true', help='只统计，不写入数据库')
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.cache_dir)
+    if not (cache.root / 'index.sqlite').exists():
+        print(f"❌ 响应缓存不存在: {cache.root}（抓取时设置 RESPONSE_CACHE_ENABLED=1 写入缓存）")
+        sys.exit(1)
+
+    asyncio.run(reextract(args.limit, cache, args.dry_run))
+
+
+if __name__ == '__main__':
+    main()
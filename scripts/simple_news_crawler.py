@@ -4,7 +4,6 @@
 用于手动触发新闻采集，解决数据更新问题
 """
 import sqlite3
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import re
@@ -14,6 +13,10 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 from news_filter import filter_article
 from web_content_extractor import enhance_rss_article
+from app.core.politeness import PoliteSession  # web_content_extractor已将backend加入路径
+
+# 按站点限速、遵守robots.txt的会话
+session = PoliteSession()
 # from ai_translator import batch_translate_articles  # 移除翻译导入
 
 
@@ -41,7 +44,7 @@ def fetch_url_content(url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = session.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         return response.text
     except Exception as e:
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+数据库升级脚本 v3 - 为采集器增加状态字段
+为已存在的数据库补充新版模型中新增的列和索引
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from sqlalchemy import create_engine, text, inspect
+import logging
+
+from app.models.news import CrawlFrontierItem, CrawlRun
+from app.services.url_canonical import canonicalize_url
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = "sqlite:///./newsmind.db"
+
+# 需要添加的字段：表名 -> [(字段名, 类型)]
+UPGRADE_FIELDS = {
+    'news_sources': [
+        # 条件请求（ETag / Last-Modified / 内容哈希）
+        ('http_etag', 'VARCHAR(255)'),
+        ('http_last_modified', 'VARCHAR(100)'),
+        ('content_hash', 'VARCHAR(64)'),
+        # RSS高水位
+        ('feed_last_published', 'DATETIME'),
+        ('feed_recent_guids', 'TEXT'),
+        # 自适应抓取频率
+        ('publish_rate', 'FLOAT'),
+        ('last_crawled_at', 'DATETIME'),
+        ('next_crawl_at', 'DATETIME'),
+        # 健康状态与熔断
+        ('consecutive_failures', 'INTEGER DEFAULT 0'),
+        ('last_success_at', 'DATETIME'),
+        ('last_failure_at', 'DATETIME'),
+        ('last_error', 'VARCHAR(500)'),
+        ('latency_p50_ms', 'FLOAT'),
+        ('latency_p95_ms', 'FLOAT'),
+        ('latency_samples', 'TEXT'),
+        ('circuit_state', "VARCHAR(20) DEFAULT 'closed'"),
+        ('circuit_open_until', 'DATETIME'),
+    ],
+    'news_articles': [
+        # URL规范化去重
+        ('canonical_url', 'VARCHAR(500)'),
+        # 近似重复故事簇
+        ('simhash', 'VARCHAR(16)'),
+        ('story_cluster_id', 'INTEGER'),
+    ],
+}
+
+# 需要创建的新表
+UPGRADE_TABLES = [
+    # 持久化抓取队列
+    CrawlFrontierItem.__table__,
+    # 抓取运行统计
+    CrawlRun.__table__,
+]
+
+# 需要创建的索引：(索引名, 表名, 字段名)
+UPGRADE_INDEXES = [
+    ('ix_news_articles_canonical_url', 'news_articles', 'canonical_url'),
+    ('ix_news_articles_story_cluster_id', 'news_articles', 'story_cluster_id'),
+    ('ix_news_sources_next_crawl_at', 'news_sources', 'next_crawl_at'),
+]
+
+
+def backfill_canonical_urls(connection):
+    """为已有文章补充规范化URL"""
+    rows = connection.execute(text(
+        "SELECT id, source_url FROM news_articles WHERE canonical_url IS NULL"
+    )).fetchall()
+    for article_id, source_url in rows:
+        connection.execute(
+            text("UPDATE news_articles SET canonical_url = :canonical_url WHERE id = :id"),
+            {'canonical_url': canonicalize_url(source_url), 'id': article_id}
+        )
+    logger.info(f"补充规范化URL: {len(rows)} 篇文章")
+
+
+def upgrade_database():
+    """升级数据库结构"""
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            logger.info("开始数据库升级...")
+            inspector = inspect(engine)
+
+            for table in UPGRADE_TABLES:
+                if not inspector.has_table(table.name):
+                    logger.info(f"创建表: {table.name}")
+                    table.create(connection)
+
+            for table_name, fields in UPGRADE_FIELDS.items():
+                existing_columns = [col['name'] for col in inspector.get_columns(table_name)]
+
+                for field_name, field_type in fields:
+                    if field_name not in existing_columns:
+                        logger.info(f"添加字段: {table_name}.{field_name}")
+                        try:
+                            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {field_name} {field_type}"))
+                        except Exception as e:
+                            logger.warning(f"添加字段 {table_name}.{field_name} 失败: {e}")
+
+            for index_name, table_name, column_name in UPGRADE_INDEXES:
+                logger.info(f"创建索引: {index_name}")
+                connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column_name})"))
+
+            # 迁移现有数据
+            logger.info("迁移现有数据...")
+            backfill_canonical_urls(connection)
+
+            connection.commit()
+            logger.info("数据库升级完成！")
+
+    except Exception as e:
+        logger.error(f"数据库升级失败: {e}")
+        raise
+
+
+def verify_database_structure():
+    """验证数据库结构"""
+    try:
+        engine = create_engine(DATABASE_URL)
+        inspector = inspect(engine)
+
+        missing_tables = [table.name for table in UPGRADE_TABLES if not inspector.has_table(table.name)]
+        if missing_tables:
+            logger.error(f"缺少必要表: {missing_tables}")
+            return False
+
+        missing_columns = []
+        for table_name, fields in UPGRADE_FIELDS.items():
+            column_names = [col['name'] for col in inspector.get_columns(table_name)]
+            missing_columns.extend(
+                f"{table_name}.{field_name}" for field_name, _ in fields if field_name not in column_names
+            )
+
+        if missing_columns:
+            logger.error(f"缺少必要字段: {missing_columns}")
+            return False
+
+        logger.info("数据库结构验证通过")
+        return True
+
+    except Exception as e:
+        logger.error(f"数据库结构验证失败: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    logger.info("开始数据库升级流程...")
+
+    # 执行升级
+    upgrade_database()
+
+    # 验证结果
+    if verify_database_structure():
+        logger.info("数据库升级成功完成！")
+    else:
+        logger.error("数据库升级验证失败！")
+        sys.exit(1)
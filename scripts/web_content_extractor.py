@@ -3,14 +3,57 @@
 网页正文提取模块
 从新闻原文链接中提取完整正文内容
 """
-import requests
-from bs4 import BeautifulSoup
 import re
 import time
 import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
 from news_filter import clean_html_tags
+from app.core.config import settings
+from app.core.politeness import PoliteSession
+from app.core.response_cache import CacheMissError, response_cache
+from app.services.content_extractor import content_extractor
+from app.services.html_parser import PrioritySelector, parse_html
+
+# 按站点限速、遵守robots.txt的会话
+session = PoliteSession()
+
+# 常见的正文容器，按优先级排列，合并为一次遍历
+CONTENT_SELECTOR = PrioritySelector([
+    'article',
+    '.article-content',
+    '.story-content',
+    '.post-content',
+    '.entry-content',
+    '.content-body',
+    '.article-body',
+    '.story-body',
+    '.post-body',
+    '.entry-body',
+    '[class*="content"]',
+    '[class*="article"]',
+    '[class*="story"]',
+    '[class*="post"]',
+    '[class*="entry"]'
+])
+
+def fetch_html(url, headers):
+    """
+    获取网页原始内容
+    回放模式（CRAWLER_REPLAY=1）下只从响应缓存读取；启用响应缓存时写入缓存
+    """
+    if settings.crawler_replay:
+        cached = response_cache.lookup(url)
+        if cached is None:
+            raise CacheMissError(f"响应缓存中没有 {url}")
+        return cached.body
+    
+    response = session.get(url, headers=headers, timeout=15)
+    response.raise_for_status()
+    if settings.response_cache_enabled:
+        response_cache.store(url, response.content, response.status_code, dict(response.headers))
+    return response.content
 
 def extract_article_content(url, max_retries=2):
     """
@@ -22,14 +65,7 @@ def extract_article_content(url, max_retries=2):
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 移除script和style标签
-            for script in soup(["script", "style"]):
-                script.decompose()
+            soup = parse_html(fetch_html(url, headers))
             
             # 尝试多种正文提取策略
             content = extract_content_by_strategy(soup, url)
@@ -37,8 +73,14 @@ def extract_article_content(url, max_retries=2):
             if content and len(content.strip()) > 100:
                 return clean_html_tags(content)
             
+            if settings.crawler_replay:
+                # 缓存内容不会变化，无需重试
+                return None
             time.sleep(1)  # 避免请求过快
             
+        except CacheMissError as e:
+            print(f"     ⚠️  {e}")
+            return None
         except Exception as e:
             print(f"     ⚠️  提取失败 (尝试 {attempt + 1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
@@ -51,54 +93,19 @@ def extract_content_by_strategy(soup, url):
     """
     使用多种策略提取正文内容
     """
-    # 策略1: 查找常见的正文容器
-    content_selectors = [
-        'article',
-        '.article-content',
-        '.story-content',
-        '.post-content',
-        '.entry-content',
-        '.content-body',
-        '.article-body',
-        '.story-body',
-        '.post-body',
-        '.entry-body',
-        '[class*="content"]',
-        '[class*="article"]',
-        '[class*="story"]',
-        '[class*="post"]',
-        '[class*="entry"]'
-    ]
+    # 策略1: 按文本密度和链接密度提取正文（同时剔除导航、广告、评论等区块）
+    result = content_extractor.extract(soup)
+    if result and result.confidence >= settings.content_min_confidence:
+        return result.text
     
-    for selector in content_selectors:
-        elements = soup.select(selector)
-        for element in elements:
-            # 移除导航、广告等无关内容
-            for unwanted in element.select('nav, .nav, .navigation, .ad, .advertisement, .sidebar, .comments'):
-                unwanted.decompose()
-            
-            text = element.get_text(separator=' ', strip=True)
-            if len(text) > 200:  # 确保内容足够长
-                return text
+    # 策略2: 查找常见的正文容器（按优先级，一次遍历）
+    for element in CONTENT_SELECTOR.iter_all(soup):
+        text = element.get_text(separator=' ', strip=True)
+        if len(text) > 200:  # 确保内容足够长
+            return text
     
-    # 策略2: 查找包含最多文本的段落
-    paragraphs = soup.find_all('p')
-    if paragraphs:
-        # 按长度排序，取最长的几个段落
-        paragraphs.sort(key=lambda p: len(p.get_text()), reverse=True)
-        content_parts = []
-        total_length = 0
-        
-        for p in paragraphs[:10]:  # 最多取10个段落
-            text = p.get_text(strip=True)
-            if len(text) > 50:  # 段落至少50字符
-                content_parts.append(text)
-                total_length += len(text)
-                if total_length > 500:  # 总长度超过500字符就停止
-                    break
-        
-        if content_parts:
-            return ' '.join(content_parts)
+    if result:
+        return result.text
     
     # 策略3: 基于URL特征的特殊处理
     if 'bbc.com' in url: